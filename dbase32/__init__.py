@@ -42,10 +42,39 @@ try:
         db32dec,
         isdb32,
         check_db32,
+        db32_succ,
+        db32_pred,
+        db32_cmp,
+        db32_bisect,
         random_id,
         time_id,
+        time_id_ms,
+        random_ids,
+        time_ids,
+        time_id_timestamp,
+        time_id_timestamps,
+        time_id_range,
+        set_entropy_pool,
+        entropy_pool_stats,
+        IdGenerator,
+        NodeIdGenerator,
+        node_id_unpack,
         db32_join,
         db32_join_2,
+        db32_join_n,
+        db32_join_time,
+        db32_join_bytes,
+        db32_join_2_bytes,
+        db32_paths,
+        db32_split,
+        db32_split_bytes,
+        PathBuilder,
+        Codec,
+        Db32IdSet,
+        Db32Dict,
+        Db32SortedArray,
+        Db32Id,
+        Db32Cache,
     )
     using_c_extension = True
 except ImportError:
@@ -57,10 +86,39 @@ except ImportError:
         db32dec,
         isdb32,
         check_db32,
+        db32_succ,
+        db32_pred,
+        db32_cmp,
+        db32_bisect,
         random_id,
         time_id,
+        time_id_ms,
+        random_ids,
+        time_ids,
+        time_id_timestamp,
+        time_id_timestamps,
+        time_id_range,
+        set_entropy_pool,
+        entropy_pool_stats,
+        IdGenerator,
+        NodeIdGenerator,
+        node_id_unpack,
         db32_join,
         db32_join_2,
+        db32_join_n,
+        db32_join_time,
+        db32_join_bytes,
+        db32_join_2_bytes,
+        db32_paths,
+        db32_split,
+        db32_split_bytes,
+        PathBuilder,
+        Codec,
+        Db32IdSet,
+        Db32Dict,
+        Db32SortedArray,
+        Db32Id,
+        Db32Cache,
     )
     using_c_extension = False
 
@@ -74,10 +132,39 @@ __all__ = (
     'db32dec',
     'isdb32',
     'check_db32',
+    'db32_succ',
+    'db32_pred',
+    'db32_cmp',
+    'db32_bisect',
     'random_id',
     'time_id',
+    'time_id_ms',
+    'random_ids',
+    'time_ids',
+    'time_id_timestamp',
+    'time_id_timestamps',
+    'time_id_range',
+    'set_entropy_pool',
+    'entropy_pool_stats',
+    'IdGenerator',
+    'NodeIdGenerator',
+    'node_id_unpack',
     'db32_join',
     'db32_join_2',
+    'db32_join_n',
+    'db32_join_time',
+    'db32_join_bytes',
+    'db32_join_2_bytes',
+    'db32_paths',
+    'db32_split',
+    'db32_split_bytes',
+    'PathBuilder',
+    'Codec',
+    'Db32IdSet',
+    'Db32Dict',
+    'Db32SortedArray',
+    'Db32Id',
+    'Db32Cache',
 )
 
 RANDOM_BITS = 120
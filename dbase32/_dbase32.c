@@ -23,6 +23,10 @@
 #define PY_SSIZE_T_CLEAN
 #include <Python.h>
 #include <stdbool.h>
+#include <math.h>
+#ifdef HAVE_PTHREAD_H
+#include <pthread.h>
+#endif
 
 #define DB32ALPHABET "3456789ABCDEFGHIJKLMNOPQRSTUVWXY"
 #define MAX_BIN_LEN 60
@@ -130,12 +134,15 @@ static const uint8_t DB32_REVERSE[256] __attribute__ ((aligned (64))) = {
 };
 
 
-/* Used by db32_join(), db32_join_2() */
+/* Used by db32_join() */
 static PyObject *_str_slash = NULL;  //  '/'
 
+/* Used by db32_paths() and PathBuilder */
+static PyObject *_int_two = NULL;  //  2
+
 
 /*
- * For correctness, we declare the five internal dbase32 C functions that need
+ * For correctness, we declare the internal dbase32 C functions that need
  * their return values checked using "__attribute__ ((warn_unused_result))":
  */
 static uint8_t _encode(const uint8_t *, const size_t, uint8_t *, const size_t)
@@ -150,22 +157,29 @@ static uint8_t _validate(const uint8_t *, const size_t)
 static bool _check_txt_len(const size_t)
     __attribute__ ((warn_unused_result));
 
+static bool _check_bin_len(const size_t)
+    __attribute__ ((warn_unused_result));
+
+static bool _check_numbytes(const size_t)
+    __attribute__ ((warn_unused_result));
+
 static PyObject * _check_join(const char *, PyObject *)
     __attribute__ ((warn_unused_result));
 
 
 /*
- * _encode(): internal Dbase32 encoding function.
+ * _encode_x(): internal base32 encoding kernel for any `forward` table.
  *
- * Used by `db32enc()`, `random_id()`, and `time_id()`.
+ * Used by `_encode()` and `Codec.encode()`.
  *
  * Returns 0 on success.
  *
  * Any return value other than 0 should be treated as an internal error.
  */
-static uint8_t
-_encode(const uint8_t *bin_buf, const size_t bin_len,
-              uint8_t *txt_buf, const size_t txt_len)
+static inline uint8_t
+_encode_x(const uint8_t *forward,
+          const uint8_t *bin_buf, const size_t bin_len,
+                uint8_t *txt_buf, const size_t txt_len)
 {
     size_t block, count;
     uint64_t taxi;
@@ -187,14 +201,14 @@ _encode(const uint8_t *bin_buf, const size_t bin_len,
         taxi = bin_buf[4] | (taxi << 8);
 
         /* Unpack 40 bits from the taxi (5 bits at a time) */
-        txt_buf[0] = DB32_FORWARD[(taxi >> 35) & 31];
-        txt_buf[1] = DB32_FORWARD[(taxi >> 30) & 31];
-        txt_buf[2] = DB32_FORWARD[(taxi >> 25) & 31];
-        txt_buf[3] = DB32_FORWARD[(taxi >> 20) & 31];
-        txt_buf[4] = DB32_FORWARD[(taxi >> 15) & 31];
-        txt_buf[5] = DB32_FORWARD[(taxi >> 10) & 31];
-        txt_buf[6] = DB32_FORWARD[(taxi >>  5) & 31];
-        txt_buf[7] = DB32_FORWARD[taxi & 31];
+        txt_buf[0] = forward[(taxi >> 35) & 31];
+        txt_buf[1] = forward[(taxi >> 30) & 31];
+        txt_buf[2] = forward[(taxi >> 25) & 31];
+        txt_buf[3] = forward[(taxi >> 20) & 31];
+        txt_buf[4] = forward[(taxi >> 15) & 31];
+        txt_buf[5] = forward[(taxi >> 10) & 31];
+        txt_buf[6] = forward[(taxi >>  5) & 31];
+        txt_buf[7] = forward[taxi & 31];
 
         /* Move the pointers */
         bin_buf += 5;
@@ -204,29 +218,64 @@ _encode(const uint8_t *bin_buf, const size_t bin_len,
 }
 
 
+/*
+ * _encode(): internal Dbase32 encoding function.
+ *
+ * Used by `db32enc()`, `random_id()`, `time_id()`, `time_id_ms()`,
+ * `_random_ids()`, `time_id_range()`, `IdGenerator`, and `NodeIdGenerator`.
+ *
+ * Returns 0 on success.
+ *
+ * Any return value other than 0 should be treated as an internal error.
+ */
+static uint8_t
+_encode(const uint8_t *bin_buf, const size_t bin_len,
+              uint8_t *txt_buf, const size_t txt_len)
+{
+    return _encode_x(DB32_FORWARD, bin_buf, bin_len, txt_buf, txt_len);
+}
+
+
+/*
+ * _ROTATE_X(): macro for lookup in a `reverse` table rotated left by 42.
+ *
+ * Used by `_decode_x()`, `_validate_x()`, and `_ROTATE()`.
+ *
+ * Every alphabet accepted by `gen.check_forward()` falls between '0' (48) and
+ * 'Z' (90), so after the rotation all the valid entries are in [6, 48], within
+ * the first 64 bytes of the table.
+ *
+ * Note this macro assumes a `txt_buf` local function variable.
+ */
+#define _ROTATE_X(reverse, i) \
+    (reverse)[(uint8_t)(txt_buf[i] - 42)]
+
+
 /*
  * _ROTATE(): macro for lookup in the rotated `DB32_REVERSE` table.
  *
- * Used by `_decode()` and `_validate()`.
+ * Used by `_decode()`, `_validate()`, `_step()`, `_compare()`, and
+ * `_decode_ts()`.
  *
  * Note this macro assumes a `txt_buf` local function variable.
  */
 #define _ROTATE(i) \
-    DB32_REVERSE[(uint8_t)(txt_buf[i] - 42)]
+    _ROTATE_X(DB32_REVERSE, i)
 
 
 /*
- * _decode(): internal Dbase32 decoding function.
+ * _decode_x(): internal base32 decoding kernel for any rotated `reverse` table.
  *
- * Used by `db32dec()`.
+ * Used by `_decode()` and `Codec.decode()`.
  *
  * Returns 0 on success, 224 when txt_buf contains invalid characters.
  *
  * Any return value other than 0 or 224 should be treated as an internal error.
  */
-static uint8_t
-_decode(const uint8_t *txt_buf, const size_t txt_len,
-              uint8_t *bin_buf, const size_t bin_len)
+static inline uint8_t
+_decode_x(const uint8_t *reverse,
+          const uint8_t *txt_buf, const size_t txt_len,
+                uint8_t *bin_buf, const size_t bin_len)
 {
     size_t block, count;
     uint8_t r;
@@ -254,14 +303,14 @@ _decode(const uint8_t *txt_buf, const size_t txt_len,
     count = txt_len / 8;
     for (r = block = 0; block < count; block++) {
         /* Pack 40 bits into the taxi (5 bits at a time) */
-        r = _ROTATE(0) | (r & 224);    taxi = r;
-        r = _ROTATE(1) | (r & 224);    taxi = r | (taxi << 5);
-        r = _ROTATE(2) | (r & 224);    taxi = r | (taxi << 5);
-        r = _ROTATE(3) | (r & 224);    taxi = r | (taxi << 5);
-        r = _ROTATE(4) | (r & 224);    taxi = r | (taxi << 5);
-        r = _ROTATE(5) | (r & 224);    taxi = r | (taxi << 5);
-        r = _ROTATE(6) | (r & 224);    taxi = r | (taxi << 5);
-        r = _ROTATE(7) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 0) | (r & 224);    taxi = r;
+        r = _ROTATE_X(reverse, 1) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 2) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 3) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 4) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 5) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 6) | (r & 224);    taxi = r | (taxi << 5);
+        r = _ROTATE_X(reverse, 7) | (r & 224);    taxi = r | (taxi << 5);
 
         /* Unpack 40 bits from the taxi (8 bits at a time) */
         bin_buf[0] = (taxi >> 32) & 255;
@@ -276,24 +325,43 @@ _decode(const uint8_t *txt_buf, const size_t txt_len,
     }
 
     /* Return value is (r & 224):
-     *       31: 00011111 <= bits set in DB32_REVERSE for valid characters
-     *      224: 11100000 <= bits set in DB32_REVERSE for invalid characters
+     *       31: 00011111 <= bits set in `reverse` for valid characters
+     *      224: 11100000 <= bits set in `reverse` for invalid characters
      */
     return (r & 224);
 }
 
 
 /*
- * _validate(): internal Dbase32 validation function.
+ * _decode(): internal Dbase32 decoding function.
  *
- * Used by `isdb32()`, `check_db32()`, and `_check_join()`.
+ * Used by `db32dec()` and `node_id_unpack()`.
  *
- * Returns 0 when valid, 224 when invalid.
+ * Returns 0 on success, 224 when txt_buf contains invalid characters.
  *
  * Any return value other than 0 or 224 should be treated as an internal error.
  */
 static uint8_t
-_validate(const uint8_t *txt_buf, const size_t txt_len)
+_decode(const uint8_t *txt_buf, const size_t txt_len,
+              uint8_t *bin_buf, const size_t bin_len)
+{
+    return _decode_x(DB32_REVERSE, txt_buf, txt_len, bin_buf, bin_len);
+}
+
+
+/*
+ * _validate_x(): internal base32 validation kernel for any rotated `reverse`
+ * table.
+ *
+ * Used by `_validate()`, `Codec.isvalid()`, and `Codec.check()`.
+ *
+ * Returns 0 when valid, 224 when invalid.
+ *
+ * Any return value other than 0 or 224 should be treated as an internal error.
+ */
+static inline uint8_t
+_validate_x(const uint8_t *reverse,
+            const uint8_t *txt_buf, const size_t txt_len)
 {
     size_t block, count;
     uint8_t r;
@@ -316,29 +384,47 @@ _validate(const uint8_t *txt_buf, const size_t txt_len)
      */
     count = txt_len / 8;
     for (r = block = 0; block < count; block++) {
-        r |= _ROTATE(0);
-        r |= _ROTATE(1);
-        r |= _ROTATE(2);
-        r |= _ROTATE(3);
-        r |= _ROTATE(4);
-        r |= _ROTATE(5);
-        r |= _ROTATE(6);
-        r |= _ROTATE(7);
+        r |= _ROTATE_X(reverse, 0);
+        r |= _ROTATE_X(reverse, 1);
+        r |= _ROTATE_X(reverse, 2);
+        r |= _ROTATE_X(reverse, 3);
+        r |= _ROTATE_X(reverse, 4);
+        r |= _ROTATE_X(reverse, 5);
+        r |= _ROTATE_X(reverse, 6);
+        r |= _ROTATE_X(reverse, 7);
         txt_buf += 8;  /* Move the pointer */
     }
 
     /* Return value is (r & 224):
-     *       31: 00011111 <= bits set in DB32_REVERSE for valid characters
-     *      224: 11100000 <= bits set in DB32_REVERSE for invalid characters
+     *       31: 00011111 <= bits set in `reverse` for valid characters
+     *      224: 11100000 <= bits set in `reverse` for invalid characters
      */
     return (r & 224);
 }
 
 
+/*
+ * _validate(): internal Dbase32 validation function.
+ *
+ * Used by `isdb32()`, `check_db32()`, `_step()`, `db32_cmp()`, `_check_text()`,
+ * and `_check_join()`.
+ *
+ * Returns 0 when valid, 224 when invalid.
+ *
+ * Any return value other than 0 or 224 should be treated as an internal error.
+ */
+static uint8_t
+_validate(const uint8_t *txt_buf, const size_t txt_len)
+{
+    return _validate_x(DB32_REVERSE, txt_buf, txt_len);
+}
+
+
 /*
  * _check_txt_len(): validate the length of a Dbase32 ID.
  *
- * Used by `db32dec()`, `check_db32()`, and `_check_join()`.
+ * Used by `db32dec()`, `check_db32()`, `_step()`, `db32_cmp()`, `_check_text()`,
+ * and `_check_join()`.
  *
  * If `txt_len` fits the requirements for a well-formed Dbase32-encoded ID, this
  * function returns `true`.
@@ -364,10 +450,68 @@ _check_txt_len(const size_t txt_len)
 }
 
 
+/*
+ * _check_bin_len(): validate the length of a binary ID.
+ *
+ * Used by `db32enc()`, `db32_cmp()`, `db32_bisect()`, and `Db32Id.frombytes()`.
+ *
+ * If `bin_len` fits the requirements for a well-formed binary ID, this function
+ * returns `true`.
+ *
+ * Otherwise this function sets a Python exception and returns `false`.
+ */
+static bool
+_check_bin_len(const size_t bin_len)
+{
+    if (bin_len < 5 || bin_len > MAX_BIN_LEN) {
+        PyErr_Format(PyExc_ValueError,
+            "len(data) is %u, need 5 <= len(data) <= %u", bin_len, MAX_BIN_LEN
+        );
+        return false;
+    }
+    if (bin_len % 5 != 0) {
+        PyErr_Format(PyExc_ValueError,
+            "len(data) is %u, need len(data) % 5 == 0", bin_len
+        );
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * _check_numbytes(): validate a requested binary ID size.
+ *
+ * Used by `random_id()`, `random_ids()`, `Db32IdSet`, `Db32Dict`, and
+ * `Db32SortedArray`.
+ *
+ * Same as `_check_bin_len()`, except the Python exception refers to the
+ * *numbytes* argument rather than to the length of a *data* argument.
+ */
+static bool
+_check_numbytes(const size_t numbytes)
+{
+    if (numbytes < 5 || numbytes > MAX_BIN_LEN) {
+        PyErr_Format(PyExc_ValueError,
+            "numbytes is %u, need 5 <= numbytes <= %u", numbytes, MAX_BIN_LEN
+        );
+        return false;
+    }
+    if (numbytes % 5 != 0) {
+        PyErr_Format(PyExc_ValueError,
+            "numbytes is %u, need numbytes % 5 == 0", numbytes
+        );
+        return false;
+    }
+    return true;
+}
+
+
 /*
  * _handle_invalid_dbase32(): handle a decoding or validation error.
  *
- * Used by `db32dec()`, `check_db32()`, and `_check_join()`.
+ * Used by `db32dec()`, `check_db32()`, `_step()`, `db32_cmp()`, `_check_text()`,
+ * and `_check_join()`.
  *
  * Both `_decode()` and `_validate()` return 0 on success or 224 when the text
  * in question contains invalid Dbase32 characters.  Any other status should be
@@ -409,16 +553,7 @@ db32enc(PyObject *self, PyObject *args)
     }
 
     /* Validate length of binary ID */
-    if (bin_len < 5 || bin_len > MAX_BIN_LEN) {
-        PyErr_Format(PyExc_ValueError,
-            "len(data) is %u, need 5 <= len(data) <= %u", bin_len, MAX_BIN_LEN
-        );
-        return NULL;
-    }
-    if (bin_len % 5 != 0) {
-        PyErr_Format(PyExc_ValueError,
-            "len(data) is %u, need len(data) % 5 == 0", bin_len
-        );
+    if (! _check_bin_len(bin_len)) {
         return NULL;
     }
 
@@ -540,286 +675,4928 @@ check_db32(PyObject *self, PyObject *args)
 
 
 /*
- * C implementation of `dbase32.random_id()`.
+ * _step(): internal helper for successor/predecessor arithmetic.
+ *
+ * Used by `db32_succ()` and `db32_pred()`.
+ *
+ * Because the Dbase32 alphabet is in sorted order, adding or subtracting one
+ * from the decoded value can be done by carrying directly over the encoded
+ * digits, with no need to decode and then re-encode.
  */
 static PyObject *
-random_id(PyObject *self, PyObject *args, PyObject *kw)
+_step(PyObject *args, const char *format, const bool up)
 {
-    static char *keys[] = {"numbytes", NULL};
-    size_t bin_len = 15;
     size_t txt_len = 0;
-    uint8_t *bin_buf = NULL;
+    const uint8_t *src_buf = NULL;
     uint8_t *txt_buf = NULL;
-    PyObject *ret = NULL;
     uint8_t status = 1;
+    uint8_t r;
+    size_t i;
+    PyObject *ret = NULL;
 
-    /* Parse arguments */
-    if (!PyArg_ParseTupleAndKeywords(args, kw, "|n:random_id", keys, &bin_len)) {
+    /* Parse args */
+    if (!PyArg_ParseTuple(args, format, &src_buf, &txt_len)) {
         return NULL;
     }
 
-    /* Validate numbytes (bin_len) */
-    if (bin_len < 5 || bin_len > MAX_BIN_LEN) {
-        PyErr_Format(PyExc_ValueError,
-            "numbytes is %u, need 5 <= numbytes <= %u", bin_len, MAX_BIN_LEN
-        );
-        return NULL;
-    }
-    if (bin_len % 5 != 0) {
-        PyErr_Format(PyExc_ValueError,
-            "numbytes is %u, need numbytes % 5 == 0", bin_len
-        );
+    /* Validate length and content of ID */
+    if (! _check_txt_len(txt_len)) {
         return NULL;
     }
-
-    /* Allocate temporary buffer for binary ID */
-    bin_buf = (uint8_t *)calloc(bin_len, sizeof(uint8_t));
-    if (bin_buf == NULL) {
-        return PyErr_NoMemory();
-    }
-
-    /* Get random bytes from /dev/urandom */
-    if (_PyOS_URandom(bin_buf, (ssize_t)bin_len) != 0) {
-        free(bin_buf);
+    status = _validate(src_buf, txt_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, PyTuple_GetItem(args, 0));
         return NULL;
     }
 
-    /* Allocate destination buffer */
-    txt_len = bin_len * 8 / 5;
+    /* Allocate destination buffer and copy the (now validated) ID into it */
     ret = PyUnicode_New((ssize_t)txt_len, DB32_END);
-    if (ret == NULL ) {
-        free(bin_buf);
+    if (ret == NULL) {
         return NULL;
     }
     txt_buf = (uint8_t *)PyUnicode_1BYTE_DATA(ret);
+    memcpy(txt_buf, src_buf, txt_len);
 
-    /* Encode random ID */
-    status = _encode(bin_buf, bin_len, txt_buf, txt_len);
-    free(bin_buf);
-    if (status != 0) {
-        Py_CLEAR(ret);
-        Py_FatalError("dbase32 internal error in random_id()");
+    /* Carry from the least significant digit */
+    for (i = txt_len; i > 0; i--) {
+        r = _ROTATE(i - 1);
+        if (up && r < 31) {
+            txt_buf[i - 1] = DB32_FORWARD[r + 1];
+            return ret;
+        }
+        if (!up && r > 0) {
+            txt_buf[i - 1] = DB32_FORWARD[r - 1];
+            return ret;
+        }
+        txt_buf[i - 1] = DB32_FORWARD[up ? 0 : 31];
     }
-    return ret;
+
+    /* Every digit carried, so the result doesn't fit in len(text) */
+    Py_CLEAR(ret);
+    PyErr_Format(PyExc_ValueError, "%R has no %s",
+        PyTuple_GetItem(args, 0), up ? "successor" : "predecessor"
+    );
+    return NULL;
 }
 
 
 /*
- * C implementation of `dbase32.time_id()`.
+ * C implementation of `dbase32.db32_succ()`.
  */
 static PyObject *
-time_id(PyObject *self, PyObject *args, PyObject *kw)
+db32_succ(PyObject *self, PyObject *args)
 {
-    static char *keys[] = {"timestamp", NULL};
-    double timestamp = -1;
-    uint32_t ts = 0;
-    uint8_t *bin_buf = NULL;
-    uint8_t *txt_buf = NULL;
-    PyObject *ret = NULL;
-    uint8_t status = 1;
+    return _step(args, "s#:db32_succ", true);
+}
 
-    /* Parse arguments */
-    if (!PyArg_ParseTupleAndKeywords(args, kw, "|d:time_id", keys, &timestamp)) {
-        return NULL;
-    }
-    if (timestamp < 0) {
-        timestamp = (double)time(NULL);
-    }
 
-    /* Allocate temporary buffer for binary ID */
-    bin_buf = (uint8_t *)calloc(15, sizeof(uint8_t));
-    if (bin_buf == NULL) {
-        return PyErr_NoMemory();
-    }
+/*
+ * C implementation of `dbase32.db32_pred()`.
+ */
+static PyObject *
+db32_pred(PyObject *self, PyObject *args)
+{
+    return _step(args, "s#:db32_pred", false);
+}
 
-    /* First 4 bytes are from timestamp */
-    ts = (uint32_t)timestamp;
-    bin_buf[0] = (ts >> 24) & 255;
-    bin_buf[1] = (ts >> 16) & 255;
-    bin_buf[2] = (ts >>  8) & 255;
-    bin_buf[3] = ts & 255;
 
-    /* Next 11 bytes are from os.urandom() */
-    if (_PyOS_URandom(bin_buf + 4, 15) != 0) {
-        free(bin_buf);
-        return NULL;
-    }
+/*
+ * _compare(): compare a valid Dbase32 ID against a binary ID.
+ *
+ * Used by `db32_cmp()` and `db32_bisect()`.
+ *
+ * Returns -1, 0, or 1 according to whether `txt_buf` (once decoded) would sort
+ * before, equal to, or after `bin_buf`.
+ *
+ * Because the Dbase32 alphabet is in sorted order, each 8 character block of
+ * `txt_buf` can be directly compared against the corresponding 5 byte block of
+ * `bin_buf` as a 40-bit integer, and we stop at the first block that differs.
+ *
+ * Both lengths must already be checked and `txt_buf` must already be validated.
+ */
+static int
+_compare(const uint8_t *txt_buf, const size_t txt_len,
+         const uint8_t *bin_buf, const size_t bin_len)
+{
+    size_t block, count;
+    uint64_t a, b;
 
-    /* Allocate destination buffer */
-    ret = PyUnicode_New(24, DB32_END);
-    if (ret == NULL ) {
-        free(bin_buf);
-        return NULL;
+    count = (txt_len / 8 < bin_len / 5) ? txt_len / 8 : bin_len / 5;
+    for (block = 0; block < count; block++) {
+        /* Pack 40 bits from the text (5 bits at a time) */
+        a = _ROTATE(0);
+        a = _ROTATE(1) | (a << 5);
+        a = _ROTATE(2) | (a << 5);
+        a = _ROTATE(3) | (a << 5);
+        a = _ROTATE(4) | (a << 5);
+        a = _ROTATE(5) | (a << 5);
+        a = _ROTATE(6) | (a << 5);
+        a = _ROTATE(7) | (a << 5);
+
+        /* Pack 40 bits from the binary (8 bits at a time) */
+        b = bin_buf[0];
+        b = bin_buf[1] | (b << 8);
+        b = bin_buf[2] | (b << 8);
+        b = bin_buf[3] | (b << 8);
+        b = bin_buf[4] | (b << 8);
+
+        if (a != b) {
+            return (a < b) ? -1 : 1;
+        }
+
+        /* Move the pointers */
+        txt_buf += 8;
+        bin_buf += 5;
     }
-    txt_buf = (uint8_t *)PyUnicode_1BYTE_DATA(ret);
 
-    /* Encode time ID */
-    status = _encode(bin_buf, 15, txt_buf, 24);
-    free(bin_buf);
-    if (status != 0) {
-        Py_CLEAR(ret);
-        Py_FatalError("dbase32 internal error in time_id()");
+    /* Common prefix is equal, so the shorter ID sorts first */
+    if (txt_len / 8 == bin_len / 5) {
+        return 0;
     }
-    return ret;
+    return (txt_len / 8 < bin_len / 5) ? -1 : 1;
 }
 
 
 /*
- * _check_join(): internal helper for join functions.
+ * _get_text(): get the UTF-8 buffer from a `str` or `bytes` object.
  *
- * Used by `db32_join()` and `db32_join_2()`.
+ * Used by `_check_text()`, `_decode_key()`, `time_id_timestamps()`, and
+ * `Db32Id`.
+ *
+ * This is the equivalent of the "s#" format for objects that don't arrive
+ * through an argument tuple (for example, items in a sequence).
+ *
+ * Returns `true` on success, or sets a Python exception and returns `false`.
  */
-static PyObject *
-_check_join(const char *name, PyObject *args)
+static bool
+_get_text(PyObject *text, const uint8_t **txt_buf, size_t *txt_len)
 {
-    PyObject *id = NULL;
-    const uint8_t *id_buf = NULL;
-    size_t id_len = 0;
-    uint8_t status = 1;
+    ssize_t len = 0;
 
-    if (name == NULL || args == NULL || Py_TYPE(args) != &PyTuple_Type) {
-        Py_FatalError("_check_join(): bad internal call");
+    if (PyUnicode_Check(text)) {
+        *txt_buf = (const uint8_t *)PyUnicode_AsUTF8AndSize(text, &len);
+        if (*txt_buf == NULL) {
+            return false;
+        }
     }
-    if (PyTuple_GET_SIZE(args) < 1) {
+    else if (PyBytes_Check(text)) {
+        *txt_buf = (const uint8_t *)PyBytes_AS_STRING(text);
+        len = PyBytes_GET_SIZE(text);
+    }
+    else {
         PyErr_Format(PyExc_TypeError,
-            "%s() requires at least one argument", name
+            "need a str or bytes instance; got a %R: %R", Py_TYPE(text), text
         );
-        return NULL;
+        return false;
     }
+    *txt_len = (size_t)len;
+    return true;
+}
 
-    /* Make sure `id` is an ASCII str */
-    id = PyTuple_GetItem(args, PyTuple_GET_SIZE(args) - 1);
-    if (id == NULL) {
-        return NULL;
+
+/*
+ * _check_text(): get a validated Dbase32 ID from a `str` or `bytes` object.
+ *
+ * Used by `db32_bisect()`.
+ *
+ * Returns `true` on success, or sets a Python exception and returns `false`.
+ */
+static bool
+_check_text(PyObject *text, const uint8_t **txt_buf, size_t *txt_len)
+{
+    uint8_t status = 1;
+
+    if (! _get_text(text, txt_buf, txt_len)) {
+        return false;
     }
-    if (Py_TYPE(id) != &PyUnicode_Type) {
-        PyErr_Format(PyExc_TypeError,
-            "_id: need a %R; got a %R: %R",
+    if (! _check_txt_len(*txt_len)) {
+        return false;
+    }
+    status = _validate(*txt_buf, *txt_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, text);
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * C implementation of `dbase32.db32_cmp()`.
+ */
+static PyObject *
+db32_cmp(PyObject *self, PyObject *args)
+{
+    size_t txt_len = 0;
+    size_t bin_len = 0;
+    const uint8_t *txt_buf = NULL;
+    const uint8_t *bin_buf = NULL;
+    uint8_t status = 1;
+
+    /* Parse args */
+    if (!PyArg_ParseTuple(args, "s#y#:db32_cmp",
+            &txt_buf, &txt_len, &bin_buf, &bin_len)) {
+        return NULL;
+    }
+
+    /* Validate text and binary IDs */
+    if (! _check_txt_len(txt_len)) {
+        return NULL;
+    }
+    status = _validate(txt_buf, txt_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, PyTuple_GetItem(args, 0));
+        return NULL;
+    }
+    if (! _check_bin_len(bin_len)) {
+        return NULL;
+    }
+
+    return PyLong_FromLong(_compare(txt_buf, txt_len, bin_buf, bin_len));
+}
+
+
+/*
+ * C implementation of `dbase32.db32_bisect()`.
+ */
+static PyObject *
+db32_bisect(PyObject *self, PyObject *args)
+{
+    PyObject *texts = NULL;
+    PyObject *seq = NULL;
+    PyObject **items = NULL;
+    size_t bin_len = 0;
+    const uint8_t *bin_buf = NULL;
+    const uint8_t *txt_buf = NULL;
+    size_t txt_len = 0;
+    ssize_t lo, hi, mid;
+    PyObject *ret = NULL;
+
+    /* Parse args */
+    if (!PyArg_ParseTuple(args, "Oy#:db32_bisect", &texts, &bin_buf, &bin_len)) {
+        return NULL;
+    }
+    if (! _check_bin_len(bin_len)) {
+        return NULL;
+    }
+    seq = PySequence_Fast(texts, "texts must be a sequence");
+    if (seq == NULL) {
+        return NULL;
+    }
+
+    /* Only the IDs we actually probe get validated */
+    items = PySequence_Fast_ITEMS(seq);
+    lo = 0;
+    hi = PySequence_Fast_GET_SIZE(seq);
+    while (lo < hi) {
+        mid = lo + (hi - lo) / 2;
+        if (! _check_text(items[mid], &txt_buf, &txt_len)) {
+            goto cleanup;
+        }
+        if (_compare(txt_buf, txt_len, bin_buf, bin_len) < 0) {
+            lo = mid + 1;
+        }
+        else {
+            hi = mid;
+        }
+    }
+    ret = PyLong_FromSsize_t(lo);
+
+cleanup:
+    Py_CLEAR(seq);
+    return ret;
+}
+
+
+/*
+ * _pack_be(): write the low `size` bytes of `value` to `buf`, big-endian.
+ *
+ * Used by `time_id()`, `time_id_ms()`, `time_ids()`, `time_id_range()`,
+ * `Db32SortedArray`, `IdGenerator`, and `NodeIdGenerator`.
+ *
+ * Big-endian timestamps make the binary IDs (and so the Dbase32 IDs) sort by
+ * time.
+ */
+static void
+_pack_be(uint8_t *buf, uint64_t value, const size_t size)
+{
+    size_t i = size;
+    while (i > 0) {
+        i--;
+        buf[i] = value & 255;
+        value >>= 8;
+    }
+}
+
+
+/*
+ * _clamp_ts(): clamp a timestamp to [0, 2**32], truncating like `time_id()`.
+ *
+ * Used by `time_id_range()` and `Db32SortedArray`.
+ */
+static uint64_t
+_clamp_ts(const double timestamp)
+{
+    if (!(timestamp > 0)) {
+        return 0;
+    }
+    if (timestamp >= 4294967296.0) {
+        return 4294967296ull;
+    }
+    return (uint64_t)timestamp;
+}
+
+
+/*
+ * Optional entropy pool.
+ *
+ * When enabled with `set_entropy_pool()`, small requests for random bytes are
+ * served from a buffer that is refilled with a single `_PyOS_URandom()` call
+ * whenever it runs low.  Handed out bytes are zeroed in the pool.
+ *
+ * The pool is only touched while the GIL is held.  However, `_PyOS_URandom()`
+ * can release the GIL, so a refill goes into a fresh buffer that is swapped in
+ * afterward, and only when `generation` shows the pool wasn't reconfigured (or
+ * emptied) in the meantime.  A `pthread_atfork()` child handler empties the
+ * pool so a forked child never hands out the same bytes as its parent.
+ */
+#define _POOL_MAX_SIZE 16777216
+
+static struct {
+    uint8_t *buf;
+    size_t size;
+    size_t available;
+    size_t generation;
+    size_t refills;
+    size_t hits;
+    size_t reseeds;
+} _pool = {NULL, 0, 0, 0, 0, 0, 0};
+
+static PyStructSequence_Field _pool_stats_fields[] = {
+    {"size", "size of the pool in bytes, or 0 when disabled"},
+    {"available", "bytes currently available in the pool"},
+    {"refills", "number of times the pool was refilled"},
+    {"hits", "number of requests served from the pool"},
+    {"reseeds", "number of times the pool was emptied after a fork"},
+    {NULL}
+};
+
+static PyStructSequence_Desc _pool_stats_desc = {
+    "dbase32.EntropyPoolStats",
+    NULL,
+    _pool_stats_fields,
+    5
+};
+
+static PyTypeObject EntropyPoolStatsType;
+
+/* Never reset, unlike `_pool.reseeds`; used by `NodeIdGenerator` */
+static size_t _fork_count = 0;
+
+
+static void
+_pool_after_fork(void)
+{
+    _pool.available = 0;
+    _pool.generation++;
+    _pool.reseeds++;
+    _fork_count++;
+}
+
+
+/*
+ * _get_random(): fill `dst` with `len` random bytes.
+ *
+ * Used by `random_id()`, `time_id()`, `time_id_ms()`, `IdGenerator`, and
+ * `NodeIdGenerator`.
+ *
+ * Returns 0 on success, or sets a Python exception and returns -1.
+ */
+static int
+_get_random(uint8_t *dst, const size_t len)
+{
+    size_t size, generation;
+    uint8_t *fresh = NULL;
+
+    if (_pool.size == 0 || len > _pool.size) {
+        return _PyOS_URandom(dst, (ssize_t)len);
+    }
+    if (_pool.available < len) {
+        size = _pool.size;
+        generation = _pool.generation;
+        fresh = PyMem_Malloc(size);
+        if (fresh == NULL) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        if (_PyOS_URandom(fresh, (ssize_t)size) != 0) {
+            PyMem_Free(fresh);
+            return -1;
+        }
+        if (generation != _pool.generation) {
+            /* Reconfigured while the GIL was released, so don't use it */
+            PyMem_Free(fresh);
+            return _PyOS_URandom(dst, (ssize_t)len);
+        }
+        PyMem_Free(_pool.buf);
+        _pool.buf = fresh;
+        _pool.available = size;
+        _pool.refills++;
+    }
+    _pool.available -= len;
+    memcpy(dst, _pool.buf + _pool.available, len);
+    memset(_pool.buf + _pool.available, 0, len);
+    _pool.hits++;
+    return 0;
+}
+
+
+/*
+ * C implementation of `dbase32.set_entropy_pool()`.
+ */
+static PyObject *
+set_entropy_pool(PyObject *self, PyObject *args)
+{
+    ssize_t size = 0;
+
+    if (!PyArg_ParseTuple(args, "n:set_entropy_pool", &size)) {
+        return NULL;
+    }
+    if (size != 0 && (size < MAX_BIN_LEN || size > _POOL_MAX_SIZE)) {
+        PyErr_Format(PyExc_ValueError,
+            "size is %zd, need size == 0 or %d <= size <= %d",
+            size, MAX_BIN_LEN, _POOL_MAX_SIZE
+        );
+        return NULL;
+    }
+    if (_pool.buf != NULL) {
+        memset(_pool.buf, 0, _pool.size);
+        PyMem_Free(_pool.buf);
+    }
+    _pool.buf = NULL;
+    _pool.size = (size_t)size;
+    _pool.available = 0;
+    _pool.generation++;
+    _pool.refills = _pool.hits = _pool.reseeds = 0;
+    Py_RETURN_NONE;
+}
+
+
+/*
+ * C implementation of `dbase32.entropy_pool_stats()`.
+ */
+static PyObject *
+entropy_pool_stats(PyObject *self, PyObject *unused)
+{
+    PyObject *stats = PyStructSequence_New(&EntropyPoolStatsType);
+    if (stats == NULL) {
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(stats, 0, PyLong_FromSize_t(_pool.size));
+    PyStructSequence_SET_ITEM(stats, 1, PyLong_FromSize_t(_pool.available));
+    PyStructSequence_SET_ITEM(stats, 2, PyLong_FromSize_t(_pool.refills));
+    PyStructSequence_SET_ITEM(stats, 3, PyLong_FromSize_t(_pool.hits));
+    PyStructSequence_SET_ITEM(stats, 4, PyLong_FromSize_t(_pool.reseeds));
+    if (PyErr_Occurred()) {
+        Py_DECREF(stats);
+        return NULL;
+    }
+    return stats;
+}
+
+
+/*
+ * C implementation of `dbase32.random_id()`.
+ */
+static PyObject *
+random_id(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"numbytes", NULL};
+    size_t bin_len = 15;
+    size_t txt_len = 0;
+    uint8_t bin_buf[MAX_BIN_LEN];
+    uint8_t *txt_buf = NULL;
+    PyObject *ret = NULL;
+    uint8_t status = 1;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|n:random_id", keys, &bin_len)) {
+        return NULL;
+    }
+
+    /* Validate numbytes (bin_len) */
+    if (! _check_numbytes(bin_len)) {
+        return NULL;
+    }
+
+    /* Get random bytes from /dev/urandom */
+    if (_get_random(bin_buf, bin_len) != 0) {
+        return NULL;
+    }
+
+    /* Allocate destination buffer */
+    txt_len = bin_len * 8 / 5;
+    ret = PyUnicode_New((ssize_t)txt_len, DB32_END);
+    if (ret == NULL ) {
+        return NULL;
+    }
+    txt_buf = (uint8_t *)PyUnicode_1BYTE_DATA(ret);
+
+    /* Encode random ID */
+    status = _encode(bin_buf, bin_len, txt_buf, txt_len);
+    if (status != 0) {
+        Py_CLEAR(ret);
+        Py_FatalError("dbase32 internal error in random_id()");
+    }
+    return ret;
+}
+
+
+/*
+ * C implementation of `dbase32.time_id()`.
+ */
+static PyObject *
+time_id(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"timestamp", NULL};
+    double timestamp = -1;
+    uint32_t ts = 0;
+    uint8_t bin_buf[15];
+    uint8_t *txt_buf = NULL;
+    PyObject *ret = NULL;
+    uint8_t status = 1;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|d:time_id", keys, &timestamp)) {
+        return NULL;
+    }
+    if (timestamp < 0) {
+        timestamp = (double)time(NULL);
+    }
+
+    /* First 4 bytes are from timestamp */
+    ts = (uint32_t)timestamp;
+    _pack_be(bin_buf, ts, 4);
+
+    /* Next 11 bytes are from os.urandom() */
+    if (_get_random(bin_buf + 4, 11) != 0) {
+        return NULL;
+    }
+
+    /* Allocate destination buffer */
+    ret = PyUnicode_New(24, DB32_END);
+    if (ret == NULL ) {
+        return NULL;
+    }
+    txt_buf = (uint8_t *)PyUnicode_1BYTE_DATA(ret);
+
+    /* Encode time ID */
+    status = _encode(bin_buf, 15, txt_buf, 24);
+    if (status != 0) {
+        Py_CLEAR(ret);
+        Py_FatalError("dbase32 internal error in time_id()");
+    }
+    return ret;
+}
+
+
+/*
+ * _handle_bad_timestamp(): raise a ValueError for an out-of-range timestamp.
+ *
+ * Used by `time_id_ms()`.
+ */
+static void
+_handle_bad_timestamp(const double timestamp)
+{
+    PyObject *obj = PyFloat_FromDouble(timestamp);
+    if (obj != NULL) {
+        PyErr_Format(PyExc_ValueError,
+            "timestamp is %R, need timestamp < 2**48 / 1000", obj
+        );
+        Py_DECREF(obj);
+    }
+}
+
+
+/*
+ * C implementation of `dbase32.time_id_ms()`.
+ */
+static PyObject *
+time_id_ms(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"timestamp", NULL};
+    double timestamp = -1;
+    uint64_t ms = 0;
+    struct timespec now;
+    uint8_t bin_buf[15];
+    PyObject *ret = NULL;
+    uint8_t status = 1;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|d:time_id_ms", keys,
+            &timestamp)) {
+        return NULL;
+    }
+    if (timestamp < 0) {
+        if (clock_gettime(CLOCK_REALTIME, &now) != 0) {
+            return PyErr_SetFromErrno(PyExc_OSError);
+        }
+        ms = (uint64_t)now.tv_sec * 1000 + (uint64_t)now.tv_nsec / 1000000;
+    }
+    else if (timestamp * 1000 < 281474976710656.0) {
+        ms = (uint64_t)(timestamp * 1000);
+    }
+    else {
+        _handle_bad_timestamp(timestamp);
+        return NULL;
+    }
+
+    /* First 6 bytes are from the timestamp in milliseconds */
+    _pack_be(bin_buf, ms, 6);
+
+    /* Next 9 bytes are from os.urandom() */
+    if (_get_random(bin_buf + 6, 9) != 0) {
+        return NULL;
+    }
+
+    /* Allocate destination buffer and encode */
+    ret = PyUnicode_New(24, DB32_END);
+    if (ret == NULL) {
+        return NULL;
+    }
+    status = _encode(bin_buf, 15, PyUnicode_1BYTE_DATA(ret), 24);
+    if (status != 0) {
+        Py_CLEAR(ret);
+        Py_FatalError("dbase32 internal error in time_id_ms()");
+    }
+    return ret;
+}
+
+
+/*
+ * _check_count(): validate the number of IDs requested from a batch function.
+ *
+ * Used by `random_ids()` and `time_ids()`.
+ *
+ * Also makes sure `count * size` random bytes can be requested at once.
+ *
+ * Returns `true` on success, or sets a Python exception and returns `false`.
+ */
+static bool
+_check_count(const ssize_t count, const size_t size)
+{
+    if (count < 0) {
+        PyErr_Format(PyExc_ValueError, "n is %zd, need n >= 0", count);
+        return false;
+    }
+    if ((size_t)count > (size_t)PY_SSIZE_T_MAX / size) {
+        PyErr_Format(PyExc_OverflowError, "n is %zd, too large", count);
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * _random_ids(): build a list of `count` encoded IDs from one random buffer.
+ *
+ * Used by `random_ids()` and `time_ids()`.
+ *
+ * All the randomness (`rand_len` bytes per ID) comes from a single call to
+ * `_PyOS_URandom()`.  Each binary ID is `prefix` (if any) followed by the next
+ * `rand_len` random bytes.
+ */
+static PyObject *
+_random_ids(const ssize_t count, const uint8_t *prefix, const size_t prefix_len,
+            const size_t rand_len)
+{
+    const size_t bin_len = prefix_len + rand_len;
+    const size_t txt_len = bin_len * 8 / 5;
+    uint8_t bin_buf[MAX_BIN_LEN];
+    uint8_t *rand_buf = NULL;
+    PyObject *ret = NULL;
+    PyObject *text = NULL;
+    ssize_t i;
+
+    rand_buf = PyMem_Malloc((size_t)count * rand_len + 1);
+    if (rand_buf == NULL) {
+        return PyErr_NoMemory();
+    }
+    if (count > 0
+            && _PyOS_URandom(rand_buf, count * (ssize_t)rand_len) != 0) {
+        goto error;
+    }
+    ret = PyList_New(count);
+    if (ret == NULL) {
+        goto error;
+    }
+    memcpy(bin_buf, prefix, prefix_len);
+    for (i = 0; i < count; i++) {
+        memcpy(bin_buf + prefix_len, rand_buf + (size_t)i * rand_len, rand_len);
+        text = PyUnicode_New((ssize_t)txt_len, DB32_END);
+        if (text == NULL) {
+            goto error;
+        }
+        if (_encode(bin_buf, bin_len, PyUnicode_1BYTE_DATA(text), txt_len) != 0) {
+            Py_FatalError("dbase32 internal error in _random_ids()");
+        }
+        PyList_SET_ITEM(ret, i, text);
+    }
+    PyMem_Free(rand_buf);
+    return ret;
+
+error:
+    PyMem_Free(rand_buf);
+    Py_CLEAR(ret);
+    return NULL;
+}
+
+
+/*
+ * C implementation of `dbase32.random_ids()`.
+ */
+static PyObject *
+random_ids(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"n", "numbytes", NULL};
+    ssize_t count = 0;
+    size_t bin_len = 15;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "n|n:random_ids", keys,
+            &count, &bin_len)) {
+        return NULL;
+    }
+    if (! _check_numbytes(bin_len) || ! _check_count(count, bin_len)) {
+        return NULL;
+    }
+    return _random_ids(count, NULL, 0, bin_len);
+}
+
+
+/*
+ * C implementation of `dbase32.time_ids()`.
+ */
+static PyObject *
+time_ids(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"n", "timestamp", NULL};
+    ssize_t count = 0;
+    double timestamp = -1;
+    uint8_t prefix[4];
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "n|d:time_ids", keys,
+            &count, &timestamp)) {
+        return NULL;
+    }
+    if (! _check_count(count, 11)) {
+        return NULL;
+    }
+    /* Like `int(timestamp) & 0xFFFFFFFF` in Python, without the undefined
+       behaviour of casting an out of range double */
+    if (! (timestamp >= 0)) {
+        timestamp = (double)time(NULL);
+    }
+    else if (isinf(timestamp)) {
+        PyErr_SetString(PyExc_OverflowError,
+            "cannot convert float infinity to integer"
+        );
+        return NULL;
+    }
+    _pack_be(prefix, (uint64_t)fmod(timestamp, 4294967296.0), 4);
+    return _random_ids(count, prefix, 4, 11);
+}
+
+
+/*
+ * _check_join_id(): make sure `id` is an ASCII `str` and valid Dbase32.
+ *
+ * Used by `_check_join()` and `PathBuilder`.
+ */
+static bool
+_check_join_id(PyObject *id)
+{
+    const uint8_t *id_buf = NULL;
+    size_t id_len = 0;
+    uint8_t status = 1;
+
+    /* Make sure `id` is an ASCII str */
+    if (Py_TYPE(id) != &PyUnicode_Type) {
+        PyErr_Format(PyExc_TypeError,
+            "_id: need a %R; got a %R: %R",
             (PyObject *)&PyUnicode_Type, Py_TYPE(id), id
         );
+        return false;
+    }
+    if (PyUnicode_READY(id) != 0) {
+        return false;
+    }
+    if (PyUnicode_MAX_CHAR_VALUE(id) != 127) {
+        PyErr_Format(PyExc_ValueError, "_id is not ASCII: %R", id);
+        return false;
+    }
+
+    /* Make sure `id` is valid Dbase32 */
+    id_buf = PyUnicode_1BYTE_DATA(id);
+    id_len = (size_t)PyUnicode_GET_LENGTH(id);
+    if (! _check_txt_len(id_len)) {
+        return false;
+    }
+    status = _validate(id_buf, id_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, id);
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * _check_join(): internal helper for join functions.
+ *
+ * Used by `db32_join()`, `db32_join_2()`, and `db32_join_n()`.
+ */
+static PyObject *
+_check_join(const char *name, PyObject *args)
+{
+    PyObject *id = NULL;
+
+    if (name == NULL || args == NULL || Py_TYPE(args) != &PyTuple_Type) {
+        Py_FatalError("_check_join(): bad internal call");
+    }
+    if (PyTuple_GET_SIZE(args) < 1) {
+        PyErr_Format(PyExc_TypeError,
+            "%s() requires at least one argument", name
+        );
+        return NULL;
+    }
+    id = PyTuple_GET_ITEM(args, PyTuple_GET_SIZE(args) - 1);
+    if (! _check_join_id(id)) {
+        return NULL;
+    }
+    return id;
+}
+
+
+/*
+ * _decode_ts(): get the timestamp from a `time_id()` ID.
+ *
+ * Used by `time_id_timestamp()` and `time_id_timestamps()`.
+ *
+ * Only the first 7 characters (35 bits) are decoded, the remaining 17 are just
+ * validated.  `txt_buf` must be 24 bytes long.
+ *
+ * Returns 0 on success, 224 when txt_buf contains invalid characters.
+ */
+static uint8_t
+_decode_ts(const uint8_t *txt_buf, uint32_t *ts)
+{
+    uint64_t taxi = 0;
+    uint8_t r = 0;
+    size_t i;
+
+    for (i = 0; i < 7; i++) {
+        r |= _ROTATE(i);
+        taxi = (taxi << 5) | (_ROTATE(i) & 31);
+    }
+    for (; i < 24; i++) {
+        r |= _ROTATE(i);
+    }
+    *ts = (uint32_t)(taxi >> 3);
+    return (r & 224);
+}
+
+
+/*
+ * _check_time_id(): common length and content checks for `time_id()` IDs.
+ *
+ * Used by `time_id_timestamp()` and `time_id_timestamps()`.
+ *
+ * Returns `true` on success, or sets a Python exception and returns `false`.
+ */
+static bool
+_check_time_id(PyObject *text, const uint8_t *txt_buf, const size_t txt_len,
+               uint32_t *ts)
+{
+    uint8_t status = 1;
+
+    if (! _check_txt_len(txt_len)) {
+        return false;
+    }
+    if (txt_len != 24) {
+        PyErr_Format(PyExc_ValueError,
+            "len(text) is %u, need len(text) == 24", txt_len
+        );
+        return false;
+    }
+    status = _decode_ts(txt_buf, ts);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, text);
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * C implementation of `dbase32.time_id_timestamp()`.
+ */
+static PyObject *
+time_id_timestamp(PyObject *self, PyObject *args)
+{
+    const uint8_t *txt_buf = NULL;
+    size_t txt_len = 0;
+    uint32_t ts = 0;
+
+    if (!PyArg_ParseTuple(args, "s#:time_id_timestamp", &txt_buf, &txt_len)) {
+        return NULL;
+    }
+    if (! _check_time_id(PyTuple_GetItem(args, 0), txt_buf, txt_len, &ts)) {
+        return NULL;
+    }
+    return PyLong_FromUnsignedLong(ts);
+}
+
+
+/*
+ * C implementation of `dbase32.time_id_timestamps()`.
+ */
+static PyObject *
+time_id_timestamps(PyObject *self, PyObject *args)
+{
+    PyObject *texts = NULL;
+    PyObject *seq = NULL;
+    PyObject *item = NULL;
+    PyObject *data = NULL;
+    PyObject *array_module = NULL;
+    PyObject *ret = NULL;
+    unsigned int *buf = NULL;
+    const uint8_t *txt_buf = NULL;
+    size_t txt_len = 0;
+    uint32_t ts = 0;
+    ssize_t count, i;
+
+    if (!PyArg_ParseTuple(args, "O:time_id_timestamps", &texts)) {
+        return NULL;
+    }
+    seq = PySequence_Fast(texts, "texts must be a sequence");
+    if (seq == NULL) {
+        return NULL;
+    }
+    count = PySequence_Fast_GET_SIZE(seq);
+    data = PyBytes_FromStringAndSize(NULL, count * (ssize_t)sizeof(unsigned int));
+    if (data == NULL) {
+        goto cleanup;
+    }
+    buf = (unsigned int *)PyBytes_AS_STRING(data);
+    for (i = 0; i < count; i++) {
+        item = PySequence_Fast_GET_ITEM(seq, i);
+        if (! _get_text(item, &txt_buf, &txt_len)
+                || ! _check_time_id(item, txt_buf, txt_len, &ts)) {
+            goto cleanup;
+        }
+        buf[i] = ts;
+    }
+    array_module = PyImport_ImportModule("array");
+    if (array_module != NULL) {
+        ret = PyObject_CallMethod(array_module, "array", "sO", "I", data);
+    }
+
+cleanup:
+    Py_CLEAR(array_module);
+    Py_CLEAR(data);
+    Py_CLEAR(seq);
+    return ret;
+}
+
+
+/*
+ * _time_id_bound(): build the `time_id()` ID for `ts` with every tail byte set
+ * to `fill`.
+ *
+ * Used by `time_id_range()`.
+ */
+static PyObject *
+_time_id_bound(const uint64_t ts, const uint8_t fill)
+{
+    uint8_t bin_buf[15];
+    PyObject *ret = NULL;
+
+    /* Same layout as `time_id()`: 4 byte timestamp, then 11 tail bytes */
+    _pack_be(bin_buf, ts, 4);
+    memset(bin_buf + 4, fill, 11);
+
+    ret = PyUnicode_New(24, DB32_END);
+    if (ret == NULL) {
+        return NULL;
+    }
+    if (_encode(bin_buf, 15, PyUnicode_1BYTE_DATA(ret), 24) != 0) {
+        Py_CLEAR(ret);
+        Py_FatalError("dbase32 internal error in time_id_range()");
+    }
+    return ret;
+}
+
+
+/*
+ * C implementation of `dbase32.time_id_range()`.
+ */
+static PyObject *
+time_id_range(PyObject *self, PyObject *args)
+{
+    double start_ts, end_ts;
+    uint64_t start, end;
+
+    if (!PyArg_ParseTuple(args, "dd:time_id_range", &start_ts, &end_ts)) {
+        return NULL;
+    }
+    start = _clamp_ts(start_ts);
+    end = _clamp_ts(end_ts);
+    if (end <= start) {
+        PyErr_Format(PyExc_ValueError, "time range [%S, %S) is empty",
+            PyTuple_GET_ITEM(args, 0), PyTuple_GET_ITEM(args, 1)
+        );
+        return NULL;
+    }
+    return Py_BuildValue("(NN)",
+        _time_id_bound(start, 0), _time_id_bound(end - 1, 255)
+    );
+}
+
+
+/*
+ * C implementation of `dbase32.db32_join()`.
+ */
+static PyObject *
+db32_join(PyObject *self, PyObject *args)
+{
+    PyObject *id = _check_join("db32_join", args);
+    if (id == NULL) {
+        return NULL;
+    }
+    if (PyTuple_GET_SIZE(args) == 1) {
+        Py_INCREF(id);
+        return id;
+    }
+    return PyUnicode_Join(_str_slash, args);
+}
+
+
+/*
+ * _parse_levels(): validate the directory levels of a sharded path layout.
+ *
+ * Used by `db32_join_n()` and `PathBuilder`.
+ *
+ * `levels` must be a tuple of ints, each >= 1, summing to less than
+ * `MAX_TXT_LEN`.  When `allow_int` is true, an int `n` is also accepted as
+ * shorthand for `(n,)`.  On success the levels are written to `out` (which
+ * must have room for `MAX_TXT_LEN` items), their count to `count`, and their
+ * sum to `total`.  Whether they fit a particular ID is left to
+ * `_check_levels_fit()`.
+ */
+static bool
+_parse_levels(const char *name, PyObject *levels, const bool allow_int,
+              size_t *out, size_t *count, size_t *total)
+{
+    ssize_t i, level;
+
+    *total = 0;
+    if (allow_int && PyLong_Check(levels)) {
+        level = PyLong_AsSsize_t(levels);
+        if (level == -1 && PyErr_Occurred()) {
+            return false;
+        }
+        if (level < 1 || level >= MAX_TXT_LEN) {
+            PyErr_Format(PyExc_ValueError,
+                "%s is %R, need 1 <= %s < %d", name, levels, name, MAX_TXT_LEN
+            );
+            return false;
+        }
+        out[0] = *total = (size_t)level;
+        *count = 1;
+        return true;
+    }
+    if (Py_TYPE(levels) != &PyTuple_Type) {
+        if (allow_int) {
+            PyErr_Format(PyExc_TypeError,
+                "%s: need a %R or %R; got a %R: %R", name,
+                (PyObject *)&PyLong_Type, (PyObject *)&PyTuple_Type,
+                Py_TYPE(levels), levels
+            );
+        }
+        else {
+            PyErr_Format(PyExc_TypeError,
+                "%s: need a %R; got a %R: %R", name,
+                (PyObject *)&PyTuple_Type, Py_TYPE(levels), levels
+            );
+        }
+        return false;
+    }
+    for (i = 0; i < PyTuple_GET_SIZE(levels); i++) {
+        level = PyNumber_AsSsize_t(PyTuple_GET_ITEM(levels, i), NULL);
+        if (level == -1 && PyErr_Occurred()) {
+            return false;
+        }
+        if (level < 1) {
+            PyErr_Format(PyExc_ValueError,
+                "%s[%zd] is %zd, need %s[%zd] >= 1", name, i, level, name, i
+            );
+            return false;
+        }
+        if (level >= MAX_TXT_LEN || *total + (size_t)level >= MAX_TXT_LEN) {
+            PyErr_Format(PyExc_ValueError,
+                "%s is %R, need sum(%s) < %d", name, levels, name, MAX_TXT_LEN
+            );
+            return false;
+        }
+        *total += (size_t)level;
+        out[i] = (size_t)level;
+    }
+    *count = (size_t)PyTuple_GET_SIZE(levels);
+    return true;
+}
+
+
+/*
+ * _check_levels_fit(): make sure the levels leave a final path component.
+ *
+ * Used by `db32_join_n()` and `PathBuilder`.
+ */
+static bool
+_check_levels_fit(const char *name, PyObject *levels, const size_t total,
+                  PyObject *id)
+{
+    const size_t id_len = (size_t)PyUnicode_GET_LENGTH(id);
+
+    if (total >= id_len) {
+        PyErr_Format(PyExc_ValueError,
+            "%s is %R, need sum(%s) < len(_id) == %zd",
+            name, levels, name, (ssize_t)id_len
+        );
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * _join_levels(): build a path from parent components and a sharded ID.
+ *
+ * Used by `db32_join_2()`, `db32_join_n()`, and `PathBuilder`.
+ *
+ * The ID must already have been checked by `_check_join_id()`, and `levels`
+ * must fit it.  The path is written into a single `PyUnicode_New()`
+ * allocation: the `nparents` components in `parents`, then the ID split into
+ * `levels`.
+ */
+static PyObject *
+_join_levels(PyObject **parents, const ssize_t nparents, PyObject *id,
+             const size_t *levels, const size_t count)
+{
+    const uint8_t *id_buf = PyUnicode_1BYTE_DATA(id);
+    const size_t id_len = (size_t)PyUnicode_GET_LENGTH(id);
+    ssize_t total = (ssize_t)(id_len + count);
+    Py_UCS4 maxchar = DB32_END;
+    PyObject *item = NULL;
+    PyObject *ret = NULL;
+    void *data = NULL;
+    int kind;
+    ssize_t i, pos, len;
+    size_t j, k, start;
+
+    /* Check parents, and measure the result */
+    for (i = 0; i < nparents; i++) {
+        item = parents[i];
+        if (! PyUnicode_Check(item)) {
+            PyErr_Format(PyExc_TypeError,
+                "sequence item %zd: expected str instance, %.80s found",
+                i, Py_TYPE(item)->tp_name
+            );
+            return NULL;
+        }
+        if (PyUnicode_READY(item) != 0) {
+            return NULL;
+        }
+        len = PyUnicode_GET_LENGTH(item);
+        if (len > PY_SSIZE_T_MAX - 1 - total) {
+            PyErr_SetString(PyExc_OverflowError,
+                "join() result is too long for a Python string"
+            );
+            return NULL;
+        }
+        total += len + 1;
+        if (PyUnicode_MAX_CHAR_VALUE(item) > maxchar) {
+            maxchar = PyUnicode_MAX_CHAR_VALUE(item);
+        }
+    }
+
+    /* Single allocation for the whole path */
+    ret = PyUnicode_New(total, maxchar);
+    if (ret == NULL) {
+        return NULL;
+    }
+    kind = PyUnicode_KIND(ret);
+    data = PyUnicode_DATA(ret);
+
+    /* Copy in the parents */
+    pos = 0;
+    for (i = 0; i < nparents; i++) {
+        item = parents[i];
+        len = PyUnicode_GET_LENGTH(item);
+        if (PyUnicode_CopyCharacters(ret, pos, item, 0, len) < 0) {
+            Py_CLEAR(ret);
+            return NULL;
+        }
+        pos += len;
+        PyUnicode_WRITE(kind, data, pos, '/');
+        pos++;
+    }
+
+    /* Copy in the ID, split into levels */
+    start = 0;
+    for (j = 0; j <= count; j++) {
+        len = (ssize_t)(j < count ? levels[j] : id_len - start);
+        if (kind == PyUnicode_1BYTE_KIND) {
+            memcpy((uint8_t *)data + pos, id_buf + start, (size_t)len);
+            pos += len;
+        }
+        else {
+            for (k = start; k < start + (size_t)len; k++, pos++) {
+                PyUnicode_WRITE(kind, data, pos, id_buf[k]);
+            }
+        }
+        start += (size_t)len;
+        if (j < count) {
+            PyUnicode_WRITE(kind, data, pos, '/');
+            pos++;
+        }
+    }
+    if (pos != total || start != id_len) {
+        Py_CLEAR(ret);
+        Py_FatalError("dbase32 internal error in _join_levels()");
+    }
+    return ret;
+}
+
+
+/*
+ * _join_args(): call `_join_levels()` on already checked join arguments.
+ *
+ * Used by `db32_join_2()` and `db32_join_n()`.
+ */
+static PyObject *
+_join_args(PyObject *args, const size_t *levels, const size_t count)
+{
+    const ssize_t nparents = PyTuple_GET_SIZE(args) - 1;
+
+    return _join_levels(&PyTuple_GET_ITEM(args, 0), nparents,
+        PyTuple_GET_ITEM(args, nparents), levels, count
+    );
+}
+
+
+/*
+ * C implementation of `dbase32.db32_join_2()`.
+ */
+static PyObject *
+db32_join_2(PyObject *self, PyObject *args)
+{
+    static const size_t levels[1] = {2};
+
+    if (_check_join("db32_join_2", args) == NULL) {
+        return NULL;
+    }
+    return _join_args(args, levels, 1);
+}
+
+
+/*
+ * C implementation of `dbase32.db32_join_n()`.
+ */
+static PyObject *
+db32_join_n(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static const size_t default_levels[2] = {2, 2};
+    size_t levels[MAX_TXT_LEN];
+    size_t count = 0;
+    size_t total = 0;
+    PyObject *id = NULL;
+    PyObject *levels_obj = NULL;
+    PyObject *key = NULL;
+    PyObject *value = NULL;
+    ssize_t pos = 0;
+
+    /* Only keyword argument is `levels` */
+    if (kw != NULL) {
+        while (PyDict_Next(kw, &pos, &key, &value)) {
+            if (! PyUnicode_Check(key)
+                    || PyUnicode_CompareWithASCIIString(key, "levels") != 0) {
+                PyErr_Format(PyExc_TypeError,
+                    "db32_join_n() got an unexpected keyword argument %R", key
+                );
+                return NULL;
+            }
+            levels_obj = value;
+        }
+    }
+
+    id = _check_join("db32_join_n", args);
+    if (id == NULL) {
+        return NULL;
+    }
+    if (levels_obj == NULL) {
+        return _join_args(args, default_levels, 2);
+    }
+    if (! _parse_levels("levels", levels_obj, false, levels, &count, &total)) {
+        return NULL;
+    }
+    if (! _check_levels_fit("levels", levels_obj, total, id)) {
+        return NULL;
+    }
+    return _join_args(args, levels, count);
+}
+
+
+/*
+ * C implementation of `dbase32.db32_join_time()`.
+ */
+static PyObject *
+db32_join_time(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"parentdir", "_id", "bucket", "width", NULL};
+    PyObject *parentdir = NULL;
+    PyObject *id = NULL;
+    PyObject *parents[3] = {NULL, NULL, NULL};
+    PyObject *ret = NULL;
+    ssize_t bucket = 86400;
+    ssize_t width = 2;
+    const uint8_t *id_buf = NULL;
+    uint8_t bin_buf[5];
+    uint32_t ts = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "OO|nn:db32_join_time", keys,
+            &parentdir, &id, &bucket, &width)) {
+        return NULL;
+    }
+    if (! _check_join_id(id)) {
+        return NULL;
+    }
+    if (PyUnicode_GET_LENGTH(id) != 24) {
+        PyErr_Format(PyExc_ValueError,
+            "len(_id) is %zd, need len(_id) == 24", PyUnicode_GET_LENGTH(id)
+        );
+        return NULL;
+    }
+    if (bucket < 1) {
+        PyErr_Format(PyExc_ValueError,
+            "bucket is %zd, need bucket >= 1", bucket
+        );
+        return NULL;
+    }
+    if (width < 1 || width > 16) {
+        PyErr_Format(PyExc_ValueError,
+            "width is %zd, need 1 <= width <= 16", width
+        );
+        return NULL;
+    }
+
+    /* Bucket name is the first 8 characters of the earliest possible
+     * `time_id()` in the bucket, so buckets sort like the IDs they hold */
+    id_buf = PyUnicode_1BYTE_DATA(id);
+    if (_decode_ts(id_buf, &ts) != 0) {
+        Py_FatalError("dbase32 internal error in db32_join_time()");
+    }
+    _pack_be(bin_buf, ts - ts % (uint64_t)bucket, 4);
+    bin_buf[4] = 0;
+
+    parents[0] = parentdir;
+    parents[1] = PyUnicode_New(8, DB32_END);
+    if (parents[1] == NULL) {
+        goto cleanup;
+    }
+    if (_encode(bin_buf, 5, PyUnicode_1BYTE_DATA(parents[1]), 8) != 0) {
+        Py_FatalError("dbase32 internal error in db32_join_time()");
+    }
+
+    /* Shard on the random tail, so writes spread evenly within a bucket */
+    parents[2] = PyUnicode_FromKindAndData(PyUnicode_1BYTE_KIND,
+        id_buf + 24 - width, width
+    );
+    if (parents[2] == NULL) {
+        goto cleanup;
+    }
+    ret = _join_levels(parents, 3, id, NULL, 0);
+
+cleanup:
+    Py_CLEAR(parents[1]);
+    Py_CLEAR(parents[2]);
+    return ret;
+}
+
+
+/*
+ * _build_paths(): build the path for each ID in `ids`.
+ *
+ * Used by `db32_paths()` and `PathBuilder.paths()`.
+ *
+ * With `_PATHS_STRICT`, the first invalid ID raises an exception.  With
+ * `_PATHS_SKIP`, invalid IDs are left out of the returned list, and with
+ * `_PATHS_NONE` each gets a `None` in its place.  Either way, only the
+ * `TypeError` or `ValueError` from validation is swallowed.
+ */
+#define _PATHS_STRICT 0
+#define _PATHS_SKIP 1
+#define _PATHS_NONE 2
+
+static PyObject *
+_build_paths(PyObject **parentdir, PyObject *layout, const size_t *levels,
+             const size_t count, const size_t total, PyObject *ids,
+             const int mode)
+{
+    PyObject *seq = NULL;
+    PyObject *ret = NULL;
+    PyObject *id = NULL;
+    PyObject *path = NULL;
+    ssize_t i, size;
+
+    seq = PySequence_Fast(ids, "ids must be a sequence");
+    if (seq == NULL) {
+        return NULL;
+    }
+    size = PySequence_Fast_GET_SIZE(seq);
+    ret = PyList_New(mode == _PATHS_SKIP ? 0 : size);
+    if (ret == NULL) {
+        goto cleanup;
+    }
+    for (i = 0; i < size; i++) {
+        id = PySequence_Fast_GET_ITEM(seq, i);
+        path = NULL;
+        if (_check_join_id(id)
+                && _check_levels_fit("layout", layout, total, id)) {
+            path = _join_levels(parentdir, 1, id, levels, count);
+            if (path == NULL) {
+                goto error;
+            }
+        }
+        else if (mode == _PATHS_STRICT || ! (
+                    PyErr_ExceptionMatches(PyExc_ValueError)
+                    || PyErr_ExceptionMatches(PyExc_TypeError))) {
+            goto error;
+        }
+        else {
+            PyErr_Clear();
+        }
+        if (mode == _PATHS_SKIP) {
+            if (path != NULL) {
+                if (PyList_Append(ret, path) != 0) {
+                    Py_CLEAR(path);
+                    goto error;
+                }
+                Py_CLEAR(path);
+            }
+        }
+        else {
+            if (path == NULL) {
+                Py_INCREF(Py_None);
+                path = Py_None;
+            }
+            PyList_SET_ITEM(ret, i, path);  /* Steals reference */
+        }
+    }
+    goto cleanup;
+
+error:
+    Py_CLEAR(ret);
+
+cleanup:
+    Py_CLEAR(seq);
+    return ret;
+}
+
+
+/*
+ * C implementation of `dbase32.db32_paths()`.
+ */
+static PyObject *
+db32_paths(PyObject *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"parentdir", "ids", "layout", "errors", NULL};
+    PyObject *parentdir = NULL;
+    PyObject *ids = NULL;
+    PyObject *layout = NULL;
+    PyObject *errors = NULL;
+    size_t levels[MAX_TXT_LEN];
+    size_t count = 0;
+    size_t total = 0;
+    int mode = _PATHS_STRICT;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "OO|OO:db32_paths", keys,
+            &parentdir, &ids, &layout, &errors)) {
+        return NULL;
+    }
+    if (! PyUnicode_Check(parentdir)) {
+        PyErr_Format(PyExc_TypeError,
+            "parentdir: need a %R; got a %R: %R",
+            (PyObject *)&PyUnicode_Type, Py_TYPE(parentdir), parentdir
+        );
+        return NULL;
+    }
+    if (layout == NULL) {
+        levels[0] = total = 2;
+        count = 1;
+        layout = _int_two;
+    }
+    else if (! _parse_levels("layout", layout, true, levels, &count, &total)) {
+        return NULL;
+    }
+    if (errors != NULL) {
+        if (PyUnicode_Check(errors)
+                && PyUnicode_CompareWithASCIIString(errors, "strict") == 0) {
+            mode = _PATHS_STRICT;
+        }
+        else if (PyUnicode_Check(errors)
+                && PyUnicode_CompareWithASCIIString(errors, "skip") == 0) {
+            mode = _PATHS_SKIP;
+        }
+        else if (PyUnicode_Check(errors)
+                && PyUnicode_CompareWithASCIIString(errors, "none") == 0) {
+            mode = _PATHS_NONE;
+        }
+        else {
+            PyErr_Format(PyExc_ValueError,
+                "errors is %R, need 'strict', 'skip', or 'none'", errors
+            );
+            return NULL;
+        }
+    }
+    return _build_paths(&parentdir, layout, levels, count, total, ids, mode);
+}
+
+
+/*
+ * _join_bytes(): build a `bytes` path from parent components and an ID.
+ *
+ * Used by `db32_join_bytes()` and `db32_join_2_bytes()`.
+ *
+ * The parents must be `bytes`, and the ID (the last item in `args`) either
+ * `bytes` or an ASCII `str`.  The ID gets the same checks as in
+ * `_check_join()`, then the path is written into a single new `bytes` object,
+ * with the ID split into `levels`.
+ */
+static PyObject *
+_join_bytes(const char *name, PyObject *args, const size_t *levels,
+            const size_t count)
+{
+    const ssize_t nparents = PyTuple_GET_SIZE(args) - 1;
+    PyObject *id = NULL;
+    const uint8_t *id_buf = NULL;
+    size_t id_len = 0;
+    uint8_t status = 1;
+    PyObject *item = NULL;
+    PyObject *ret = NULL;
+    uint8_t *buf = NULL;
+    ssize_t i, total, len;
+    size_t j, start;
+
+    if (nparents < 0) {
+        PyErr_Format(PyExc_TypeError,
+            "%s() requires at least one argument", name
+        );
+        return NULL;
+    }
+
+    /* Make sure `id` is bytes or an ASCII str */
+    id = PyTuple_GET_ITEM(args, nparents);
+    if (Py_TYPE(id) == &PyBytes_Type) {
+        id_buf = (const uint8_t *)PyBytes_AS_STRING(id);
+        id_len = (size_t)PyBytes_GET_SIZE(id);
+    }
+    else if (Py_TYPE(id) == &PyUnicode_Type) {
+        if (PyUnicode_READY(id) != 0) {
+            return NULL;
+        }
+        if (PyUnicode_MAX_CHAR_VALUE(id) != 127) {
+            PyErr_Format(PyExc_ValueError, "_id is not ASCII: %R", id);
+            return NULL;
+        }
+        id_buf = PyUnicode_1BYTE_DATA(id);
+        id_len = (size_t)PyUnicode_GET_LENGTH(id);
+    }
+    else {
+        PyErr_Format(PyExc_TypeError,
+            "_id: need a %R or %R; got a %R: %R",
+            (PyObject *)&PyBytes_Type, (PyObject *)&PyUnicode_Type,
+            Py_TYPE(id), id
+        );
+        return NULL;
+    }
+
+    /* Make sure `id` is valid Dbase32 */
+    if (! _check_txt_len(id_len)) {
+        return NULL;
+    }
+    status = _validate(id_buf, id_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, id);
+        return NULL;
+    }
+
+    /* Check parents, and measure the result */
+    total = (ssize_t)(id_len + count);
+    for (i = 0; i < nparents; i++) {
+        item = PyTuple_GET_ITEM(args, i);
+        if (! PyBytes_Check(item)) {
+            PyErr_Format(PyExc_TypeError,
+                "sequence item %zd: expected a bytes-like object, %.80s found",
+                i, Py_TYPE(item)->tp_name
+            );
+            return NULL;
+        }
+        len = PyBytes_GET_SIZE(item);
+        if (len > PY_SSIZE_T_MAX - 1 - total) {
+            PyErr_SetString(PyExc_OverflowError, "join() result is too long");
+            return NULL;
+        }
+        total += len + 1;
+    }
+
+    /* Single allocation for the whole path */
+    ret = PyBytes_FromStringAndSize(NULL, total);
+    if (ret == NULL) {
+        return NULL;
+    }
+    buf = (uint8_t *)PyBytes_AS_STRING(ret);
+    for (i = 0; i < nparents; i++) {
+        item = PyTuple_GET_ITEM(args, i);
+        len = PyBytes_GET_SIZE(item);
+        memcpy(buf, PyBytes_AS_STRING(item), (size_t)len);
+        buf += len;
+        *buf++ = '/';
+    }
+    start = 0;
+    for (j = 0; j < count; j++) {
+        memcpy(buf, id_buf + start, levels[j]);
+        buf += levels[j];
+        *buf++ = '/';
+        start += levels[j];
+    }
+    memcpy(buf, id_buf + start, id_len - start);
+    buf += id_len - start;
+    if (buf != (uint8_t *)PyBytes_AS_STRING(ret) + total) {
+        Py_CLEAR(ret);
+        Py_FatalError("dbase32 internal error in _join_bytes()");
+    }
+    return ret;
+}
+
+
+/*
+ * C implementation of `dbase32.db32_join_bytes()`.
+ */
+static PyObject *
+db32_join_bytes(PyObject *self, PyObject *args)
+{
+    return _join_bytes("db32_join_bytes", args, NULL, 0);
+}
+
+
+/*
+ * C implementation of `dbase32.db32_join_2_bytes()`.
+ */
+static PyObject *
+db32_join_2_bytes(PyObject *self, PyObject *args)
+{
+    static const size_t levels[1] = {2};
+
+    return _join_bytes("db32_join_2_bytes", args, levels, 1);
+}
+
+
+/*
+ * _split_path(): find the sharded ID at the end of a path.
+ *
+ * Used by `db32_split()` and `db32_split_bytes()`.
+ *
+ * The path is given as a `kind`, `data`, `len` triple so that `str` and
+ * `bytes` paths (the latter as `PyUnicode_1BYTE_KIND`) share the same code.
+ * The final component plus `levels` components before it, each of exactly
+ * the given width, are copied into `id_buf` (which must have room for
+ * `MAX_TXT_LEN` bytes), with any non-ASCII character replaced by 255 so
+ * `_validate()` rejects it.  On success `parent_len` is the length of the
+ * parent directory (not counting its trailing slash), and `id_start` is
+ * where the ID components start in the path.
+ *
+ * Returns 0 on success, -1 when the path doesn't match the layout, and -2
+ * when the ID is too long for `id_buf`.
+ */
+static int
+_split_path(const int kind, const void *data, const ssize_t len,
+            const size_t *levels, const size_t count, ssize_t *parent_len,
+            ssize_t *id_start, uint8_t *id_buf, size_t *id_len)
+{
+    ssize_t r, start, i, pos;
+    size_t j, total;
+    Py_UCS4 ch;
+
+    /* Final component */
+    for (r = len - 1; r >= 0; r--) {
+        if (PyUnicode_READ(kind, data, r) == '/') {
+            break;
+        }
+    }
+    if (r == len - 1 || (r < 0 && count > 0)) {
+        return -1;
+    }
+    total = (size_t)(len - r - 1);
+    for (j = 0; j < count; j++) {
+        total += levels[j];
+    }
+    if (total > MAX_TXT_LEN) {
+        *id_len = total;
+        return -2;
+    }
+
+    /* Directory levels, from the innermost out */
+    start = r + 1;
+    for (j = count; j > 0; j--) {
+        start = r - (ssize_t)levels[j - 1];
+        if (start < 0) {
+            return -1;
+        }
+        if (start > 0 && PyUnicode_READ(kind, data, start - 1) != '/') {
+            return -1;
+        }
+        r = start - 1;
+    }
+    *parent_len = (start > 0 ? start - 1 : 0);
+    *id_start = start;
+
+    /* Copy out the ID, skipping the slashes */
+    pos = 0;
+    for (i = start; i < len; i++) {
+        ch = PyUnicode_READ(kind, data, i);
+        if (ch == '/') {
+            continue;
+        }
+        id_buf[pos++] = (ch < 128 ? (uint8_t)ch : 255);
+    }
+    if ((size_t)pos != total) {
+        return -1;
+    }
+    *id_len = total;
+    return 0;
+}
+
+
+/*
+ * _split_common(): shared implementation of `db32_split()` and
+ * `db32_split_bytes()`.
+ */
+static PyObject *
+_split_common(const char *format, PyObject *args, PyObject *kw,
+              const bool want_bytes)
+{
+    static char *keys[] = {"path", "layout", NULL};
+    PyObject *path = NULL;
+    PyObject *layout = NULL;
+    size_t levels[MAX_TXT_LEN];
+    size_t count = 0;
+    size_t total = 0;
+    uint8_t id_buf[MAX_TXT_LEN];
+    size_t id_len = 0;
+    ssize_t parent_len = 0;
+    ssize_t id_start = 0;
+    const void *data = NULL;
+    ssize_t len = 0;
+    int kind;
+    int status;
+    PyObject *id = NULL;
+    PyObject *parent = NULL;
+    PyObject *tail = NULL;
+
+    /* Skip argument parsing in the common case of a single positional arg */
+    if (kw == NULL && PyTuple_GET_SIZE(args) == 1) {
+        path = PyTuple_GET_ITEM(args, 0);
+    }
+    else if (!PyArg_ParseTupleAndKeywords(args, kw, format, keys,
+            &path, &layout)) {
+        return NULL;
+    }
+    if (want_bytes) {
+        if (! PyBytes_Check(path)) {
+            PyErr_Format(PyExc_TypeError,
+                "path: need a %R; got a %R: %R",
+                (PyObject *)&PyBytes_Type, Py_TYPE(path), path
+            );
+            return NULL;
+        }
+        kind = PyUnicode_1BYTE_KIND;
+        data = PyBytes_AS_STRING(path);
+        len = PyBytes_GET_SIZE(path);
+    }
+    else {
+        if (! PyUnicode_Check(path)) {
+            PyErr_Format(PyExc_TypeError,
+                "path: need a %R; got a %R: %R",
+                (PyObject *)&PyUnicode_Type, Py_TYPE(path), path
+            );
+            return NULL;
+        }
+        if (PyUnicode_READY(path) != 0) {
+            return NULL;
+        }
+        kind = PyUnicode_KIND(path);
+        data = PyUnicode_DATA(path);
+        len = PyUnicode_GET_LENGTH(path);
+    }
+    if (layout == NULL) {
+        levels[0] = 2;
+        count = 1;
+        layout = _int_two;
+    }
+    else if (! _parse_levels("layout", layout, true, levels, &count, &total)) {
+        return NULL;
+    }
+
+    status = _split_path(kind, data, len, levels, count, &parent_len,
+        &id_start, id_buf, &id_len
+    );
+    if (status == -1) {
+        PyErr_Format(PyExc_ValueError,
+            "path %R does not match layout %R", path, layout
+        );
+        return NULL;
+    }
+    if (! _check_txt_len(id_len)) {
+        return NULL;
+    }
+    status = _validate(id_buf, id_len);
+    if (status != 0) {
+        /* Rebuild the ID as it appears in the path, for the error message */
+        if (want_bytes) {
+            tail = PyBytes_FromStringAndSize(
+                (const char *)data + id_start, len - id_start
+            );
+            if (tail != NULL) {
+                id = PyObject_CallMethod(tail, "replace", "(yy)", "/", "");
+            }
+        }
+        else {
+            tail = PyUnicode_Substring(path, id_start, len);
+            if (tail != NULL) {
+                id = PyObject_CallMethod(tail, "replace", "(ss)", "/", "");
+            }
+        }
+        if (id != NULL) {
+            _handle_invalid_dbase32(status, id);
+        }
+        Py_CLEAR(tail);
+        Py_CLEAR(id);
+        return NULL;
+    }
+
+    if (want_bytes) {
+        parent = PyBytes_FromStringAndSize(data, parent_len);
+        id = PyBytes_FromStringAndSize((const char *)id_buf, (ssize_t)id_len);
+    }
+    else {
+        parent = PyUnicode_Substring(path, 0, parent_len);
+        id = PyUnicode_New((ssize_t)id_len, DB32_END);
+        if (id != NULL) {
+            memcpy(PyUnicode_1BYTE_DATA(id), id_buf, id_len);
+        }
+    }
+    if (parent == NULL || id == NULL) {
+        Py_CLEAR(parent);
+        Py_CLEAR(id);
+        return NULL;
+    }
+    return Py_BuildValue("(NN)", parent, id);
+}
+
+
+/*
+ * C implementation of `dbase32.db32_split()`.
+ */
+static PyObject *
+db32_split(PyObject *self, PyObject *args, PyObject *kw)
+{
+    return _split_common("O|O:db32_split", args, kw, false);
+}
+
+
+/*
+ * C implementation of `dbase32.db32_split_bytes()`.
+ */
+static PyObject *
+db32_split_bytes(PyObject *self, PyObject *args, PyObject *kw)
+{
+    return _split_common("O|O:db32_split_bytes", args, kw, true);
+}
+
+
+/*
+ * _decode_key(): validate and decode a `str` or `bytes` key into `bin_buf`.
+ *
+ * Used by `Db32IdSet`, `Db32Dict`, and `Db32SortedArray`.
+ *
+ * The key must be a valid Dbase32 ID that decodes to exactly `bin_len` bytes.
+ *
+ * Returns `true` on success, or sets a Python exception and returns `false`.
+ */
+static bool
+_decode_key(PyObject *key, uint8_t *bin_buf, const size_t bin_len)
+{
+    const uint8_t *txt_buf = NULL;
+    size_t txt_len = 0;
+    uint8_t status = 1;
+
+    if (! _get_text(key, &txt_buf, &txt_len)) {
+        return false;
+    }
+    if (! _check_txt_len(txt_len)) {
+        return false;
+    }
+    if (txt_len != bin_len * 8 / 5) {
+        PyErr_Format(PyExc_ValueError,
+            "len(text) is %u, need len(text) == %u", txt_len, bin_len * 8 / 5
+        );
+        return false;
+    }
+    status = _decode(txt_buf, txt_len, bin_buf, bin_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, key);
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * _encode_key(): build a new Dbase32 `str` from a binary key.
+ *
+ * Used by `Db32IdSet`, `Db32Dict`, `Db32SortedArray`, and `Db32Id`.
+ */
+static PyObject *
+_encode_key(const uint8_t *bin_buf, const size_t bin_len)
+{
+    const size_t txt_len = bin_len * 8 / 5;
+    PyObject *ret = PyUnicode_New((ssize_t)txt_len, DB32_END);
+    if (ret != NULL) {
+        if (_encode(bin_buf, bin_len, PyUnicode_1BYTE_DATA(ret), txt_len) != 0) {
+            Py_CLEAR(ret);
+            Py_FatalError("dbase32 internal error in _encode_key()");
+        }
+    }
+    return ret;
+}
+
+
+/*
+ * _Table: open-addressed hash table of fixed width binary IDs.
+ *
+ * Used by `Db32IdSet` and `Db32Dict`.
+ *
+ * Keys are stored packed and inline, `bin_len` bytes per slot, with a separate
+ * byte per slot recording whether it is empty, live, or deleted.
+ *
+ * When created with `has_values`, there is also a `PyObject *` per slot.  The
+ * table itself never touches the reference counts of these values; that is
+ * left to the owner (`Db32Dict`), which must release them before the slots
+ * are freed or cleared.
+ *
+ * Random IDs are uniformly random, so the ID bits themselves serve as the
+ * hash.  We use the trailing 8 bytes (rather than the leading bytes) so that
+ * `time_id()` IDs, whose first 4 bytes are a timestamp, hash just as well.
+ */
+#define _SLOT_EMPTY 0
+#define _SLOT_LIVE 1
+#define _SLOT_DELETED 2
+#define _TABLE_MINSIZE 8
+
+typedef struct {
+    size_t bin_len;   /* Size of each key in bytes */
+    size_t mask;      /* Number of slots minus one */
+    size_t used;      /* Number of live slots */
+    size_t fill;      /* Number of live plus deleted slots */
+    size_t version;   /* Incremented on every structural change */
+    bool has_values;
+    uint8_t *states;
+    uint8_t *keys;
+    PyObject **values;
+} _Table;
+
+
+static size_t
+_table_hash(const _Table *t, const uint8_t *key)
+{
+    size_t start = (t->bin_len > 8) ? t->bin_len - 8 : 0;
+    uint64_t h = 0;
+    size_t i;
+    for (i = start; i < t->bin_len; i++) {
+        h = (h << 8) | key[i];
+    }
+    return (size_t)h;
+}
+
+
+/*
+ * Allocate `size` empty slots, replacing (but not freeing) any current slots.
+ *
+ * On failure, `t` is left unchanged.
+ */
+static bool
+_table_alloc(_Table *t, const size_t size)
+{
+    uint8_t *states = PyMem_Malloc(size);
+    uint8_t *keys = PyMem_Malloc(size * t->bin_len);
+    PyObject **values = NULL;
+    if (t->has_values) {
+        values = PyMem_Malloc(size * sizeof(PyObject *));
+    }
+    if (states == NULL || keys == NULL || (t->has_values && values == NULL)) {
+        PyMem_Free(states);
+        PyMem_Free(keys);
+        PyMem_Free(values);
+        PyErr_NoMemory();
+        return false;
+    }
+    memset(states, _SLOT_EMPTY, size);
+    t->states = states;
+    t->keys = keys;
+    t->values = values;
+    t->mask = size - 1;
+    t->used = 0;
+    t->fill = 0;
+    return true;
+}
+
+
+static bool
+_table_init(_Table *t, const size_t bin_len, const bool has_values)
+{
+    t->bin_len = bin_len;
+    t->version = 0;
+    t->has_values = has_values;
+    return _table_alloc(t, _TABLE_MINSIZE);
+}
+
+
+static void
+_table_free(_Table *t)
+{
+    PyMem_Free(t->states);
+    PyMem_Free(t->keys);
+    PyMem_Free(t->values);
+    t->states = NULL;
+    t->keys = NULL;
+    t->values = NULL;
+    t->mask = t->used = t->fill = 0;
+}
+
+
+/*
+ * Return the slot holding `key`, or when `key` isn't present, the slot where it
+ * should be inserted (with `*found` set accordingly).
+ */
+static size_t
+_table_find(const _Table *t, const uint8_t *key, bool *found)
+{
+    size_t i = _table_hash(t, key) & t->mask;
+    size_t free_slot = SIZE_MAX;
+
+    while (t->states[i] != _SLOT_EMPTY) {
+        if (t->states[i] == _SLOT_LIVE) {
+            if (memcmp(t->keys + i * t->bin_len, key, t->bin_len) == 0) {
+                *found = true;
+                return i;
+            }
+        }
+        else if (free_slot == SIZE_MAX) {
+            free_slot = i;
+        }
+        i = (i + 1) & t->mask;
+    }
+    *found = false;
+    return (free_slot == SIZE_MAX) ? i : free_slot;
+}
+
+
+static bool
+_table_resize(_Table *t, const size_t minused)
+{
+    _Table old = *t;
+    size_t size = _TABLE_MINSIZE;
+    size_t i, j;
+    bool found;
+
+    while (size <= minused * 2) {
+        size <<= 1;
+    }
+    if (! _table_alloc(t, size)) {
+        *t = old;
+        return false;
+    }
+    for (i = 0; i <= old.mask; i++) {
+        if (old.states[i] == _SLOT_LIVE) {
+            j = _table_find(t, old.keys + i * t->bin_len, &found);
+            t->states[j] = _SLOT_LIVE;
+            memcpy(t->keys + j * t->bin_len, old.keys + i * t->bin_len,
+                t->bin_len
+            );
+            if (t->has_values) {
+                t->values[j] = old.values[i];
+            }
+        }
+    }
+    t->used = t->fill = old.used;
+    t->version = old.version + 1;
+    _table_free(&old);
+    return true;
+}
+
+
+/*
+ * Insert `key`, growing the table as needed.
+ *
+ * Returns 1 if `key` was added, 0 if it was already present, -1 on error.  On
+ * success, `*slot` is set to the slot now holding `key`.
+ *
+ * When the table has values, the value of a newly added slot is left for the
+ * caller to set.
+ */
+static int
+_table_insert(_Table *t, const uint8_t *key, size_t *slot)
+{
+    bool found;
+    size_t i = _table_find(t, key, &found);
+
+    if (found) {
+        *slot = i;
+        return 0;
+    }
+    if (t->states[i] == _SLOT_EMPTY) {
+        /* Keep the load factor (including deleted slots) under 2/3 */
+        if ((t->fill + 1) * 3 >= (t->mask + 1) * 2) {
+            if (! _table_resize(t, t->used + 1)) {
+                return -1;
+            }
+            i = _table_find(t, key, &found);
+        }
+        if (t->states[i] == _SLOT_EMPTY) {
+            t->fill++;
+        }
+    }
+    t->states[i] = _SLOT_LIVE;
+    memcpy(t->keys + i * t->bin_len, key, t->bin_len);
+    t->used++;
+    t->version++;
+    *slot = i;
+    return 1;
+}
+
+
+static void
+_table_delete(_Table *t, const size_t i)
+{
+    t->states[i] = _SLOT_DELETED;
+    t->used--;
+    t->version++;
+}
+
+
+/*
+ * Replace the table with a new, empty one.
+ *
+ * On failure, the old table is left in place.
+ */
+static bool
+_table_clear(_Table *t)
+{
+    _Table old = *t;
+
+    if (! _table_alloc(t, _TABLE_MINSIZE)) {
+        *t = old;
+        return false;
+    }
+    t->version = old.version + 1;
+    _table_free(&old);
+    return true;
+}
+
+
+/*
+ * Advance `*pos` to the next live slot, returning its key or NULL at the end.
+ *
+ * A table whose `_table_init()` failed has no slots, which is safe to iterate.
+ */
+static const uint8_t *
+_table_next(const _Table *t, size_t *pos)
+{
+    if (t->states == NULL) {
+        return NULL;
+    }
+    while (*pos <= t->mask) {
+        if (t->states[*pos] == _SLOT_LIVE) {
+            return t->keys + (*pos)++ * t->bin_len;
+        }
+        (*pos)++;
+    }
+    return NULL;
+}
+
+
+/*
+ * C implementation of `dbase32.Db32IdSet`.
+ */
+typedef struct {
+    PyObject_HEAD
+    _Table table;
+} Db32IdSet;
+
+typedef struct {
+    PyObject_HEAD
+    Db32IdSet *set;
+    size_t pos;
+    size_t version;
+} Db32IdSetIter;
+
+static PyTypeObject Db32IdSetType;
+static PyTypeObject Db32IdSetIterType;
+
+
+static PyObject *
+Db32IdSet_update(Db32IdSet *self, PyObject *iterable)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+    PyObject *iterator = NULL;
+    PyObject *item = NULL;
+    size_t slot;
+
+    iterator = PyObject_GetIter(iterable);
+    if (iterator == NULL) {
+        return NULL;
+    }
+    while ((item = PyIter_Next(iterator)) != NULL) {
+        if (! _decode_key(item, bin_buf, self->table.bin_len)
+                || _table_insert(&self->table, bin_buf, &slot) < 0) {
+            Py_DECREF(item);
+            Py_DECREF(iterator);
+            return NULL;
+        }
+        Py_DECREF(item);
+    }
+    Py_DECREF(iterator);
+    if (PyErr_Occurred()) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+Db32IdSet_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"iterable", "numbytes", NULL};
+    PyObject *iterable = NULL;
+    size_t numbytes = 15;
+    Db32IdSet *self = NULL;
+    PyObject *tmp = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|On:Db32IdSet", keys,
+            &iterable, &numbytes)) {
+        return NULL;
+    }
+    if (! _check_numbytes(numbytes)) {
+        return NULL;
+    }
+    self = (Db32IdSet *)type->tp_alloc(type, 0);
+    if (self == NULL) {
+        return NULL;
+    }
+    if (! _table_init(&self->table, numbytes, false)) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    if (iterable != NULL) {
+        tmp = Db32IdSet_update(self, iterable);
+        if (tmp == NULL) {
+            Py_DECREF(self);
+            return NULL;
+        }
+        Py_DECREF(tmp);
+    }
+    return (PyObject *)self;
+}
+
+
+static void
+Db32IdSet_dealloc(Db32IdSet *self)
+{
+    _table_free(&self->table);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static PyObject *
+Db32IdSet_add(Db32IdSet *self, PyObject *key)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+    size_t slot;
+
+    if (! _decode_key(key, bin_buf, self->table.bin_len)) {
+        return NULL;
+    }
+    if (_table_insert(&self->table, bin_buf, &slot) < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+/*
+ * Common code for `Db32IdSet.discard()` and `Db32IdSet.remove()`.
+ *
+ * Returns 1 if `key` was removed, 0 if it wasn't present, -1 on error.
+ */
+static int
+_Db32IdSet_discard(Db32IdSet *self, PyObject *key)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+    bool found;
+    size_t i;
+
+    if (! _decode_key(key, bin_buf, self->table.bin_len)) {
+        return -1;
+    }
+    i = _table_find(&self->table, bin_buf, &found);
+    if (! found) {
+        return 0;
+    }
+    _table_delete(&self->table, i);
+    return 1;
+}
+
+
+static PyObject *
+Db32IdSet_discard(Db32IdSet *self, PyObject *key)
+{
+    if (_Db32IdSet_discard(self, key) < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+Db32IdSet_remove(Db32IdSet *self, PyObject *key)
+{
+    int status = _Db32IdSet_discard(self, key);
+    if (status < 0) {
+        return NULL;
+    }
+    if (status == 0) {
+        PyErr_SetObject(PyExc_KeyError, key);
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+Db32IdSet_clear(Db32IdSet *self, PyObject *unused)
+{
+    if (! _table_clear(&self->table)) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+static int
+Db32IdSet_contains(Db32IdSet *self, PyObject *key)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+    bool found;
+
+    if (! _decode_key(key, bin_buf, self->table.bin_len)) {
+        return -1;
+    }
+    _table_find(&self->table, bin_buf, &found);
+    return found ? 1 : 0;
+}
+
+
+static ssize_t
+Db32IdSet_len(Db32IdSet *self)
+{
+    return (ssize_t)self->table.used;
+}
+
+
+static PyObject *
+Db32IdSet_iter(Db32IdSet *self)
+{
+    Db32IdSetIter *it = PyObject_New(Db32IdSetIter, &Db32IdSetIterType);
+    if (it == NULL) {
+        return NULL;
+    }
+    Py_INCREF(self);
+    it->set = self;
+    it->pos = 0;
+    it->version = self->table.version;
+    return (PyObject *)it;
+}
+
+
+static PyObject *
+Db32IdSet_get_numbytes(Db32IdSet *self, void *closure)
+{
+    return PyLong_FromSize_t(self->table.bin_len);
+}
+
+
+static void
+Db32IdSetIter_dealloc(Db32IdSetIter *self)
+{
+    Py_XDECREF(self->set);
+    PyObject_Del(self);
+}
+
+
+static PyObject *
+Db32IdSetIter_next(Db32IdSetIter *self)
+{
+    const uint8_t *key;
+
+    if (self->set == NULL) {
+        return NULL;
+    }
+    if (self->version != self->set->table.version) {
+        PyErr_SetString(PyExc_RuntimeError,
+            "Db32IdSet changed during iteration"
+        );
+        return NULL;
+    }
+    key = _table_next(&self->set->table, &self->pos);
+    if (key == NULL) {
+        Py_CLEAR(self->set);
+        return NULL;
+    }
+    return _encode_key(key, self->set->table.bin_len);
+}
+
+
+static PyMethodDef Db32IdSet_methods[] = {
+    {"add", (PyCFunction)Db32IdSet_add, METH_O, "add(_id)"},
+    {"discard", (PyCFunction)Db32IdSet_discard, METH_O, "discard(_id)"},
+    {"remove", (PyCFunction)Db32IdSet_remove, METH_O, "remove(_id)"},
+    {"update", (PyCFunction)Db32IdSet_update, METH_O, "update(iterable)"},
+    {"clear", (PyCFunction)Db32IdSet_clear, METH_NOARGS, "clear()"},
+    {NULL}
+};
+
+static PyGetSetDef Db32IdSet_getset[] = {
+    {"numbytes", (getter)Db32IdSet_get_numbytes, NULL,
+        "size of each binary ID in bytes", NULL},
+    {NULL}
+};
+
+static PySequenceMethods Db32IdSet_as_sequence = {
+    .sq_length = (lenfunc)Db32IdSet_len,
+    .sq_contains = (objobjproc)Db32IdSet_contains,
+};
+
+static PyTypeObject Db32IdSetType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32IdSet",
+    .tp_basicsize = sizeof(Db32IdSet),
+    .tp_dealloc = (destructor)Db32IdSet_dealloc,
+    .tp_as_sequence = &Db32IdSet_as_sequence,
+    .tp_hash = PyObject_HashNotImplemented,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Db32IdSet(iterable=(), numbytes=15)",
+    .tp_iter = (getiterfunc)Db32IdSet_iter,
+    .tp_methods = Db32IdSet_methods,
+    .tp_getset = Db32IdSet_getset,
+    .tp_new = Db32IdSet_New,
+};
+
+static PyTypeObject Db32IdSetIterType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32IdSetIterator",
+    .tp_basicsize = sizeof(Db32IdSetIter),
+    .tp_dealloc = (destructor)Db32IdSetIter_dealloc,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_iter = PyObject_SelfIter,
+    .tp_iternext = (iternextfunc)Db32IdSetIter_next,
+};
+
+
+/*
+ * C implementation of `dbase32.Db32Dict`.
+ */
+typedef struct {
+    PyObject_HEAD
+    _Table table;
+} Db32Dict;
+
+#define _DICT_KEYS 0
+#define _DICT_VALUES 1
+#define _DICT_ITEMS 2
+
+typedef struct {
+    PyObject_HEAD
+    Db32Dict *dict;
+    size_t pos;
+    size_t version;
+    int kind;
+} Db32DictIter;
+
+static PyTypeObject Db32DictType;
+static PyTypeObject Db32DictIterType;
+
+
+/*
+ * Set `key` to `value`, returning false with a Python exception set on error.
+ */
+static bool
+_Db32Dict_set(Db32Dict *self, PyObject *key, PyObject *value)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+    PyObject *old = NULL;
+    size_t slot;
+    int status;
+
+    if (! _decode_key(key, bin_buf, self->table.bin_len)) {
+        return false;
+    }
+    status = _table_insert(&self->table, bin_buf, &slot);
+    if (status < 0) {
+        return false;
+    }
+    if (status == 0) {
+        old = self->table.values[slot];
+    }
+    Py_INCREF(value);
+    self->table.values[slot] = value;
+    Py_XDECREF(old);
+    return true;
+}
+
+
+/*
+ * Return the slot holding `key`, with `*found` set accordingly.
+ *
+ * Returns false with a Python exception set on error.
+ */
+static bool
+_Db32Dict_find(Db32Dict *self, PyObject *key, size_t *slot, bool *found)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+
+    if (! _decode_key(key, bin_buf, self->table.bin_len)) {
+        return false;
+    }
+    *slot = _table_find(&self->table, bin_buf, found);
+    return true;
+}
+
+
+/*
+ * Remove the entry in `slot`, returning a new reference to its value.
+ */
+static PyObject *
+_Db32Dict_take(Db32Dict *self, const size_t slot)
+{
+    PyObject *value = self->table.values[slot];
+    _table_delete(&self->table, slot);
+    return value;
+}
+
+
+/*
+ * Release all the values in a table that is no longer reachable, then free it.
+ */
+static void
+_Db32Dict_free_table(_Table *t)
+{
+    size_t pos = 0;
+    while (_table_next(t, &pos) != NULL) {
+        Py_DECREF(t->values[pos - 1]);
+    }
+    _table_free(t);
+}
+
+
+static PyObject *
+Db32Dict_update(Db32Dict *self, PyObject *other)
+{
+    PyObject *iterator = NULL;
+    PyObject *item = NULL;
+    PyObject *value = NULL;
+    PyObject *pair = NULL;
+    PyObject *keys = NULL;
+    bool ok;
+
+    if (PyObject_HasAttrString(other, "keys")) {
+        keys = PyObject_CallMethod(other, "keys", NULL);
+        if (keys == NULL) {
+            return NULL;
+        }
+        iterator = PyObject_GetIter(keys);
+        Py_DECREF(keys);
+        if (iterator == NULL) {
+            return NULL;
+        }
+        while ((item = PyIter_Next(iterator)) != NULL) {
+            value = PyObject_GetItem(other, item);
+            ok = (value != NULL && _Db32Dict_set(self, item, value));
+            Py_XDECREF(value);
+            Py_DECREF(item);
+            if (! ok) {
+                Py_DECREF(iterator);
+                return NULL;
+            }
+        }
+    }
+    else {
+        iterator = PyObject_GetIter(other);
+        if (iterator == NULL) {
+            return NULL;
+        }
+        while ((item = PyIter_Next(iterator)) != NULL) {
+            pair = PySequence_Fast(item, "need (key, value) pairs");
+            Py_DECREF(item);
+            if (pair == NULL) {
+                Py_DECREF(iterator);
+                return NULL;
+            }
+            if (PySequence_Fast_GET_SIZE(pair) != 2) {
+                PyErr_Format(PyExc_ValueError,
+                    "need (key, value) pairs; got %zd items",
+                    PySequence_Fast_GET_SIZE(pair)
+                );
+                ok = false;
+            }
+            else {
+                ok = _Db32Dict_set(self,
+                    PySequence_Fast_GET_ITEM(pair, 0),
+                    PySequence_Fast_GET_ITEM(pair, 1)
+                );
+            }
+            Py_DECREF(pair);
+            if (! ok) {
+                Py_DECREF(iterator);
+                return NULL;
+            }
+        }
+    }
+    Py_DECREF(iterator);
+    if (PyErr_Occurred()) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+Db32Dict_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"other", "numbytes", NULL};
+    PyObject *other = NULL;
+    size_t numbytes = 15;
+    Db32Dict *self = NULL;
+    PyObject *tmp = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|On:Db32Dict", keys,
+            &other, &numbytes)) {
+        return NULL;
+    }
+    if (! _check_numbytes(numbytes)) {
+        return NULL;
+    }
+    self = (Db32Dict *)type->tp_alloc(type, 0);
+    if (self == NULL) {
+        return NULL;
+    }
+    if (! _table_init(&self->table, numbytes, true)) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    if (other != NULL) {
+        tmp = Db32Dict_update(self, other);
+        if (tmp == NULL) {
+            Py_DECREF(self);
+            return NULL;
+        }
+        Py_DECREF(tmp);
+    }
+    return (PyObject *)self;
+}
+
+
+static int
+Db32Dict_traverse(Db32Dict *self, visitproc visit, void *arg)
+{
+    size_t pos = 0;
+    while (_table_next(&self->table, &pos) != NULL) {
+        Py_VISIT(self->table.values[pos - 1]);
+    }
+    return 0;
+}
+
+
+/*
+ * Break reference cycles by replacing every value with `None`.
+ *
+ * This needs no allocation, and leaves the keys (and the table) in place.
+ */
+static int
+Db32Dict_tp_clear(Db32Dict *self)
+{
+    size_t pos = 0;
+    PyObject *old = NULL;
+
+    while (_table_next(&self->table, &pos) != NULL) {
+        old = self->table.values[pos - 1];
+        Py_INCREF(Py_None);
+        self->table.values[pos - 1] = Py_None;
+        Py_DECREF(old);
+    }
+    return 0;
+}
+
+
+static void
+Db32Dict_dealloc(Db32Dict *self)
+{
+    PyObject_GC_UnTrack(self);
+    _Db32Dict_free_table(&self->table);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static ssize_t
+Db32Dict_len(Db32Dict *self)
+{
+    return (ssize_t)self->table.used;
+}
+
+
+static PyObject *
+Db32Dict_subscript(Db32Dict *self, PyObject *key)
+{
+    size_t slot;
+    bool found;
+
+    if (! _Db32Dict_find(self, key, &slot, &found)) {
+        return NULL;
+    }
+    if (! found) {
+        PyErr_SetObject(PyExc_KeyError, key);
+        return NULL;
+    }
+    Py_INCREF(self->table.values[slot]);
+    return self->table.values[slot];
+}
+
+
+static int
+Db32Dict_ass_subscript(Db32Dict *self, PyObject *key, PyObject *value)
+{
+    size_t slot;
+    bool found;
+
+    if (value != NULL) {
+        return _Db32Dict_set(self, key, value) ? 0 : -1;
+    }
+    if (! _Db32Dict_find(self, key, &slot, &found)) {
+        return -1;
+    }
+    if (! found) {
+        PyErr_SetObject(PyExc_KeyError, key);
+        return -1;
+    }
+    Py_DECREF(_Db32Dict_take(self, slot));
+    return 0;
+}
+
+
+static int
+Db32Dict_contains(Db32Dict *self, PyObject *key)
+{
+    size_t slot;
+    bool found;
+
+    if (! _Db32Dict_find(self, key, &slot, &found)) {
+        return -1;
+    }
+    return found ? 1 : 0;
+}
+
+
+static PyObject *
+Db32Dict_get(Db32Dict *self, PyObject *args)
+{
+    PyObject *key = NULL;
+    PyObject *failobj = Py_None;
+    size_t slot;
+    bool found;
+
+    if (!PyArg_ParseTuple(args, "O|O:get", &key, &failobj)) {
+        return NULL;
+    }
+    if (! _Db32Dict_find(self, key, &slot, &found)) {
+        return NULL;
+    }
+    if (found) {
+        Py_INCREF(self->table.values[slot]);
+        return self->table.values[slot];
+    }
+    Py_INCREF(failobj);
+    return failobj;
+}
+
+
+static PyObject *
+Db32Dict_pop(Db32Dict *self, PyObject *args)
+{
+    PyObject *key = NULL;
+    PyObject *failobj = NULL;
+    size_t slot;
+    bool found;
+
+    if (!PyArg_ParseTuple(args, "O|O:pop", &key, &failobj)) {
+        return NULL;
+    }
+    if (! _Db32Dict_find(self, key, &slot, &found)) {
+        return NULL;
+    }
+    if (found) {
+        return _Db32Dict_take(self, slot);
+    }
+    if (failobj == NULL) {
+        PyErr_SetObject(PyExc_KeyError, key);
+        return NULL;
+    }
+    Py_INCREF(failobj);
+    return failobj;
+}
+
+
+/*
+ * The new, empty table is swapped in before any values are released, as
+ * releasing a value can run arbitrary Python code that might use this
+ * `Db32Dict` again.
+ */
+static PyObject *
+Db32Dict_clear(Db32Dict *self, PyObject *unused)
+{
+    _Table old = self->table;
+
+    if (! _table_alloc(&self->table, _TABLE_MINSIZE)) {
+        self->table = old;
+        return NULL;
+    }
+    self->table.version = old.version + 1;
+    _Db32Dict_free_table(&old);
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+_Db32Dict_iter(Db32Dict *self, const int kind)
+{
+    Db32DictIter *it = PyObject_GC_New(Db32DictIter, &Db32DictIterType);
+    if (it == NULL) {
+        return NULL;
+    }
+    Py_INCREF(self);
+    it->dict = self;
+    it->pos = 0;
+    it->version = self->table.version;
+    it->kind = kind;
+    PyObject_GC_Track(it);
+    return (PyObject *)it;
+}
+
+
+static PyObject *
+Db32Dict_iter(Db32Dict *self)
+{
+    return _Db32Dict_iter(self, _DICT_KEYS);
+}
+
+
+static PyObject *
+Db32Dict_keys(Db32Dict *self, PyObject *unused)
+{
+    return _Db32Dict_iter(self, _DICT_KEYS);
+}
+
+
+static PyObject *
+Db32Dict_values(Db32Dict *self, PyObject *unused)
+{
+    return _Db32Dict_iter(self, _DICT_VALUES);
+}
+
+
+static PyObject *
+Db32Dict_items(Db32Dict *self, PyObject *unused)
+{
+    return _Db32Dict_iter(self, _DICT_ITEMS);
+}
+
+
+static PyObject *
+Db32Dict_get_numbytes(Db32Dict *self, void *closure)
+{
+    return PyLong_FromSize_t(self->table.bin_len);
+}
+
+
+static int
+Db32DictIter_traverse(Db32DictIter *self, visitproc visit, void *arg)
+{
+    Py_VISIT(self->dict);
+    return 0;
+}
+
+
+static void
+Db32DictIter_dealloc(Db32DictIter *self)
+{
+    PyObject_GC_UnTrack(self);
+    Py_XDECREF(self->dict);
+    PyObject_GC_Del(self);
+}
+
+
+static PyObject *
+Db32DictIter_next(Db32DictIter *self)
+{
+    const uint8_t *key;
+    PyObject *text = NULL;
+    PyObject *value = NULL;
+
+    if (self->dict == NULL) {
+        return NULL;
+    }
+    if (self->version != self->dict->table.version) {
+        PyErr_SetString(PyExc_RuntimeError,
+            "Db32Dict changed during iteration"
+        );
+        return NULL;
+    }
+    key = _table_next(&self->dict->table, &self->pos);
+    if (key == NULL) {
+        Py_CLEAR(self->dict);
+        return NULL;
+    }
+    value = self->dict->table.values[self->pos - 1];
+    if (self->kind == _DICT_VALUES) {
+        Py_INCREF(value);
+        return value;
+    }
+    text = _encode_key(key, self->dict->table.bin_len);
+    if (self->kind == _DICT_KEYS || text == NULL) {
+        return text;
+    }
+    return Py_BuildValue("(NO)", text, value);
+}
+
+
+static PyMethodDef Db32Dict_methods[] = {
+    {"get", (PyCFunction)Db32Dict_get, METH_VARARGS,
+        "get(_id, default=None)"},
+    {"pop", (PyCFunction)Db32Dict_pop, METH_VARARGS, "pop(_id[, default])"},
+    {"update", (PyCFunction)Db32Dict_update, METH_O, "update(other)"},
+    {"clear", (PyCFunction)Db32Dict_clear, METH_NOARGS, "clear()"},
+    {"keys", (PyCFunction)Db32Dict_keys, METH_NOARGS, "keys()"},
+    {"values", (PyCFunction)Db32Dict_values, METH_NOARGS, "values()"},
+    {"items", (PyCFunction)Db32Dict_items, METH_NOARGS, "items()"},
+    {NULL}
+};
+
+static PyGetSetDef Db32Dict_getset[] = {
+    {"numbytes", (getter)Db32Dict_get_numbytes, NULL,
+        "size of each binary ID in bytes", NULL},
+    {NULL}
+};
+
+static PySequenceMethods Db32Dict_as_sequence = {
+    .sq_contains = (objobjproc)Db32Dict_contains,
+};
+
+static PyMappingMethods Db32Dict_as_mapping = {
+    .mp_length = (lenfunc)Db32Dict_len,
+    .mp_subscript = (binaryfunc)Db32Dict_subscript,
+    .mp_ass_subscript = (objobjargproc)Db32Dict_ass_subscript,
+};
+
+static PyTypeObject Db32DictType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32Dict",
+    .tp_basicsize = sizeof(Db32Dict),
+    .tp_dealloc = (destructor)Db32Dict_dealloc,
+    .tp_as_sequence = &Db32Dict_as_sequence,
+    .tp_as_mapping = &Db32Dict_as_mapping,
+    .tp_hash = PyObject_HashNotImplemented,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC,
+    .tp_doc = "Db32Dict(other=(), numbytes=15)",
+    .tp_traverse = (traverseproc)Db32Dict_traverse,
+    .tp_clear = (inquiry)Db32Dict_tp_clear,
+    .tp_iter = (getiterfunc)Db32Dict_iter,
+    .tp_methods = Db32Dict_methods,
+    .tp_getset = Db32Dict_getset,
+    .tp_new = Db32Dict_New,
+};
+
+static PyTypeObject Db32DictIterType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32DictIterator",
+    .tp_basicsize = sizeof(Db32DictIter),
+    .tp_dealloc = (destructor)Db32DictIter_dealloc,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC,
+    .tp_traverse = (traverseproc)Db32DictIter_traverse,
+    .tp_iter = PyObject_SelfIter,
+    .tp_iternext = (iternextfunc)Db32DictIter_next,
+};
+
+
+/*
+ * C implementation of `dbase32.Db32SortedArray`.
+ *
+ * An immutable, sorted array of fixed width binary IDs, stored contiguously.
+ * Because the Dbase32 alphabet is in sorted order, the binary sort order is
+ * exactly the same as the sort order of the corresponding Dbase32 text.
+ */
+typedef struct {
+    PyObject_HEAD
+    size_t bin_len;
+    size_t count;
+    uint8_t *data;
+} Db32SortedArray;
+
+typedef struct {
+    PyObject_HEAD
+    Db32SortedArray *array;
+    size_t pos;
+    size_t stop;
+} Db32SortedArrayIter;
+
+static PyTypeObject Db32SortedArrayType;
+static PyTypeObject Db32SortedArrayIterType;
+
+
+/*
+ * Width used by `_sorted_cmp()` when called from `qsort()`.
+ *
+ * This is only set and used while the GIL is held, so a static is safe.
+ */
+static size_t _sorted_width = 0;
+
+static int
+_sorted_cmp(const void *a, const void *b)
+{
+    return memcmp(a, b, _sorted_width);
+}
+
+
+/*
+ * Return the index of the first item >= `key` (or > `key` when `right`).
+ */
+static size_t
+_sorted_bisect(const Db32SortedArray *self, const uint8_t *key,
+               const size_t key_len, const bool right)
+{
+    size_t lo = 0;
+    size_t hi = self->count;
+    size_t mid;
+    int cmp;
+
+    while (lo < hi) {
+        mid = lo + (hi - lo) / 2;
+        cmp = memcmp(self->data + mid * self->bin_len, key, key_len);
+        if (cmp < 0 || (right && cmp == 0)) {
+            lo = mid + 1;
+        }
+        else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+
+/*
+ * Return the index of the first item whose 4 byte timestamp prefix is >= `ts`.
+ */
+static size_t
+_sorted_bisect_ts(const Db32SortedArray *self, const uint64_t ts)
+{
+    uint8_t key[4];
+
+    if (ts > UINT32_MAX) {
+        return self->count;
+    }
+    _pack_be(key, ts, 4);
+    return _sorted_bisect(self, key, 4, false);
+}
+
+
+static PyObject *
+_sorted_iter(Db32SortedArray *self, const size_t start, const size_t stop)
+{
+    Db32SortedArrayIter *it = PyObject_New(
+        Db32SortedArrayIter, &Db32SortedArrayIterType
+    );
+    if (it == NULL) {
+        return NULL;
+    }
+    Py_INCREF(self);
+    it->array = self;
+    it->pos = start;
+    it->stop = (stop > start) ? stop : start;
+    return (PyObject *)it;
+}
+
+
+static PyObject *
+Db32SortedArray_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"iterable", "numbytes", NULL};
+    PyObject *iterable = NULL;
+    size_t numbytes = 15;
+    Db32SortedArray *self = NULL;
+    PyObject *iterator = NULL;
+    PyObject *item = NULL;
+    size_t allocated = 0;
+    uint8_t *tmp = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|On:Db32SortedArray", keys,
+            &iterable, &numbytes)) {
+        return NULL;
+    }
+    if (! _check_numbytes(numbytes)) {
+        return NULL;
+    }
+    self = (Db32SortedArray *)type->tp_alloc(type, 0);
+    if (self == NULL) {
+        return NULL;
+    }
+    self->bin_len = numbytes;
+    if (iterable == NULL) {
+        return (PyObject *)self;
+    }
+
+    /* Decode each ID into a growing buffer */
+    iterator = PyObject_GetIter(iterable);
+    if (iterator == NULL) {
+        goto error;
+    }
+    while ((item = PyIter_Next(iterator)) != NULL) {
+        if (self->count == allocated) {
+            allocated = (allocated < 64) ? 64 : allocated * 2;
+            tmp = PyMem_Realloc(self->data, allocated * numbytes);
+            if (tmp == NULL) {
+                PyErr_NoMemory();
+                goto error;
+            }
+            self->data = tmp;
+        }
+        if (! _decode_key(item, self->data + self->count * numbytes, numbytes)) {
+            goto error;
+        }
+        self->count++;
+        Py_CLEAR(item);
+    }
+    Py_CLEAR(iterator);
+    if (PyErr_Occurred()) {
+        goto error;
+    }
+
+    /* Sort, then give back any unused space */
+    _sorted_width = numbytes;
+    qsort(self->data, self->count, numbytes, _sorted_cmp);
+    if (self->count > 0 && self->count < allocated) {
+        tmp = PyMem_Realloc(self->data, self->count * numbytes);
+        if (tmp != NULL) {
+            self->data = tmp;
+        }
+    }
+    return (PyObject *)self;
+
+error:
+    Py_CLEAR(item);
+    Py_CLEAR(iterator);
+    Py_CLEAR(self);
+    return NULL;
+}
+
+
+static void
+Db32SortedArray_dealloc(Db32SortedArray *self)
+{
+    PyMem_Free(self->data);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static ssize_t
+Db32SortedArray_len(Db32SortedArray *self)
+{
+    return (ssize_t)self->count;
+}
+
+
+static PyObject *
+Db32SortedArray_item(Db32SortedArray *self, ssize_t i)
+{
+    if (i < 0 || (size_t)i >= self->count) {
+        PyErr_SetString(PyExc_IndexError, "Db32SortedArray index out of range");
+        return NULL;
+    }
+    return _encode_key(self->data + (size_t)i * self->bin_len, self->bin_len);
+}
+
+
+static int
+Db32SortedArray_contains(Db32SortedArray *self, PyObject *key)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+    size_t i;
+
+    if (! _decode_key(key, bin_buf, self->bin_len)) {
+        return -1;
+    }
+    i = _sorted_bisect(self, bin_buf, self->bin_len, false);
+    if (i < self->count
+            && memcmp(self->data + i * self->bin_len, bin_buf, self->bin_len) == 0) {
+        return 1;
+    }
+    return 0;
+}
+
+
+static PyObject *
+Db32SortedArray_iter(Db32SortedArray *self)
+{
+    return _sorted_iter(self, 0, self->count);
+}
+
+
+static PyObject *
+Db32SortedArray_bisect(Db32SortedArray *self, PyObject *key)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+
+    if (! _decode_key(key, bin_buf, self->bin_len)) {
+        return NULL;
+    }
+    return PyLong_FromSize_t(
+        _sorted_bisect(self, bin_buf, self->bin_len, false)
+    );
+}
+
+
+static PyObject *
+Db32SortedArray_bisect_right(Db32SortedArray *self, PyObject *key)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+
+    if (! _decode_key(key, bin_buf, self->bin_len)) {
+        return NULL;
+    }
+    return PyLong_FromSize_t(
+        _sorted_bisect(self, bin_buf, self->bin_len, true)
+    );
+}
+
+
+/*
+ * Bisect for an optional range bound, where `None` means unbounded.
+ *
+ * Returns false with a Python exception set on error.
+ */
+static bool
+_sorted_bound(Db32SortedArray *self, PyObject *key, const size_t none,
+              size_t *index)
+{
+    uint8_t bin_buf[MAX_BIN_LEN];
+
+    if (key == Py_None) {
+        *index = none;
+        return true;
+    }
+    if (! _decode_key(key, bin_buf, self->bin_len)) {
+        return false;
+    }
+    *index = _sorted_bisect(self, bin_buf, self->bin_len, false);
+    return true;
+}
+
+
+static PyObject *
+Db32SortedArray_range(Db32SortedArray *self, PyObject *args)
+{
+    PyObject *lo = Py_None;
+    PyObject *hi = Py_None;
+    size_t start, stop;
+
+    if (!PyArg_ParseTuple(args, "|OO:range", &lo, &hi)) {
+        return NULL;
+    }
+    if (! _sorted_bound(self, lo, 0, &start)
+            || ! _sorted_bound(self, hi, self->count, &stop)) {
+        return NULL;
+    }
+    return _sorted_iter(self, start, stop);
+}
+
+
+static PyObject *
+Db32SortedArray_time_range(Db32SortedArray *self, PyObject *args)
+{
+    double start_ts, end_ts;
+
+    if (!PyArg_ParseTuple(args, "dd:time_range", &start_ts, &end_ts)) {
+        return NULL;
+    }
+    return _sorted_iter(self,
+        _sorted_bisect_ts(self, _clamp_ts(start_ts)),
+        _sorted_bisect_ts(self, _clamp_ts(end_ts))
+    );
+}
+
+
+static PyObject *
+Db32SortedArray_get_numbytes(Db32SortedArray *self, void *closure)
+{
+    return PyLong_FromSize_t(self->bin_len);
+}
+
+
+static void
+Db32SortedArrayIter_dealloc(Db32SortedArrayIter *self)
+{
+    Py_XDECREF(self->array);
+    PyObject_Del(self);
+}
+
+
+static PyObject *
+Db32SortedArrayIter_next(Db32SortedArrayIter *self)
+{
+    const size_t bin_len = self->array->bin_len;
+
+    if (self->pos >= self->stop) {
+        return NULL;
+    }
+    return _encode_key(self->array->data + self->pos++ * bin_len, bin_len);
+}
+
+
+static PyMethodDef Db32SortedArray_methods[] = {
+    {"bisect", (PyCFunction)Db32SortedArray_bisect, METH_O,
+        "bisect(_id)"},
+    {"bisect_right", (PyCFunction)Db32SortedArray_bisect_right, METH_O,
+        "bisect_right(_id)"},
+    {"range", (PyCFunction)Db32SortedArray_range, METH_VARARGS,
+        "range(lo=None, hi=None)"},
+    {"time_range", (PyCFunction)Db32SortedArray_time_range, METH_VARARGS,
+        "time_range(start_ts, end_ts)"},
+    {NULL}
+};
+
+static PyGetSetDef Db32SortedArray_getset[] = {
+    {"numbytes", (getter)Db32SortedArray_get_numbytes, NULL,
+        "size of each binary ID in bytes", NULL},
+    {NULL}
+};
+
+static PySequenceMethods Db32SortedArray_as_sequence = {
+    .sq_length = (lenfunc)Db32SortedArray_len,
+    .sq_item = (ssizeargfunc)Db32SortedArray_item,
+    .sq_contains = (objobjproc)Db32SortedArray_contains,
+};
+
+static PyTypeObject Db32SortedArrayType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32SortedArray",
+    .tp_basicsize = sizeof(Db32SortedArray),
+    .tp_dealloc = (destructor)Db32SortedArray_dealloc,
+    .tp_as_sequence = &Db32SortedArray_as_sequence,
+    .tp_hash = PyObject_HashNotImplemented,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Db32SortedArray(iterable=(), numbytes=15)",
+    .tp_iter = (getiterfunc)Db32SortedArray_iter,
+    .tp_methods = Db32SortedArray_methods,
+    .tp_getset = Db32SortedArray_getset,
+    .tp_new = Db32SortedArray_New,
+};
+
+static PyTypeObject Db32SortedArrayIterType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32SortedArrayIterator",
+    .tp_basicsize = sizeof(Db32SortedArrayIter),
+    .tp_dealloc = (destructor)Db32SortedArrayIter_dealloc,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_iter = PyObject_SelfIter,
+    .tp_iternext = (iternextfunc)Db32SortedArrayIter_next,
+};
+
+
+/*
+ * C implementation of `dbase32.Db32Id`.
+ *
+ * An immutable ID value that stores up to `MAX_BIN_LEN` bytes inline, in its
+ * binary form.  The Dbase32 `str` is only built when first needed, after which
+ * it's cached.
+ */
+typedef struct {
+    PyObject_HEAD
+    PyObject *text;
+    uint8_t bin_len;
+    uint8_t bin_buf[MAX_BIN_LEN];
+} Db32Id;
+
+static PyTypeObject Db32IdType;
+
+
+static PyObject *
+_Db32Id_alloc(PyTypeObject *type, const uint8_t *bin_buf, const size_t bin_len)
+{
+    Db32Id *self = (Db32Id *)type->tp_alloc(type, 0);
+    if (self != NULL) {
+        self->text = NULL;
+        self->bin_len = (uint8_t)bin_len;
+        memcpy(self->bin_buf, bin_buf, bin_len);
+    }
+    return (PyObject *)self;
+}
+
+
+static PyObject *
+Db32Id_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"text", NULL};
+    PyObject *text = NULL;
+    const uint8_t *txt_buf = NULL;
+    size_t txt_len = 0;
+    uint8_t bin_buf[MAX_BIN_LEN];
+    uint8_t status = 1;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "O:Db32Id", keys, &text)) {
+        return NULL;
+    }
+    if (! _get_text(text, &txt_buf, &txt_len)) {
+        return NULL;
+    }
+    if (! _check_txt_len(txt_len)) {
+        return NULL;
+    }
+    status = _decode(txt_buf, txt_len, bin_buf, txt_len * 5 / 8);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, text);
+        return NULL;
+    }
+    return _Db32Id_alloc(type, bin_buf, txt_len * 5 / 8);
+}
+
+
+static PyObject *
+Db32Id_frombytes(PyTypeObject *type, PyObject *args)
+{
+    size_t bin_len = 0;
+    const uint8_t *bin_buf = NULL;
+
+    if (!PyArg_ParseTuple(args, "y#:frombytes", &bin_buf, &bin_len)) {
+        return NULL;
+    }
+    if (! _check_bin_len(bin_len)) {
+        return NULL;
+    }
+    return _Db32Id_alloc(type, bin_buf, bin_len);
+}
+
+
+static void
+Db32Id_dealloc(Db32Id *self)
+{
+    Py_CLEAR(self->text);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static PyObject *
+Db32Id_str(Db32Id *self)
+{
+    if (self->text == NULL) {
+        self->text = _encode_key(self->bin_buf, self->bin_len);
+        if (self->text == NULL) {
+            return NULL;
+        }
+    }
+    Py_INCREF(self->text);
+    return self->text;
+}
+
+
+static PyObject *
+Db32Id_repr(Db32Id *self)
+{
+    PyObject *text = Db32Id_str(self);
+    PyObject *ret = NULL;
+    if (text != NULL) {
+        ret = PyUnicode_FromFormat("Db32Id(%R)", text);
+        Py_DECREF(text);
+    }
+    return ret;
+}
+
+
+static Py_hash_t
+Db32Id_hash(Db32Id *self)
+{
+    size_t start = (self->bin_len > 8) ? self->bin_len - 8 : 0;
+    Py_uhash_t h = 0;
+    size_t i;
+    for (i = start; i < self->bin_len; i++) {
+        h = (h << 8) | self->bin_buf[i];
+    }
+    if ((Py_hash_t)h == -1) {
+        return -2;
+    }
+    return (Py_hash_t)h;
+}
+
+
+static PyObject *
+Db32Id_richcompare(PyObject *a, PyObject *b, int op)
+{
+    const Db32Id *x = (Db32Id *)a;
+    const Db32Id *y = (Db32Id *)b;
+    int cmp;
+
+    if (!PyObject_TypeCheck(a, &Db32IdType)
+            || !PyObject_TypeCheck(b, &Db32IdType)) {
+        Py_RETURN_NOTIMPLEMENTED;
+    }
+    cmp = memcmp(x->bin_buf, y->bin_buf,
+        (x->bin_len < y->bin_len) ? x->bin_len : y->bin_len
+    );
+    if (cmp == 0) {
+        cmp = (int)x->bin_len - (int)y->bin_len;
+    }
+    switch (op) {
+        case Py_LT: return PyBool_FromLong(cmp < 0);
+        case Py_LE: return PyBool_FromLong(cmp <= 0);
+        case Py_EQ: return PyBool_FromLong(cmp == 0);
+        case Py_NE: return PyBool_FromLong(cmp != 0);
+        case Py_GT: return PyBool_FromLong(cmp > 0);
+        case Py_GE: return PyBool_FromLong(cmp >= 0);
+    }
+    Py_RETURN_NOTIMPLEMENTED;
+}
+
+
+static PyObject *
+Db32Id_get_binary(Db32Id *self, void *closure)
+{
+    return PyBytes_FromStringAndSize(
+        (const char *)self->bin_buf, (ssize_t)self->bin_len
+    );
+}
+
+
+static PyObject *
+Db32Id_reduce(Db32Id *self, PyObject *unused)
+{
+    PyObject *frombytes = PyObject_GetAttrString(
+        (PyObject *)Py_TYPE(self), "frombytes"
+    );
+    if (frombytes == NULL) {
+        return NULL;
+    }
+    return Py_BuildValue("(N(y#))",
+        frombytes, self->bin_buf, (ssize_t)self->bin_len
+    );
+}
+
+
+static PyMethodDef Db32Id_methods[] = {
+    {"frombytes", (PyCFunction)Db32Id_frombytes, METH_VARARGS | METH_CLASS,
+        "frombytes(data)"},
+    {"__reduce__", (PyCFunction)Db32Id_reduce, METH_NOARGS, NULL},
+    {NULL}
+};
+
+static PyGetSetDef Db32Id_getset[] = {
+    {"binary", (getter)Db32Id_get_binary, NULL, "the binary ID", NULL},
+    {NULL}
+};
+
+static PyTypeObject Db32IdType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32Id",
+    .tp_basicsize = sizeof(Db32Id),
+    .tp_dealloc = (destructor)Db32Id_dealloc,
+    .tp_repr = (reprfunc)Db32Id_repr,
+    .tp_hash = (hashfunc)Db32Id_hash,
+    .tp_str = (reprfunc)Db32Id_str,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Db32Id(text)",
+    .tp_richcompare = Db32Id_richcompare,
+    .tp_methods = Db32Id_methods,
+    .tp_getset = Db32Id_getset,
+    .tp_new = Db32Id_New,
+};
+
+
+/*
+ * C implementation of `dbase32.Db32Cache`.
+ *
+ * A fixed size LRU cache of decoded IDs, keyed by exact `str` instances.  The
+ * entries are kept in a doubly linked list (most recently used at the head),
+ * threaded through a preallocated array of nodes.  A `dict` maps each cached
+ * `str` to the `int` index of its node.
+ */
+#define _CACHE_NONE SIZE_MAX
+
+typedef struct {
+    PyObject *key;    /* The `str` ID */
+    PyObject *value;  /* The decoded `bytes` */
+    PyObject *index;  /* This node's index as an `int`, created once */
+    size_t prev;
+    size_t next;
+} _CacheNode;
+
+typedef struct {
+    PyObject_HEAD
+    PyObject *map;
+    _CacheNode *nodes;
+    size_t maxsize;
+    size_t currsize;
+    size_t head;
+    size_t tail;
+    size_t hits;
+    size_t misses;
+    size_t evictions;
+} Db32Cache;
+
+static PyTypeObject Db32CacheType;
+
+static PyStructSequence_Field _cache_info_fields[] = {
+    {"hits", "number of lookups answered from the cache"},
+    {"misses", "number of lookups that had to decode"},
+    {"evictions", "number of entries evicted to make room"},
+    {"maxsize", "maximum number of entries"},
+    {"currsize", "current number of entries"},
+    {NULL}
+};
+
+static PyStructSequence_Desc _cache_info_desc = {
+    "dbase32.Db32CacheInfo",
+    NULL,
+    _cache_info_fields,
+    5
+};
+
+static PyTypeObject Db32CacheInfoType;
+
+
+static void
+_cache_unlink(Db32Cache *self, const size_t i)
+{
+    _CacheNode *node = self->nodes + i;
+    if (node->prev == _CACHE_NONE) {
+        self->head = node->next;
+    }
+    else {
+        self->nodes[node->prev].next = node->next;
+    }
+    if (node->next == _CACHE_NONE) {
+        self->tail = node->prev;
+    }
+    else {
+        self->nodes[node->next].prev = node->prev;
+    }
+}
+
+
+static void
+_cache_push_front(Db32Cache *self, const size_t i)
+{
+    _CacheNode *node = self->nodes + i;
+    node->prev = _CACHE_NONE;
+    node->next = self->head;
+    if (self->head == _CACHE_NONE) {
+        self->tail = i;
+    }
+    else {
+        self->nodes[self->head].prev = i;
+    }
+    self->head = i;
+}
+
+
+static void
+_cache_clear(Db32Cache *self)
+{
+    size_t i;
+
+    if (self->map != NULL) {
+        PyDict_Clear(self->map);
+    }
+    for (i = 0; i < self->currsize; i++) {
+        Py_CLEAR(self->nodes[i].key);
+        Py_CLEAR(self->nodes[i].value);
+    }
+    self->currsize = 0;
+    self->head = self->tail = _CACHE_NONE;
+}
+
+
+/*
+ * Add a newly decoded `value` for `key`, evicting the LRU entry when full.
+ *
+ * Returns false with a Python exception set on error (in which case the cache
+ * is left empty).
+ */
+static bool
+_cache_add(Db32Cache *self, PyObject *key, PyObject *value)
+{
+    _CacheNode *node = NULL;
+    size_t i;
+
+    if (self->currsize < self->maxsize) {
+        i = self->currsize;
+        node = self->nodes + i;
+        if (node->index == NULL) {
+            node->index = PyLong_FromSize_t(i);
+            if (node->index == NULL) {
+                return false;
+            }
+        }
+        self->currsize++;
+    }
+    else {
+        i = self->tail;
+        node = self->nodes + i;
+        _cache_unlink(self, i);
+        if (PyDict_DelItem(self->map, node->key) != 0) {
+            _cache_clear(self);
+            return false;
+        }
+        Py_CLEAR(node->key);
+        Py_CLEAR(node->value);
+        self->evictions++;
+    }
+    Py_INCREF(key);
+    Py_INCREF(value);
+    node->key = key;
+    node->value = value;
+    _cache_push_front(self, i);
+    if (PyDict_SetItem(self->map, key, node->index) != 0) {
+        _cache_clear(self);
+        return false;
+    }
+    return true;
+}
+
+
+/*
+ * Call a module level function with `text` as its only argument.
+ */
+static PyObject *
+_cache_bypass(PyCFunction func, PyObject *text)
+{
+    PyObject *ret = NULL;
+    PyObject *args = PyTuple_Pack(1, text);
+    if (args != NULL) {
+        ret = func(NULL, args);
+        Py_DECREF(args);
+    }
+    return ret;
+}
+
+
+/*
+ * Return a new reference to the decoded `bytes`, or NULL on error.
+ */
+static PyObject *
+_cache_lookup(Db32Cache *self, PyObject *text)
+{
+    PyObject *index = NULL;
+    PyObject *value = NULL;
+    size_t i;
+
+    if (! PyUnicode_CheckExact(text)) {
+        return _cache_bypass(db32dec, text);
+    }
+    index = PyDict_GetItem(self->map, text);
+    if (index != NULL) {
+        i = PyLong_AsSize_t(index);
+        if (i != self->head) {
+            _cache_unlink(self, i);
+            _cache_push_front(self, i);
+        }
+        self->hits++;
+        Py_INCREF(self->nodes[i].value);
+        return self->nodes[i].value;
+    }
+    value = _cache_bypass(db32dec, text);
+    if (value == NULL) {
+        return NULL;
+    }
+    self->misses++;
+    if (! _cache_add(self, text, value)) {
+        Py_DECREF(value);
+        return NULL;
+    }
+    return value;
+}
+
+
+static PyObject *
+Db32Cache_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"maxsize", NULL};
+    ssize_t maxsize = 1024;
+    Db32Cache *self = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "|n:Db32Cache", keys,
+            &maxsize)) {
+        return NULL;
+    }
+    if (maxsize < 1) {
+        PyErr_Format(PyExc_ValueError,
+            "maxsize is %zd, need maxsize >= 1", maxsize
+        );
+        return NULL;
+    }
+    self = (Db32Cache *)type->tp_alloc(type, 0);
+    if (self == NULL) {
+        return NULL;
+    }
+    self->maxsize = (size_t)maxsize;
+    self->head = self->tail = _CACHE_NONE;
+    self->map = PyDict_New();
+    if (self->maxsize <= SIZE_MAX / sizeof(_CacheNode)) {
+        self->nodes = PyMem_Malloc(self->maxsize * sizeof(_CacheNode));
+    }
+    if (self->map == NULL || self->nodes == NULL) {
+        if (self->nodes == NULL) {
+            PyErr_NoMemory();
+        }
+        Py_DECREF(self);
+        return NULL;
+    }
+    memset(self->nodes, 0, self->maxsize * sizeof(_CacheNode));
+    return (PyObject *)self;
+}
+
+
+static void
+Db32Cache_dealloc(Db32Cache *self)
+{
+    size_t i;
+
+    if (self->nodes != NULL) {
+        _cache_clear(self);
+        for (i = 0; i < self->maxsize; i++) {
+            Py_CLEAR(self->nodes[i].index);
+        }
+        PyMem_Free(self->nodes);
+    }
+    Py_CLEAR(self->map);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static PyObject *
+Db32Cache_db32dec(Db32Cache *self, PyObject *text)
+{
+    return _cache_lookup(self, text);
+}
+
+
+static PyObject *
+Db32Cache_check_db32(Db32Cache *self, PyObject *text)
+{
+    PyObject *value = NULL;
+
+    if (! PyUnicode_CheckExact(text)) {
+        return _cache_bypass(check_db32, text);
+    }
+    value = _cache_lookup(self, text);
+    if (value == NULL) {
+        return NULL;
+    }
+    Py_DECREF(value);
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+Db32Cache_cache_info(Db32Cache *self, PyObject *unused)
+{
+    PyObject *info = PyStructSequence_New(&Db32CacheInfoType);
+    if (info == NULL) {
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(info, 0, PyLong_FromSize_t(self->hits));
+    PyStructSequence_SET_ITEM(info, 1, PyLong_FromSize_t(self->misses));
+    PyStructSequence_SET_ITEM(info, 2, PyLong_FromSize_t(self->evictions));
+    PyStructSequence_SET_ITEM(info, 3, PyLong_FromSize_t(self->maxsize));
+    PyStructSequence_SET_ITEM(info, 4, PyLong_FromSize_t(self->currsize));
+    if (PyErr_Occurred()) {
+        Py_DECREF(info);
+        return NULL;
+    }
+    return info;
+}
+
+
+static PyObject *
+Db32Cache_cache_clear(Db32Cache *self, PyObject *unused)
+{
+    _cache_clear(self);
+    self->hits = self->misses = self->evictions = 0;
+    Py_RETURN_NONE;
+}
+
+
+static PyObject *
+Db32Cache_get_maxsize(Db32Cache *self, void *closure)
+{
+    return PyLong_FromSize_t(self->maxsize);
+}
+
+
+static PyMethodDef Db32Cache_methods[] = {
+    {"db32dec", (PyCFunction)Db32Cache_db32dec, METH_O, "db32dec(text)"},
+    {"check_db32", (PyCFunction)Db32Cache_check_db32, METH_O,
+        "check_db32(text)"},
+    {"cache_info", (PyCFunction)Db32Cache_cache_info, METH_NOARGS,
+        "cache_info()"},
+    {"cache_clear", (PyCFunction)Db32Cache_cache_clear, METH_NOARGS,
+        "cache_clear()"},
+    {NULL}
+};
+
+static PyGetSetDef Db32Cache_getset[] = {
+    {"maxsize", (getter)Db32Cache_get_maxsize, NULL,
+        "maximum number of cached IDs", NULL},
+    {NULL}
+};
+
+static PyTypeObject Db32CacheType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Db32Cache",
+    .tp_basicsize = sizeof(Db32Cache),
+    .tp_dealloc = (destructor)Db32Cache_dealloc,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Db32Cache(maxsize=1024)",
+    .tp_methods = Db32Cache_methods,
+    .tp_getset = Db32Cache_getset,
+    .tp_new = Db32Cache_New,
+};
+
+
+/*
+ * C implementation of `dbase32.IdGenerator`.
+ *
+ * Produces strictly increasing IDs with the `time_id()` layout.  When the
+ * clock moves to a new second, the 11 byte tail is seeded from
+ * `os.urandom()`; otherwise the previous ID is incremented by one.  When a fork
+ * is detected, the ID jumps ahead by a random amount so a forked child and its
+ * parent don't mint the same IDs.
+ *
+ * `_get_random()` can release the GIL, so random bytes are drawn into locals
+ * and the state is re-checked and updated only once it has returned.
+ */
+typedef struct {
+    PyObject_HEAD
+    bool started;
+    uint32_t ts;
+    size_t forks;
+    uint8_t bin_buf[15];
+} IdGenerator;
+
+static PyTypeObject IdGeneratorType;
+
+
+/*
+ * _coarse_time(): cheaply read the current time in whole seconds.
+ *
+ * Used by `IdGenerator`.
+ */
+static uint32_t
+_coarse_time(void)
+{
+#ifdef CLOCK_REALTIME_COARSE
+    struct timespec now;
+    if (clock_gettime(CLOCK_REALTIME_COARSE, &now) == 0) {
+        return (uint32_t)now.tv_sec;
+    }
+#endif
+    return (uint32_t)time(NULL);
+}
+
+
+/*
+ * _add_be(): add `value` to the big-endian integer in `buf`.
+ *
+ * Used by `IdGenerator`.
+ *
+ * Returns true if the sum overflowed `size` bytes.
+ */
+static bool
+_add_be(uint8_t *buf, uint64_t value, const size_t size)
+{
+    size_t i = size;
+    unsigned int sum;
+
+    while (i > 0 && value > 0) {
+        i--;
+        sum = (unsigned int)buf[i] + (unsigned int)(value & 255);
+        buf[i] = (uint8_t)sum;
+        value = (value >> 8) + (sum >> 8);
+    }
+    return value > 0;
+}
+
+
+/*
+ * _random_u64(): read an integer from `len` random bytes.
+ *
+ * Used by `IdGenerator` and `NodeIdGenerator`.
+ *
+ * Returns 0 on success, or sets a Python exception and returns -1.
+ */
+static int
+_random_u64(uint64_t *value, const size_t len)
+{
+    uint8_t buf[8];
+    size_t i;
+
+    if (_get_random(buf, len) != 0) {
+        return -1;
+    }
+    *value = 0;
+    for (i = 0; i < len; i++) {
+        *value = (*value << 8) | buf[i];
+    }
+    return 0;
+}
+
+
+static PyObject *
+IdGenerator_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {NULL};
+    IdGenerator *self = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, ":IdGenerator", keys)) {
+        return NULL;
+    }
+    self = (IdGenerator *)type->tp_alloc(type, 0);
+    if (self != NULL) {
+        self->started = false;
+        self->ts = 0;
+        self->forks = _fork_count;
+    }
+    return (PyObject *)self;
+}
+
+
+static PyObject *
+IdGenerator_next(IdGenerator *self)
+{
+    const uint32_t now = _coarse_time();
+    bool have_tail = false;
+    bool have_jump = false;
+    uint8_t tail[11];
+    uint8_t bin_buf[15];
+    uint64_t jump = 0;
+    PyObject *ret = NULL;
+
+    while (true) {
+        if (! self->started || now > self->ts) {
+            if (! have_tail) {
+                if (_get_random(tail, 11) != 0) {
+                    return NULL;
+                }
+                have_tail = true;
+                continue;  /* The GIL might have been released */
+            }
+            _pack_be(self->bin_buf, now, 4);
+            memcpy(self->bin_buf + 4, tail, 11);
+            self->ts = now;
+            self->started = true;
+            self->forks = _fork_count;
+            break;
+        }
+        if (self->forks != _fork_count && ! have_jump) {
+            if (_random_u64(&jump, 7) != 0) {
+                return NULL;
+            }
+            have_jump = true;
+            continue;  /* The GIL might have been released */
+        }
+        if (self->forks == _fork_count) {
+            jump = 0;  /* Another thread already jumped */
+        }
+        /* Increment, carrying into the timestamp when the tail overflows */
+        if (_add_be(self->bin_buf, 1 + jump, 15)) {
+            memset(self->bin_buf, 255, 15);
+            PyErr_SetString(PyExc_OverflowError, "IdGenerator exhausted");
+            return NULL;
+        }
+        self->ts = (uint32_t)self->bin_buf[0] << 24
+            | (uint32_t)self->bin_buf[1] << 16
+            | (uint32_t)self->bin_buf[2] << 8
+            | (uint32_t)self->bin_buf[3];
+        self->forks = _fork_count;
+        break;
+    }
+
+    /* Copy out before allocating, which could run other Python code */
+    memcpy(bin_buf, self->bin_buf, 15);
+    ret = PyUnicode_New(24, DB32_END);
+    if (ret != NULL) {
+        if (_encode(bin_buf, 15, PyUnicode_1BYTE_DATA(ret), 24) != 0) {
+            Py_CLEAR(ret);
+            Py_FatalError("dbase32 internal error in IdGenerator");
+        }
+    }
+    return ret;
+}
+
+
+static PyObject *
+IdGenerator_call(IdGenerator *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, ":IdGenerator", keys)) {
+        return NULL;
+    }
+    return IdGenerator_next(self);
+}
+
+
+static PyTypeObject IdGeneratorType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.IdGenerator",
+    .tp_basicsize = sizeof(IdGenerator),
+    .tp_call = (ternaryfunc)IdGenerator_call,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "IdGenerator()",
+    .tp_iter = PyObject_SelfIter,
+    .tp_iternext = (iternextfunc)IdGenerator_next,
+    .tp_new = IdGenerator_New,
+};
+
+
+/*
+ * C implementation of `dbase32.NodeIdGenerator`.
+ *
+ * Produces strictly increasing IDs with the `time_id()` layout, but with the
+ * 11 byte tail split into a 4 byte node number and a 7 byte sequence:
+ *
+ *     timestamp (4 bytes) | node (4 bytes) | seq (7 bytes)
+ *
+ * When the clock moves to a new second, `seq` starts from a random 48-bit
+ * value, leaving ample headroom below 2**56.  When a fork is detected (via the
+ * `pthread_atfork()` handler installed for the entropy pool), `seq` jumps
+ * ahead by a random amount so a forked child and its parent don't mint the
+ * same IDs.  As with `IdGenerator`, random values are drawn into locals and the
+ * state is re-checked after `_get_random()` returns, as it can release the GIL.
+ */
+#define _NODE_SEQ_MAX 72057594037927935ull
+
+typedef struct {
+    PyObject_HEAD
+    bool started;
+    uint32_t node;
+    uint32_t ts;
+    uint64_t seq;
+    size_t forks;
+} NodeIdGenerator;
+
+static PyTypeObject NodeIdGeneratorType;
+
+
+static PyObject *
+NodeIdGenerator_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"node", NULL};
+    long long node = 0;
+    NodeIdGenerator *self = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "L:NodeIdGenerator", keys,
+            &node)) {
+        return NULL;
+    }
+    if (node < 0 || node > 4294967295ll) {
+        PyErr_Format(PyExc_ValueError,
+            "node is %lld, need 0 <= node < 2**32", node
+        );
+        return NULL;
+    }
+    self = (NodeIdGenerator *)type->tp_alloc(type, 0);
+    if (self != NULL) {
+        self->started = false;
+        self->node = (uint32_t)node;
+        self->ts = 0;
+        self->seq = 0;
+        self->forks = _fork_count;
+    }
+    return (PyObject *)self;
+}
+
+
+static PyObject *
+NodeIdGenerator_next(NodeIdGenerator *self)
+{
+    const uint32_t now = _coarse_time();
+    bool have_seed = false;
+    bool have_jump = false;
+    uint64_t seed = 0;
+    uint64_t jump = 0;
+    uint8_t bin_buf[15];
+    PyObject *ret = NULL;
+
+    while (true) {
+        if (! self->started || now > self->ts) {
+            if (! have_seed) {
+                if (_random_u64(&seed, 6) != 0) {
+                    return NULL;
+                }
+                have_seed = true;
+                continue;  /* The GIL might have been released */
+            }
+            self->seq = seed;
+            self->ts = now;
+            self->started = true;
+            self->forks = _fork_count;
+            break;
+        }
+        if (self->forks != _fork_count && ! have_jump) {
+            if (_random_u64(&jump, 5) != 0) {
+                return NULL;
+            }
+            have_jump = true;
+            continue;  /* The GIL might have been released */
+        }
+        if (self->forks == _fork_count) {
+            jump = 0;  /* Another thread already jumped */
+        }
+        if (self->seq >= _NODE_SEQ_MAX - jump) {
+            PyErr_SetString(PyExc_OverflowError, "NodeIdGenerator exhausted");
+            return NULL;
+        }
+        self->seq += 1 + jump;
+        self->forks = _fork_count;
+        break;
+    }
+
+    /* Build on the `time_id()` layout */
+    _pack_be(bin_buf, self->ts, 4);
+    _pack_be(bin_buf + 4, self->node, 4);
+    _pack_be(bin_buf + 8, self->seq, 7);
+
+    ret = PyUnicode_New(24, DB32_END);
+    if (ret != NULL) {
+        if (_encode(bin_buf, 15, PyUnicode_1BYTE_DATA(ret), 24) != 0) {
+            Py_CLEAR(ret);
+            Py_FatalError("dbase32 internal error in NodeIdGenerator");
+        }
+    }
+    return ret;
+}
+
+
+static PyObject *
+NodeIdGenerator_call(NodeIdGenerator *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, ":NodeIdGenerator", keys)) {
+        return NULL;
+    }
+    return NodeIdGenerator_next(self);
+}
+
+
+static PyObject *
+NodeIdGenerator_get_node(NodeIdGenerator *self, void *closure)
+{
+    return PyLong_FromUnsignedLong(self->node);
+}
+
+
+static PyGetSetDef NodeIdGenerator_getset[] = {
+    {"node", (getter)NodeIdGenerator_get_node, NULL,
+        "node number embedded in each ID", NULL},
+    {NULL}
+};
+
+
+static PyTypeObject NodeIdGeneratorType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.NodeIdGenerator",
+    .tp_basicsize = sizeof(NodeIdGenerator),
+    .tp_call = (ternaryfunc)NodeIdGenerator_call,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "NodeIdGenerator(node)",
+    .tp_iter = PyObject_SelfIter,
+    .tp_iternext = (iternextfunc)NodeIdGenerator_next,
+    .tp_getset = NodeIdGenerator_getset,
+    .tp_new = NodeIdGenerator_New,
+};
+
+
+/*
+ * C implementation of `dbase32.node_id_unpack()`.
+ */
+static PyObject *
+node_id_unpack(PyObject *self, PyObject *args)
+{
+    const uint8_t *txt_buf = NULL;
+    size_t txt_len = 0;
+    uint8_t bin_buf[15];
+    uint8_t status = 1;
+    uint64_t seq = 0;
+    size_t i;
+
+    if (!PyArg_ParseTuple(args, "s#:node_id_unpack", &txt_buf, &txt_len)) {
+        return NULL;
+    }
+    if (! _check_txt_len(txt_len)) {
+        return NULL;
+    }
+    if (txt_len != 24) {
+        PyErr_Format(PyExc_ValueError,
+            "len(text) is %u, need len(text) == 24", txt_len
+        );
+        return NULL;
+    }
+    status = _decode(txt_buf, 24, bin_buf, 15);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, PyTuple_GetItem(args, 0));
+        return NULL;
+    }
+    for (i = 8; i < 15; i++) {
+        seq = (seq << 8) | bin_buf[i];
+    }
+    return Py_BuildValue("(kkK)",
+        (unsigned long)((uint32_t)bin_buf[0] << 24 | (uint32_t)bin_buf[1] << 16
+            | (uint32_t)bin_buf[2] << 8 | (uint32_t)bin_buf[3]),
+        (unsigned long)((uint32_t)bin_buf[4] << 24 | (uint32_t)bin_buf[5] << 16
+            | (uint32_t)bin_buf[6] << 8 | (uint32_t)bin_buf[7]),
+        (unsigned long long)seq
+    );
+}
+
+/*
+ * C implementation of `dbase32.PathBuilder`.
+ *
+ * Binds a parent directory and layout once, so each call only has to check
+ * the ID and write the path with `_join_levels()`.
+ */
+typedef struct {
+    PyObject_HEAD
+    PyObject *parentdir;
+    PyObject *layout;
+    size_t levels[MAX_TXT_LEN];
+    size_t count;
+    size_t total;
+} PathBuilder;
+
+static PyTypeObject PathBuilderType;
+
+
+static void
+PathBuilder_dealloc(PathBuilder *self)
+{
+    Py_CLEAR(self->parentdir);
+    Py_CLEAR(self->layout);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static PyObject *
+PathBuilder_New(PyTypeObject *type, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"parentdir", "layout", NULL};
+    PyObject *parentdir = NULL;
+    PyObject *layout = NULL;
+    PathBuilder *self = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "O|O:PathBuilder", keys,
+            &parentdir, &layout)) {
         return NULL;
     }
-    if (PyUnicode_READY(id) != 0) {
+    if (! PyUnicode_Check(parentdir)) {
+        PyErr_Format(PyExc_TypeError,
+            "parentdir: need a %R; got a %R: %R",
+            (PyObject *)&PyUnicode_Type, Py_TYPE(parentdir), parentdir
+        );
         return NULL;
     }
-    if (PyUnicode_MAX_CHAR_VALUE(id) != 127) {
-        PyErr_Format(PyExc_ValueError, "_id is not ASCII: %R", id);
+    if (PyUnicode_READY(parentdir) != 0) {
         return NULL;
     }
-
-    /* Make sure `id` is valid Dbase32 */
-    id_buf = PyUnicode_1BYTE_DATA(id);
-    id_len = (size_t)PyUnicode_GET_LENGTH(id);
-    if (! _check_txt_len(id_len)) {
+    self = (PathBuilder *)type->tp_alloc(type, 0);
+    if (self == NULL) {
         return NULL;
     }
-    status = _validate(id_buf, id_len);
-    if (status != 0) {
-        _handle_invalid_dbase32(status, id);
+    if (layout == NULL) {
+        layout = _int_two;
+    }
+    Py_INCREF(layout);
+    self->layout = layout;
+    if (! _parse_levels("layout", self->layout, true, self->levels,
+            &self->count, &self->total)) {
+        Py_DECREF(self);
         return NULL;
     }
-    return id;
+    Py_INCREF(parentdir);
+    self->parentdir = parentdir;
+    return (PyObject *)self;
 }
 
 
 /*
- * C implementation of `dbase32.db32_join()`.
+ * _PathBuilder_build(): check `id` and build its path.
+ *
+ * Used by `PathBuilder.__call__()`.
  */
 static PyObject *
-db32_join(PyObject *self, PyObject *args)
+_PathBuilder_build(PathBuilder *self, PyObject *id)
 {
-    PyObject *id = _check_join("db32_join", args);
-    if (id == NULL) {
+    if (! _check_join_id(id)) {
         return NULL;
     }
-    if (PyTuple_GET_SIZE(args) == 1) {
-        Py_INCREF(id);
-        return id;
+    if (! _check_levels_fit("layout", self->layout, self->total, id)) {
+        return NULL;
     }
-    return PyUnicode_Join(_str_slash, args);
+    return _join_levels(&self->parentdir, 1, id, self->levels, self->count);
+}
+
+
+static PyObject *
+PathBuilder_call(PathBuilder *self, PyObject *args, PyObject *kw)
+{
+    static char *keys[] = {"_id", NULL};
+    PyObject *id = NULL;
+
+    /* Skip argument parsing in the common case of a single positional arg */
+    if (kw == NULL && PyTuple_GET_SIZE(args) == 1) {
+        return _PathBuilder_build(self, PyTuple_GET_ITEM(args, 0));
+    }
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "O:PathBuilder", keys, &id)) {
+        return NULL;
+    }
+    return _PathBuilder_build(self, id);
+}
+
+
+static PyObject *
+PathBuilder_paths(PathBuilder *self, PyObject *ids)
+{
+    return _build_paths(&self->parentdir, self->layout, self->levels,
+        self->count, self->total, ids, _PATHS_STRICT
+    );
+}
+
+
+static PyMethodDef PathBuilder_methods[] = {
+    {"paths", (PyCFunction)PathBuilder_paths, METH_O, "paths(ids)"},
+    {NULL}
+};
+
+
+static PyObject *
+PathBuilder_get_parentdir(PathBuilder *self, void *closure)
+{
+    Py_INCREF(self->parentdir);
+    return self->parentdir;
+}
+
+
+static PyObject *
+PathBuilder_get_layout(PathBuilder *self, void *closure)
+{
+    Py_INCREF(self->layout);
+    return self->layout;
+}
+
+
+static PyGetSetDef PathBuilder_getset[] = {
+    {"parentdir", (getter)PathBuilder_get_parentdir, NULL,
+        "parent directory of each path", NULL},
+    {"layout", (getter)PathBuilder_get_layout, NULL,
+        "directory levels each ID is split into", NULL},
+    {NULL}
+};
+
+
+static PyTypeObject PathBuilderType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.PathBuilder",
+    .tp_basicsize = sizeof(PathBuilder),
+    .tp_dealloc = (destructor)PathBuilder_dealloc,
+    .tp_call = (ternaryfunc)PathBuilder_call,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "PathBuilder(parentdir, layout=2)",
+    .tp_methods = PathBuilder_methods,
+    .tp_getset = PathBuilder_getset,
+    .tp_new = PathBuilder_New,
+};
+
+
+/*
+ * C implementation of `dbase32.Codec`.
+ *
+ * Builds the forward and rotated reverse tables for any alphabet accepted by
+ * `gen.check_forward()`, then runs the same kernels as `db32enc()`,
+ * `db32dec()`, and `isdb32()`.
+ */
+#define _POSSIBLE "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+typedef struct {
+    PyObject_HEAD
+    PyObject *forward_obj;
+    uint8_t end;
+    uint8_t forward[32];
+    uint8_t reverse[256];
+} Codec;
+
+static PyTypeObject CodecType;
+
+
+static void
+Codec_dealloc(Codec *self)
+{
+    Py_CLEAR(self->forward_obj);
+    Py_TYPE(self)->tp_free((PyObject *)self);
 }
 
 
 /*
- * C implementation of `dbase32.db32_join_2()`.
+ * _check_forward(): same checks, in the same order, as `gen.check_forward()`.
+ *
+ * Used by `Codec.__new__()`.
  */
+static bool
+_check_forward(PyObject *forward)
+{
+    ssize_t len, i, j, unique;
+    Py_UCS4 c;
+    int kind;
+    void *data;
+
+    if (! PyUnicode_Check(forward)) {
+        PyErr_Format(PyExc_TypeError,
+            "forward: need a %R; got a %R: %R",
+            (PyObject *)&PyUnicode_Type, Py_TYPE(forward), forward
+        );
+        return false;
+    }
+    if (PyUnicode_READY(forward) != 0) {
+        return false;
+    }
+    len = PyUnicode_GET_LENGTH(forward);
+    if (len != 32) {
+        PyErr_Format(PyExc_ValueError,
+            "len(forward) != 32: [%zd] %R", len, forward
+        );
+        return false;
+    }
+    kind = PyUnicode_KIND(forward);
+    data = PyUnicode_DATA(forward);
+    unique = 0;
+    for (i = 0; i < len; i++) {
+        c = PyUnicode_READ(kind, data, i);
+        for (j = 0; j < i && PyUnicode_READ(kind, data, j) != c; j++) {
+        }
+        if (j == i) {
+            unique++;
+        }
+    }
+    if (unique != 32) {
+        PyErr_Format(PyExc_ValueError,
+            "len(set(forward)) != 32: [%zd] %R", unique, forward
+        );
+        return false;
+    }
+    for (i = 0; i < len; i++) {
+        c = PyUnicode_READ(kind, data, i);
+        if (c > 127 || memchr(_POSSIBLE, (int)c, strlen(_POSSIBLE)) == NULL) {
+            PyErr_Format(PyExc_ValueError,
+                "forward: %R not a subset of '%s'", forward, _POSSIBLE
+            );
+            return false;
+        }
+    }
+    return true;
+}
+
+
 static PyObject *
-db32_join_2(PyObject *self, PyObject *args)
+Codec_New(PyTypeObject *type, PyObject *args, PyObject *kw)
 {
-    PyObject *id = NULL;
-    const uint8_t *id_buf = NULL;
-    size_t id_len = 0;
-    PyObject *end = NULL;
-    uint8_t *end_buf = NULL;
-    PyObject *tmp = NULL;
-    PyObject *item = NULL;
-    PyObject *ret = NULL;
-    ssize_t i;
+    static char *keys[] = {"forward", NULL};
+    PyObject *forward = NULL;
+    Codec *self = NULL;
+    uint8_t c, i;
 
-    id = _check_join("db32_join_2", args);
-    if (id == NULL) {
-        goto cleanup;
+    if (!PyArg_ParseTupleAndKeywords(args, kw, "O:Codec", keys, &forward)) {
+        return NULL;
     }
-    id_buf = PyUnicode_1BYTE_DATA(id);
-    id_len = (size_t)PyUnicode_GET_LENGTH(id);
+    if (! _check_forward(forward)) {
+        return NULL;
+    }
+    self = (Codec *)type->tp_alloc(type, 0);
+    if (self == NULL) {
+        return NULL;
+    }
+    Py_INCREF(forward);
+    self->forward_obj = forward;
 
-    /* Build the path end */
-    end = PyUnicode_New((ssize_t)(id_len + 1), DB32_END);
-    if (end == NULL ) {
-        goto cleanup;
+    /* Same as `gen.rotate_left(gen.gen_reverse(forward), 42)` */
+    memset(self->reverse, 255, 256);
+    self->end = 0;
+    for (i = 0; i < 32; i++) {
+        c = PyUnicode_1BYTE_DATA(forward)[i];
+        self->forward[i] = c;
+        self->reverse[(uint8_t)(c - 42)] = i;
+        if (c > self->end) {
+            self->end = c;
+        }
     }
-    end_buf = PyUnicode_1BYTE_DATA(end);
-    end_buf[0] = id_buf[0];
-    end_buf[1] = id_buf[1];
-    end_buf[2] = '/';
-    memcpy(end_buf + 3, id_buf + 2, id_len - 2);
+    return (PyObject *)self;
+}
 
-    /* Performance optimization for when only one argument was given */
-    if (PyTuple_GET_SIZE(args) == 1) {
-        return end;
+
+static PyObject *
+Codec_repr(Codec *self)
+{
+    return PyUnicode_FromFormat("Codec(%R)", self->forward_obj);
+}
+
+
+/*
+ * _codec_type_error(): raise the same `TypeError` as the Python backend.
+ *
+ * Used by `_codec_get_text()` and `Codec.encode()`.
+ *
+ * The `rfc3548` functions are `Codec` methods, and their error messages have
+ * always been those of `_dbase32py._text_to_bytes()` and `encode_x()`.
+ */
+static void
+_codec_type_error(PyObject *obj, const bool text)
+{
+#if PY_VERSION_HEX >= 0x03050000
+    if (text && PyByteArray_Check(obj)) {
+        PyErr_SetString(PyExc_TypeError,
+            "must be read-only bytes-like object, not bytearray"
+        );
+    }
+    else {
+        PyErr_Format(PyExc_TypeError,
+            "a bytes-like object is required, not '%.100s'",
+            Py_TYPE(obj)->tp_name
+        );
+    }
+#else
+    if (text && PyByteArray_Check(obj)) {
+        PyErr_SetString(PyExc_TypeError,
+            "must be read-only pinned buffer, not bytearray"
+        );
     }
+    else {
+        PyErr_Format(PyExc_TypeError,
+            "'%.100s' does not support the buffer interface",
+            Py_TYPE(obj)->tp_name
+        );
+    }
+#endif
+}
 
-    /* Create temporary tuple used to build up path compontents */
-    tmp = PyTuple_New(PyTuple_GET_SIZE(args));
-    if (tmp == NULL) {
-        goto cleanup;
+
+/*
+ * _codec_get_text(): get the UTF-8 data from a `str` or `bytes` object.
+ *
+ * Used by `Codec.decode()`, `Codec.isvalid()`, and `Codec.check()`.
+ */
+static bool
+_codec_get_text(PyObject *text, const uint8_t **txt_buf, size_t *txt_len)
+{
+    if (PyUnicode_Check(text) || PyBytes_Check(text)) {
+        return _get_text(text, txt_buf, txt_len);
     }
+    _codec_type_error(text, true);
+    return false;
+}
 
-    /* Add parent path components to temporary tuple */
-    for (i=0; i < PyTuple_GET_SIZE(args) - 1; i++) {
-        item = PyTuple_GetItem(args, i);
-        if (item == NULL || PyTuple_SetItem(tmp, i, item) != 0) {
-            goto cleanup;
+
+static PyObject *
+Codec_encode(Codec *self, PyObject *data)
+{
+    size_t bin_len = 0;
+    size_t txt_len = 0;
+    PyObject *ret = NULL;
+
+    if (! PyBytes_Check(data)) {
+        _codec_type_error(data, false);
+        return NULL;
+    }
+    bin_len = (size_t)PyBytes_GET_SIZE(data);
+    if (! _check_bin_len(bin_len)) {
+        return NULL;
+    }
+    txt_len = bin_len * 8 / 5;
+    ret = PyUnicode_New((ssize_t)txt_len, self->end);
+    if (ret != NULL) {
+        if (_encode_x(self->forward, (uint8_t *)PyBytes_AS_STRING(data),
+                bin_len, PyUnicode_1BYTE_DATA(ret), txt_len) != 0) {
+            Py_CLEAR(ret);
+            Py_FatalError("dbase32 internal error in Codec.encode()");
         }
-        Py_INCREF(item);  /* PyTuple_SetItem() stole reference we borrowed */
     }
+    return ret;
+}
 
-    /* Add end to temporary tuple, then join path */
-    if (PyTuple_SetItem(tmp, i, end) != 0) {
-        goto cleanup;
-    }
-    end = NULL;  /* PyTuple_SetItem() stole reference we owned */
-    ret = PyUnicode_Join(_str_slash, tmp);
 
-cleanup:
-    Py_CLEAR(end);
-    Py_CLEAR(tmp);
+static PyObject *
+Codec_decode(Codec *self, PyObject *text)
+{
+    size_t txt_len = 0;
+    size_t bin_len = 0;
+    const uint8_t *txt_buf = NULL;
+    uint8_t status = 1;
+    PyObject *ret = NULL;
+
+    if (! _codec_get_text(text, &txt_buf, &txt_len)) {
+        return NULL;
+    }
+    if (! _check_txt_len(txt_len)) {
+        return NULL;
+    }
+    bin_len = txt_len * 5 / 8;
+    ret = PyBytes_FromStringAndSize(NULL, (ssize_t)bin_len);
+    if (ret != NULL) {
+        status = _decode_x(self->reverse, txt_buf, txt_len,
+            (uint8_t *)PyBytes_AS_STRING(ret), bin_len
+        );
+        if (status != 0) {
+            Py_CLEAR(ret);
+            _handle_invalid_dbase32(status, text);
+        }
+    }
     return ret;
 }
 
 
+static PyObject *
+Codec_isvalid(Codec *self, PyObject *text)
+{
+    size_t txt_len = 0;
+    const uint8_t *txt_buf = NULL;
+    uint8_t status = 1;
+
+    if (! _codec_get_text(text, &txt_buf, &txt_len)) {
+        return NULL;
+    }
+    if (txt_len < 8 || txt_len > MAX_TXT_LEN || txt_len % 8 != 0) {
+        Py_RETURN_FALSE;
+    }
+    status = _validate_x(self->reverse, txt_buf, txt_len);
+    if (status == 0) {
+        Py_RETURN_TRUE;
+    }
+    if (status != 224) {
+        Py_FatalError("dbase32 internal error in Codec.isvalid()");
+    }
+    Py_RETURN_FALSE;
+}
+
+
+static PyObject *
+Codec_check(Codec *self, PyObject *text)
+{
+    size_t txt_len = 0;
+    const uint8_t *txt_buf = NULL;
+    uint8_t status = 1;
+
+    if (! _codec_get_text(text, &txt_buf, &txt_len)) {
+        return NULL;
+    }
+    if (! _check_txt_len(txt_len)) {
+        return NULL;
+    }
+    status = _validate_x(self->reverse, txt_buf, txt_len);
+    if (status != 0) {
+        _handle_invalid_dbase32(status, text);
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+static PyMethodDef Codec_methods[] = {
+    {"encode", (PyCFunction)Codec_encode, METH_O, "encode(data)"},
+    {"decode", (PyCFunction)Codec_decode, METH_O, "decode(text)"},
+    {"isvalid", (PyCFunction)Codec_isvalid, METH_O, "isvalid(text)"},
+    {"check", (PyCFunction)Codec_check, METH_O, "check(text)"},
+    {NULL}
+};
+
+
+static PyObject *
+Codec_get_forward(Codec *self, void *closure)
+{
+    Py_INCREF(self->forward_obj);
+    return self->forward_obj;
+}
+
+
+static PyGetSetDef Codec_getset[] = {
+    {"forward", (getter)Codec_get_forward, NULL,
+        "the 32 symbol alphabet, in order", NULL},
+    {NULL}
+};
+
+
+static PyTypeObject CodecType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dbase32.Codec",
+    .tp_basicsize = sizeof(Codec),
+    .tp_dealloc = (destructor)Codec_dealloc,
+    .tp_repr = (reprfunc)Codec_repr,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Codec(forward)",
+    .tp_methods = Codec_methods,
+    .tp_getset = Codec_getset,
+    .tp_new = Codec_New,
+};
+
 /* module init */
 static struct PyMethodDef dbase32_functions[] = {
     {"db32enc", db32enc, METH_VARARGS, "db32enc(data)"},
     {"db32dec", db32dec, METH_VARARGS, "db32dec(text)"},
     {"isdb32", isdb32, METH_VARARGS, "isdb32(text)"},
     {"check_db32", check_db32, METH_VARARGS, "check_db32(text)"},
+    {"db32_succ", db32_succ, METH_VARARGS, "db32_succ(text)"},
+    {"db32_pred", db32_pred, METH_VARARGS, "db32_pred(text)"},
+    {"db32_cmp", db32_cmp, METH_VARARGS, "db32_cmp(text, data)"},
+    {"db32_bisect", db32_bisect, METH_VARARGS, "db32_bisect(texts, data)"},
     {"random_id", (PyCFunction)random_id, METH_VARARGS | METH_KEYWORDS,
         "random_id(numbytes=15)"},
     {"time_id", (PyCFunction)time_id, METH_VARARGS | METH_KEYWORDS,
         "time_id(timestamp=-1)"},
+    {"time_id_ms", (PyCFunction)time_id_ms, METH_VARARGS | METH_KEYWORDS,
+        "time_id_ms(timestamp=-1)"},
+    {"random_ids", (PyCFunction)random_ids, METH_VARARGS | METH_KEYWORDS,
+        "random_ids(n, numbytes=15)"},
+    {"time_ids", (PyCFunction)time_ids, METH_VARARGS | METH_KEYWORDS,
+        "time_ids(n, timestamp=-1)"},
+    {"time_id_timestamp", time_id_timestamp, METH_VARARGS,
+        "time_id_timestamp(text)"},
+    {"time_id_timestamps", time_id_timestamps, METH_VARARGS,
+        "time_id_timestamps(texts)"},
+    {"time_id_range", time_id_range, METH_VARARGS,
+        "time_id_range(start_ts, end_ts)"},
+    {"node_id_unpack", node_id_unpack, METH_VARARGS,
+        "node_id_unpack(text)"},
+    {"set_entropy_pool", set_entropy_pool, METH_VARARGS,
+        "set_entropy_pool(size)"},
+    {"entropy_pool_stats", entropy_pool_stats, METH_NOARGS,
+        "entropy_pool_stats()"},
     {"db32_join", db32_join, METH_VARARGS, "db32_join(parentdir, _id)"},
     {"db32_join_2", db32_join_2, METH_VARARGS, "db32_join_2(parentdir, _id)"},
+    {"db32_join_n", (PyCFunction)db32_join_n, METH_VARARGS | METH_KEYWORDS,
+        "db32_join_n(parentdir, _id, levels=(2, 2))"},
+    {"db32_join_time", (PyCFunction)db32_join_time,
+        METH_VARARGS | METH_KEYWORDS,
+        "db32_join_time(parentdir, _id, bucket=86400, width=2)"},
+    {"db32_join_bytes", db32_join_bytes, METH_VARARGS,
+        "db32_join_bytes(parentdir, _id)"},
+    {"db32_join_2_bytes", db32_join_2_bytes, METH_VARARGS,
+        "db32_join_2_bytes(parentdir, _id)"},
+    {"db32_split", (PyCFunction)db32_split, METH_VARARGS | METH_KEYWORDS,
+        "db32_split(path, layout=2)"},
+    {"db32_split_bytes", (PyCFunction)db32_split_bytes,
+        METH_VARARGS | METH_KEYWORDS, "db32_split_bytes(path, layout=2)"},
+    {"db32_paths", (PyCFunction)db32_paths, METH_VARARGS | METH_KEYWORDS,
+        "db32_paths(parentdir, ids, layout=2, errors='strict')"},
     {NULL, NULL, 0, NULL}
 };
 
@@ -842,9 +5619,64 @@ PyInit__dbase32(void)
     if (_str_slash == NULL) {
         return NULL;
     }
+    if (_int_two == NULL) {
+        _int_two = PyLong_FromLong(2);
+        if (_int_two == NULL) {
+            return NULL;
+        }
+    }
     PyModule_AddIntMacro(m, MAX_BIN_LEN);
     PyModule_AddIntMacro(m, MAX_TXT_LEN);
     PyModule_AddStringMacro(m, DB32ALPHABET);
+
+    /* Add types */
+    if (PyType_Ready(&Db32IdSetType) != 0
+            || PyType_Ready(&Db32IdSetIterType) != 0
+            || PyType_Ready(&Db32DictType) != 0
+            || PyType_Ready(&Db32DictIterType) != 0
+            || PyType_Ready(&Db32SortedArrayType) != 0
+            || PyType_Ready(&Db32SortedArrayIterType) != 0
+            || PyType_Ready(&Db32IdType) != 0
+            || PyType_Ready(&Db32CacheType) != 0
+            || PyType_Ready(&IdGeneratorType) != 0
+            || PyType_Ready(&NodeIdGeneratorType) != 0
+            || PyType_Ready(&PathBuilderType) != 0
+            || PyType_Ready(&CodecType) != 0) {
+        return NULL;
+    }
+    if (Db32CacheInfoType.tp_name == NULL) {
+        if (PyStructSequence_InitType2(&Db32CacheInfoType,
+                &_cache_info_desc) != 0) {
+            return NULL;
+        }
+    }
+    if (EntropyPoolStatsType.tp_name == NULL) {
+        if (PyStructSequence_InitType2(&EntropyPoolStatsType,
+                &_pool_stats_desc) != 0) {
+            return NULL;
+        }
+#ifdef HAVE_PTHREAD_H
+        pthread_atfork(NULL, NULL, _pool_after_fork);
+#endif
+    }
+    Py_INCREF(&Db32IdSetType);
+    PyModule_AddObject(m, "Db32IdSet", (PyObject *)&Db32IdSetType);
+    Py_INCREF(&Db32DictType);
+    PyModule_AddObject(m, "Db32Dict", (PyObject *)&Db32DictType);
+    Py_INCREF(&Db32SortedArrayType);
+    PyModule_AddObject(m, "Db32SortedArray", (PyObject *)&Db32SortedArrayType);
+    Py_INCREF(&Db32IdType);
+    PyModule_AddObject(m, "Db32Id", (PyObject *)&Db32IdType);
+    Py_INCREF(&Db32CacheType);
+    PyModule_AddObject(m, "Db32Cache", (PyObject *)&Db32CacheType);
+    Py_INCREF(&IdGeneratorType);
+    PyModule_AddObject(m, "IdGenerator", (PyObject *)&IdGeneratorType);
+    Py_INCREF(&NodeIdGeneratorType);
+    PyModule_AddObject(m, "NodeIdGenerator", (PyObject *)&NodeIdGeneratorType);
+    Py_INCREF(&PathBuilderType);
+    PyModule_AddObject(m, "PathBuilder", (PyObject *)&PathBuilderType);
+    Py_INCREF(&CodecType);
+    PyModule_AddObject(m, "Codec", (PyObject *)&CodecType);
     return m;
 }
 
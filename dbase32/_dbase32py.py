@@ -24,9 +24,17 @@
 Pure-Python implementation of the Dbase32 encoding.
 """
 
+import os
 from os import urandom
 import time
 import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from array import array
+from operator import index
+
+from .gen import check_forward, gen_reverse
 
 
 DB32ALPHABET = '3456789ABCDEFGHIJKLMNOPQRSTUVWXY'
@@ -147,7 +155,10 @@ def _encode_x_iter(data, x_forward):
     assert bits == 0
 
 
-def encode_x(data, x_forward):
+def _check_data(data):
+    """
+    Common type and length check for `encode_x()` and `db32_cmp()`.
+    """
     if not isinstance(data, bytes):
         raise TypeError(_PYBUF_TYPE_ERROR1.format(type(data).__name__))
     if not (5 <= len(data) <= MAX_BIN_LEN):
@@ -160,6 +171,11 @@ def encode_x(data, x_forward):
         raise ValueError(
             'len(data) is {}, need len(data) % 5 == 0'.format(len(data))
         )
+    return data
+
+
+def encode_x(data, x_forward):
+    _check_data(data)
     return ''.join(_encode_x_iter(data, x_forward))
 
 
@@ -224,11 +240,99 @@ def check_db32(text):
         raise ValueError('invalid Dbase32: {!r}'.format(text))
 
 
-def random_id(numbytes=15):
+class Codec:
+    """
+    Encode, decode, and validate with any `gen.check_forward()` alphabet.
     """
-    Returns a 120-bit DBase32-encoded random ID.
 
-    The ID will be 24-characters long, URL and filesystem safe.
+    __slots__ = ('_forward', '_reverse', '_set')
+
+    def __init__(self, forward):
+        self._forward = check_forward(forward)
+        self._reverse = tuple(r.value for r in gen_reverse(forward))
+        self._set = frozenset(forward.encode())
+
+    def __repr__(self):
+        return 'Codec({!r})'.format(self._forward)
+
+    @property
+    def forward(self):
+        return self._forward
+
+    def encode(self, data):
+        return encode_x(data, self._forward)
+
+    def decode(self, text):
+        return decode_x(text, self._reverse)
+
+    def isvalid(self, text):
+        text = _text_to_bytes(text)
+        if not (8 <= len(text) <= MAX_TXT_LEN):
+            return False
+        if len(text) % 8 != 0:
+            return False
+        return self._set.issuperset(text)
+
+    def check(self, text):
+        utf8 = _check_length(_text_to_bytes(text))
+        if not self._set.issuperset(utf8):
+            raise ValueError('invalid Dbase32: {!r}'.format(text))
+
+
+def _step(text, delta, word):
+    """
+    Common arithmetic for `db32_succ()` and `db32_pred()`.
+    """
+    data = db32dec(text)
+    value = int.from_bytes(data, 'big') + delta
+    if not (0 <= value < 2 ** (8 * len(data))):
+        raise ValueError('{!r} has no {}'.format(text, word))
+    return db32enc(value.to_bytes(len(data), 'big'))
+
+
+def db32_succ(text):
+    return _step(text, 1, 'successor')
+
+
+def db32_pred(text):
+    return _step(text, -1, 'predecessor')
+
+
+def _check_text(text):
+    """
+    Common type check for items that don't come from an argument tuple.
+    """
+    if not isinstance(text, (str, bytes)):
+        raise TypeError(
+            'need a str or bytes instance; got a {!r}: {!r}'.format(
+                type(text), text
+            )
+        )
+    return text
+
+
+def db32_cmp(text, data):
+    a = db32dec(text)
+    b = _check_data(data)
+    return (a > b) - (a < b)
+
+
+def db32_bisect(texts, data):
+    _check_data(data)
+    lo = 0
+    hi = len(texts)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if db32_cmp(_check_text(texts[mid]), data) < 0:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _check_numbytes(numbytes):
+    """
+    Common *numbytes* check for `random_id()` and the ID containers.
     """
     if not isinstance(numbytes, int):
         if isinstance(numbytes, float):
@@ -246,7 +350,89 @@ def random_id(numbytes=15):
         raise ValueError(
             'numbytes is {}, need numbytes % 5 == 0'.format(numbytes)
         )
-    return db32enc(urandom(numbytes))
+    return numbytes
+
+
+_POOL_MAX_SIZE = 16777216
+
+EntropyPoolStats = namedtuple('EntropyPoolStats',
+    'size available refills hits reseeds'
+)
+
+
+class _EntropyPool:
+    __slots__ = ('lock', 'pid', 'buf', 'size', 'available', 'refills', 'hits',
+        'reseeds')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset(0)
+
+    def reset(self, size):
+        self.pid = os.getpid()
+        self.buf = bytearray()
+        self.size = size
+        self.available = 0
+        self.refills = self.hits = self.reseeds = 0
+
+
+_pool = _EntropyPool()
+
+
+def _get_random(size):
+    """
+    Return *size* random bytes, from the entropy pool when it's enabled.
+    """
+    pool = _pool
+    if pool.size == 0 or size > pool.size:
+        return urandom(size)
+    with pool.lock:
+        if pool.pid != os.getpid():
+            pool.pid = os.getpid()
+            pool.available = 0
+            pool.reseeds += 1
+        if pool.available < size:
+            pool.buf = bytearray(urandom(pool.size))
+            pool.available = pool.size
+            pool.refills += 1
+        pool.available -= size
+        start = pool.available
+        ret = bytes(pool.buf[start:start + size])
+        pool.buf[start:start + size] = bytes(size)
+        pool.hits += 1
+    return ret
+
+
+def set_entropy_pool(size):
+    """
+    Enable the entropy pool with *size* bytes, or disable it when *size* is 0.
+    """
+    if not isinstance(size, int):
+        raise TypeError('size must be an int; got {!r}'.format(type(size)))
+    if size != 0 and not (MAX_BIN_LEN <= size <= _POOL_MAX_SIZE):
+        raise ValueError(
+            'size is {}, need size == 0 or {} <= size <= {}'.format(
+                size, MAX_BIN_LEN, _POOL_MAX_SIZE
+            )
+        )
+    with _pool.lock:
+        _pool.reset(size)
+
+
+def entropy_pool_stats():
+    pool = _pool
+    return EntropyPoolStats(pool.size, pool.available, pool.refills, pool.hits,
+        pool.reseeds
+    )
+
+
+def random_id(numbytes=15):
+    """
+    Returns a 120-bit DBase32-encoded random ID.
+
+    The ID will be 24-characters long, URL and filesystem safe.
+    """
+    return db32enc(_get_random(_check_numbytes(numbytes)))
 
 
 def time_id(timestamp=-1):
@@ -261,11 +447,209 @@ def time_id(timestamp=-1):
     buf.append(ts & 255)
 
     # Next 11 bytes are from os.urandom():
-    buf.extend(urandom(11))
+    buf.extend(_get_random(11))
 
     return db32enc(bytes(buf))
 
 
+def time_id_ms(timestamp=-1):
+    assert isinstance(timestamp, (int, float))
+    if timestamp < 0:
+        ms = int(time.time() * 1000)
+    elif timestamp * 1000 < 2 ** 48:
+        ms = int(timestamp * 1000)
+    else:
+        raise ValueError(
+            'timestamp is {!r}, need timestamp < 2**48 / 1000'.format(
+                float(timestamp)
+            )
+        )
+
+    # First 6 bytes are from the timestamp in milliseconds, next 9 bytes are
+    # from os.urandom():
+    return db32enc(ms.to_bytes(6, 'big') + _get_random(9))
+
+
+def _check_count(n, size):
+    """
+    Common *n* check for `random_ids()` and `time_ids()`.
+
+    Also makes sure ``n * size`` random bytes can be requested at once.
+    """
+    if not isinstance(n, int):
+        raise TypeError('n must be an int; got {!r}'.format(type(n)))
+    if n < 0:
+        raise ValueError('n is {}, need n >= 0'.format(n))
+    if n > sys.maxsize:
+        raise OverflowError('Python int too large to convert to C ssize_t')
+    if n > sys.maxsize // size:
+        raise OverflowError('n is {}, too large'.format(n))
+    return n
+
+
+def random_ids(n, numbytes=15):
+    """
+    Return a list of *n* random IDs, using a single call to `os.urandom()`.
+    """
+    numbytes = _check_numbytes(numbytes)
+    data = urandom(_check_count(n, numbytes) * numbytes)
+    return [
+        db32enc(data[i:i + numbytes]) for i in range(0, len(data), numbytes)
+    ]
+
+
+def time_ids(n, timestamp=-1):
+    """
+    Return a list of *n* `time_id()` IDs, using a single call to `os.urandom()`.
+    """
+    assert isinstance(timestamp, (int, float))
+    ts = int(timestamp if timestamp >= 0 else time.time())
+    prefix = (ts & 0xFFFFFFFF).to_bytes(4, 'big')
+    data = urandom(_check_count(n, 11) * 11)
+    return [
+        db32enc(prefix + data[i:i + 11]) for i in range(0, len(data), 11)
+    ]
+
+
+class IdGenerator:
+    """
+    Produce strictly increasing IDs with the `time_id()` layout.
+    """
+
+    __slots__ = ('_lock', '_pid', '_last')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._last = None
+
+    def __call__(self):
+        with self._lock:
+            now = int(time.time()) & 0xFFFFFFFF
+            if self._last is None or now > (self._last >> 88):
+                value = (now << 88) | int.from_bytes(_get_random(11), 'big')
+                self._pid = os.getpid()
+            else:
+                jump = 0
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    jump = int.from_bytes(_get_random(7), 'big')
+                value = self._last + 1 + jump
+                if value >> 120:
+                    raise OverflowError('IdGenerator exhausted')
+            self._last = value
+        return db32enc(value.to_bytes(15, 'big'))
+
+    def __iter__(self):
+        return self
+
+    __next__ = __call__
+
+
+class NodeIdGenerator:
+    """
+    Produce strictly increasing IDs with a node number after the timestamp.
+    """
+
+    __slots__ = ('_node', '_lock', '_pid', '_ts', '_seq')
+
+    def __init__(self, node):
+        if not isinstance(node, int):
+            raise TypeError('node must be an int; got {!r}'.format(type(node)))
+        if not (0 <= node < 2 ** 32):
+            raise ValueError(
+                'node is {}, need 0 <= node < 2**32'.format(node)
+            )
+        self._node = node
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._ts = None
+        self._seq = 0
+
+    @property
+    def node(self):
+        return self._node
+
+    def __call__(self):
+        with self._lock:
+            now = int(time.time()) & 0xFFFFFFFF
+            if self._ts is None or now > self._ts:
+                self._ts = now
+                self._seq = int.from_bytes(_get_random(6), 'big')
+                self._pid = os.getpid()
+            else:
+                jump = 0
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    jump = int.from_bytes(_get_random(5), 'big')
+                seq = self._seq + 1 + jump
+                if seq >> 56:
+                    raise OverflowError('NodeIdGenerator exhausted')
+                self._seq = seq
+            value = (self._ts << 88) | (self._node << 56) | self._seq
+        return db32enc(value.to_bytes(15, 'big'))
+
+    def __iter__(self):
+        return self
+
+    __next__ = __call__
+
+
+def node_id_unpack(text):
+    utf8 = _check_length(_text_to_bytes(text))
+    if len(utf8) != 24:
+        raise ValueError(
+            'len(text) is {}, need len(text) == 24'.format(len(utf8))
+        )
+    if not DB32_SET.issuperset(utf8):
+        raise ValueError('invalid Dbase32: {!r}'.format(text))
+    value = int.from_bytes(db32dec(utf8), 'big')
+    return (value >> 88, (value >> 56) & 0xFFFFFFFF, value & (2 ** 56 - 1))
+
+
+def time_id_timestamp(text):
+    utf8 = _check_length(_text_to_bytes(text))
+    if len(utf8) != 24:
+        raise ValueError(
+            'len(text) is {}, need len(text) == 24'.format(len(utf8))
+        )
+    if not DB32_SET.issuperset(utf8):
+        raise ValueError('invalid Dbase32: {!r}'.format(text))
+    return int.from_bytes(db32dec(utf8[:8])[:4], 'big')
+
+
+def time_id_timestamps(texts):
+    return array('I',
+        (time_id_timestamp(_check_text(text)) for text in texts)
+    )
+
+
+def _clamp_ts(timestamp):
+    """
+    Clamp a timestamp to [0, 2**32], truncating like `time_id()` does.
+    """
+    if not (timestamp > 0):
+        return 0
+    if timestamp >= 2 ** 32:
+        return 2 ** 32
+    return int(timestamp)
+
+
+def _time_id_bound(ts, fill):
+    # Same layout as time_id(): 4 byte timestamp, then 11 tail bytes:
+    return db32enc(ts.to_bytes(4, 'big') + bytes([fill]) * 11)
+
+
+def time_id_range(start_ts, end_ts):
+    start = _clamp_ts(start_ts)
+    end = _clamp_ts(end_ts)
+    if end <= start:
+        raise ValueError(
+            'time range [{}, {}) is empty'.format(start_ts, end_ts)
+        )
+    return (_time_id_bound(start, 0), _time_id_bound(end - 1, 255))
+
+
 def _check_join(*parts): 
     _id = parts[-1]
     if type(_id) is not str:
@@ -291,3 +675,576 @@ def db32_join_2(*parts):
     _id = _check_join(*parts)
     return '/'.join(parts[:-1] + (_id[:2], _id[2:]))
 
+
+def _check_join_bytes(*parts):
+    _id = parts[-1]
+    if type(_id) is bytes:
+        utf8 = _id
+    elif type(_id) is str:
+        utf8 = _id.encode()
+        if not _ASCII.issuperset(utf8):
+            raise ValueError('_id is not ASCII: {!r}'.format(_id))
+    else:
+        raise TypeError(
+            '_id: need a {!r} or {!r}; got a {!r}: {!r}'.format(
+                bytes, str, type(_id), _id
+            )
+        )
+    check_db32(_id)
+    for (i, part) in enumerate(parts[:-1]):
+        if not isinstance(part, bytes):
+            raise TypeError(
+                'sequence item {}: expected a bytes-like object, '
+                '{} found'.format(i, type(part).__name__)
+            )
+    return utf8
+
+
+def db32_join_bytes(*parts):
+    if not parts:
+        raise TypeError('db32_join_bytes() requires at least one argument')
+    _id = _check_join_bytes(*parts)
+    return b'/'.join(parts[:-1] + (_id,))
+
+
+def db32_join_2_bytes(*parts):
+    if not parts:
+        raise TypeError('db32_join_2_bytes() requires at least one argument')
+    _id = _check_join_bytes(*parts)
+    return b'/'.join(parts[:-1] + (_id[:2], _id[2:]))
+
+
+def _check_levels(name, levels, allow_int=False):
+    if allow_int and isinstance(levels, int):
+        if not (1 <= levels < MAX_TXT_LEN):
+            raise ValueError(
+                '{} is {!r}, need 1 <= {} < {}'.format(
+                    name, levels, name, MAX_TXT_LEN
+                )
+            )
+        return (levels,)
+    if type(levels) is not tuple:
+        if allow_int:
+            raise TypeError(
+                '{}: need a {!r} or {!r}; got a {!r}: {!r}'.format(
+                    name, int, tuple, type(levels), levels
+                )
+            )
+        raise TypeError(
+            '{}: need a {!r}; got a {!r}: {!r}'.format(
+                name, tuple, type(levels), levels
+            )
+        )
+    result = []
+    for (i, level) in enumerate(levels):
+        level = index(level)
+        if level < 1:
+            raise ValueError(
+                '{}[{}] is {}, need {}[{}] >= 1'.format(name, i, level, name, i)
+            )
+        result.append(level)
+        if sum(result) >= MAX_TXT_LEN:
+            raise ValueError(
+                '{} is {!r}, need sum({}) < {}'.format(
+                    name, levels, name, MAX_TXT_LEN
+                )
+            )
+    return tuple(result)
+
+
+def _split_levels(name, levels_obj, levels, _id):
+    if sum(levels) >= len(_id):
+        raise ValueError(
+            '{} is {!r}, need sum({}) < len(_id) == {}'.format(
+                name, levels_obj, name, len(_id)
+            )
+        )
+    pieces = []
+    start = 0
+    for level in levels:
+        pieces.append(_id[start:start + level])
+        start += level
+    pieces.append(_id[start:])
+    return tuple(pieces)
+
+
+def db32_join_n(*parts, levels=(2, 2)):
+    if not parts:
+        raise TypeError('db32_join_n() requires at least one argument')
+    _id = _check_join(*parts)
+    pieces = _split_levels('levels', levels,
+        _check_levels('levels', levels), _id
+    )
+    return '/'.join(parts[:-1] + pieces)
+
+
+def db32_join_time(parentdir, _id, bucket=86400, width=2):
+    _check_join(_id)
+    if len(_id) != 24:
+        raise ValueError('len(_id) is {}, need len(_id) == 24'.format(len(_id)))
+    bucket = index(bucket)
+    width = index(width)
+    if bucket < 1:
+        raise ValueError('bucket is {}, need bucket >= 1'.format(bucket))
+    if not (1 <= width <= 16):
+        raise ValueError('width is {}, need 1 <= width <= 16'.format(width))
+    ts = int.from_bytes(db32dec(_id[:8])[:4], 'big')
+    name = db32enc((ts - ts % bucket).to_bytes(4, 'big') + b'\x00')
+    return '/'.join([parentdir, name, _id[-width:], _id])
+
+
+def _split_path(path, layout, slash):
+    levels = _check_levels('layout', layout, True)
+    r = path.rfind(slash)
+    if r == len(path) - 1 or (r < 0 and levels):
+        raise ValueError(
+            'path {!r} does not match layout {!r}'.format(path, layout)
+        )
+    start = r + 1
+    for level in reversed(levels):
+        start = r - level
+        if start < 0 or (start > 0 and path[start - 1:start] != slash):
+            raise ValueError(
+                'path {!r} does not match layout {!r}'.format(path, layout)
+            )
+        r = start - 1
+    tail = path[start:]
+    _id = tail.replace(slash, slash[:0])
+    if len(_id) != len(tail) - len(levels):
+        raise ValueError(
+            'path {!r} does not match layout {!r}'.format(path, layout)
+        )
+    if isinstance(_id, str):
+        # Like the C version, count characters, not UTF-8 bytes:
+        text = bytes(ord(ch) if ord(ch) < 128 else 255 for ch in _id)
+    else:
+        text = _id
+    _check_length(text)
+    if not DB32_SET.issuperset(text):
+        raise ValueError('invalid Dbase32: {!r}'.format(_id))
+    return (path[:max(start - 1, 0)], _id)
+
+
+def db32_split(path, layout=2):
+    if not isinstance(path, str):
+        raise TypeError(
+            'path: need a {!r}; got a {!r}: {!r}'.format(str, type(path), path)
+        )
+    return _split_path(path, layout, '/')
+
+
+def db32_split_bytes(path, layout=2):
+    if not isinstance(path, bytes):
+        raise TypeError(
+            'path: need a {!r}; got a {!r}: {!r}'.format(
+                bytes, type(path), path
+            )
+        )
+    return _split_path(path, layout, b'/')
+
+
+class PathBuilder:
+    """
+    Build paths for Dbase32 IDs under a fixed *parentdir* and *layout*.
+    """
+
+    __slots__ = ('_parentdir', '_layout', '_levels')
+
+    def __init__(self, parentdir, layout=2):
+        if not isinstance(parentdir, str):
+            raise TypeError(
+                'parentdir: need a {!r}; got a {!r}: {!r}'.format(
+                    str, type(parentdir), parentdir
+                )
+            )
+        self._levels = _check_levels('layout', layout, True)
+        self._parentdir = parentdir
+        self._layout = layout
+
+    @property
+    def parentdir(self):
+        return self._parentdir
+
+    @property
+    def layout(self):
+        return self._layout
+
+    def __call__(self, _id):
+        _check_join(_id)
+        pieces = _split_levels('layout', self._layout, self._levels, _id)
+        return '/'.join((self._parentdir,) + pieces)
+
+    def paths(self, ids):
+        return [self(_id) for _id in ids]
+
+
+def db32_paths(parentdir, ids, layout=2, errors='strict'):
+    builder = PathBuilder(parentdir, layout)
+    if errors not in ('strict', 'skip', 'none'):
+        raise ValueError(
+            "errors is {!r}, need 'strict', 'skip', or 'none'".format(errors)
+        )
+    if errors == 'strict':
+        return builder.paths(ids)
+    paths = []
+    for _id in ids:
+        try:
+            paths.append(builder(_id))
+        except (TypeError, ValueError):
+            if errors == 'none':
+                paths.append(None)
+    return paths
+
+
+
+def _decode_key(key, numbytes):
+    """
+    Validate and decode a key for the binary ID containers.
+    """
+    utf8 = _check_length(_text_to_bytes(_check_text(key)))
+    if len(utf8) != numbytes * 8 // 5:
+        raise ValueError('len(text) is {}, need len(text) == {}'.format(
+                len(utf8), numbytes * 8 // 5)
+        )
+    return db32dec(key)
+
+
+class Db32IdSet:
+    """
+    Set of Dbase32 IDs stored in their binary form.
+    """
+
+    __slots__ = ('_ids', '_numbytes')
+
+    def __init__(self, iterable=(), numbytes=15):
+        self._numbytes = _check_numbytes(numbytes)
+        self._ids = set()
+        self.update(iterable)
+
+    @property
+    def numbytes(self):
+        return self._numbytes
+
+    def add(self, _id):
+        self._ids.add(_decode_key(_id, self._numbytes))
+
+    def discard(self, _id):
+        self._ids.discard(_decode_key(_id, self._numbytes))
+
+    def remove(self, _id):
+        data = _decode_key(_id, self._numbytes)
+        if data not in self._ids:
+            raise KeyError(_id)
+        self._ids.remove(data)
+
+    def update(self, iterable):
+        for _id in iterable:
+            self.add(_id)
+
+    def clear(self):
+        self._ids.clear()
+
+    def __contains__(self, _id):
+        return _decode_key(_id, self._numbytes) in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for data in self._ids:
+            yield db32enc(data)
+
+    __hash__ = None
+
+
+class Db32Dict:
+    """
+    Mapping keyed by Dbase32 IDs stored in their binary form.
+    """
+
+    __slots__ = ('_map', '_numbytes')
+
+    def __init__(self, other=(), numbytes=15):
+        self._numbytes = _check_numbytes(numbytes)
+        self._map = {}
+        self.update(other)
+
+    @property
+    def numbytes(self):
+        return self._numbytes
+
+    def _key(self, _id):
+        return _decode_key(_id, self._numbytes)
+
+    def __getitem__(self, _id):
+        try:
+            return self._map[self._key(_id)]
+        except KeyError:
+            raise KeyError(_id) from None
+
+    def __setitem__(self, _id, value):
+        self._map[self._key(_id)] = value
+
+    def __delitem__(self, _id):
+        try:
+            del self._map[self._key(_id)]
+        except KeyError:
+            raise KeyError(_id) from None
+
+    def __contains__(self, _id):
+        return self._key(_id) in self._map
+
+    def __len__(self):
+        return len(self._map)
+
+    def __iter__(self):
+        return self.keys()
+
+    def get(self, _id, default=None):
+        return self._map.get(self._key(_id), default)
+
+    def pop(self, _id, *default):
+        if len(default) > 1:
+            raise TypeError(
+                'pop expected at most 2 arguments, got {}'.format(
+                    len(default) + 1
+                )
+            )
+        key = self._key(_id)
+        if key not in self._map:
+            if default:
+                return default[0]
+            raise KeyError(_id)
+        return self._map.pop(key)
+
+    def update(self, other):
+        if hasattr(other, 'keys'):
+            for _id in other.keys():
+                self[_id] = other[_id]
+        else:
+            for pair in other:
+                if not isinstance(pair, (tuple, list)):
+                    pair = tuple(pair)
+                if len(pair) != 2:
+                    raise ValueError(
+                        'need (key, value) pairs; got {} items'.format(
+                            len(pair)
+                        )
+                    )
+                self[pair[0]] = pair[1]
+
+    def clear(self):
+        self._map.clear()
+
+    def keys(self):
+        for data in self._map:
+            yield db32enc(data)
+
+    def values(self):
+        return iter(self._map.values())
+
+    def items(self):
+        for (data, value) in self._map.items():
+            yield (db32enc(data), value)
+
+    __hash__ = None
+
+
+class Db32SortedArray:
+    """
+    Immutable, sorted array of Dbase32 IDs stored in their binary form.
+    """
+
+    __slots__ = ('_ids', '_numbytes')
+
+    def __init__(self, iterable=(), numbytes=15):
+        self._numbytes = _check_numbytes(numbytes)
+        self._ids = sorted(_decode_key(_id, numbytes) for _id in iterable)
+
+    @property
+    def numbytes(self):
+        return self._numbytes
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            raise TypeError(
+                'Db32SortedArray indices must be integers, not {}'.format(
+                    type(index).__name__
+                )
+            )
+        if index < 0:
+            index += len(self._ids)
+        if not (0 <= index < len(self._ids)):
+            raise IndexError('Db32SortedArray index out of range')
+        return db32enc(self._ids[index])
+
+    def __contains__(self, _id):
+        data = _decode_key(_id, self._numbytes)
+        i = bisect_left(self._ids, data)
+        return i < len(self._ids) and self._ids[i] == data
+
+    def _iter(self, start, stop):
+        for i in range(start, stop):
+            yield db32enc(self._ids[i])
+
+    def __iter__(self):
+        return self._iter(0, len(self._ids))
+
+    def bisect(self, _id):
+        return bisect_left(self._ids, _decode_key(_id, self._numbytes))
+
+    def bisect_right(self, _id):
+        return bisect_right(self._ids, _decode_key(_id, self._numbytes))
+
+    def range(self, lo=None, hi=None):
+        start = (0 if lo is None else self.bisect(lo))
+        stop = (len(self._ids) if hi is None else self.bisect(hi))
+        return self._iter(start, max(start, stop))
+
+    def _bisect_ts(self, ts):
+        if ts > 0xffffffff:
+            return len(self._ids)
+        return bisect_left(self._ids, ts.to_bytes(4, 'big'))
+
+    def time_range(self, start_ts, end_ts):
+        start = self._bisect_ts(_clamp_ts(start_ts))
+        stop = self._bisect_ts(_clamp_ts(end_ts))
+        return self._iter(start, max(start, stop))
+
+    __hash__ = None
+
+
+class Db32Id:
+    """
+    Immutable Dbase32 ID stored in its binary form.
+    """
+
+    __slots__ = ('_data', '_text')
+
+    def __new__(cls, text):
+        return cls._new(db32dec(_check_text(text)))
+
+    @classmethod
+    def _new(cls, data):
+        self = object.__new__(cls)
+        self._data = data
+        self._text = None
+        return self
+
+    @classmethod
+    def frombytes(cls, data):
+        return cls._new(_check_data(data))
+
+    @property
+    def binary(self):
+        return self._data
+
+    def __str__(self):
+        if self._text is None:
+            self._text = db32enc(self._data)
+        return self._text
+
+    def __repr__(self):
+        return 'Db32Id({!r})'.format(str(self))
+
+    def __hash__(self):
+        return hash(int.from_bytes(self._data[-8:], 'big'))
+
+    def __reduce__(self):
+        return (type(self).frombytes, (self._data,))
+
+    def __eq__(self, other):
+        if not isinstance(other, Db32Id):
+            return NotImplemented
+        return self._data == other._data
+
+    def __ne__(self, other):
+        if not isinstance(other, Db32Id):
+            return NotImplemented
+        return self._data != other._data
+
+    def __lt__(self, other):
+        if not isinstance(other, Db32Id):
+            return NotImplemented
+        return self._data < other._data
+
+    def __le__(self, other):
+        if not isinstance(other, Db32Id):
+            return NotImplemented
+        return self._data <= other._data
+
+    def __gt__(self, other):
+        if not isinstance(other, Db32Id):
+            return NotImplemented
+        return self._data > other._data
+
+    def __ge__(self, other):
+        if not isinstance(other, Db32Id):
+            return NotImplemented
+        return self._data >= other._data
+
+
+Db32CacheInfo = namedtuple('Db32CacheInfo',
+    'hits misses evictions maxsize currsize'
+)
+
+
+class Db32Cache:
+    """
+    LRU cache of decoded Dbase32 IDs, keyed by `str` instances.
+    """
+
+    __slots__ = ('_map', '_maxsize', '_hits', '_misses', '_evictions')
+
+    def __init__(self, maxsize=1024):
+        if not isinstance(maxsize, int):
+            raise TypeError(
+                'maxsize must be an int; got {!r}'.format(type(maxsize))
+            )
+        if maxsize < 1:
+            raise ValueError(
+                'maxsize is {}, need maxsize >= 1'.format(maxsize)
+            )
+        self._maxsize = maxsize
+        self._map = OrderedDict()
+        self._hits = self._misses = self._evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def db32dec(self, text):
+        if type(text) is not str:
+            return db32dec(text)
+        try:
+            value = self._map[text]
+        except KeyError:
+            pass
+        else:
+            self._map.move_to_end(text)
+            self._hits += 1
+            return value
+        value = db32dec(text)
+        self._misses += 1
+        if len(self._map) >= self._maxsize:
+            self._map.popitem(last=False)
+            self._evictions += 1
+        self._map[text] = value
+        return value
+
+    def check_db32(self, text):
+        if type(text) is not str:
+            return check_db32(text)
+        self.db32dec(text)
+
+    def cache_info(self):
+        return Db32CacheInfo(self._hits, self._misses, self._evictions,
+            self._maxsize, len(self._map)
+        )
+
+    def cache_clear(self):
+        self._map.clear()
+        self._hits = self._misses = self._evictions = 0
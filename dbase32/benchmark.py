@@ -45,8 +45,11 @@ from dbase32 import (
     db32enc,
     isdb32,
     check_db32,
+    db32_cmp,
     random_id,
     time_id,
+    random_ids,
+    time_ids,
     db32_join,
     db32_join_2,
 )
@@ -98,6 +101,10 @@ def run_benchmark(numbytes=30):
     yield run('isdb32(text)')
     yield run('check_db32(text)')
 
+    yield 'Text vs binary comparisons/second:'
+    yield run('db32dec(text) == data')
+    yield run('db32_cmp(text, data)')
+
     yield 'Validated Path Constructions/second:'
     yield run('db32_join(text)')
     yield run('db32_join(parentdir, text)')
@@ -111,6 +118,11 @@ def run_benchmark(numbytes=30):
     yield run('random_id(15)', 200)
     yield run('time_id()', 200)
 
+    yield 'Batches of 100 IDs/second compared to os.urandom():'
+    yield run('urandom(1500)', 20)
+    yield run('random_ids(100, 15)', 20)
+    yield run('time_ids(100)', 20)
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -22,12 +22,17 @@
 
 """
 Validate encode_x(), decode_x() against known good RFC-3548 encode/decode.
+
+The `b32enc()`, `b32dec()`, `isb32()`, and `check_b32()` functions are the
+methods of a `dbase32.Codec` for the `B32_FORWARD` alphabet, so they run on the
+C kernels when the C extension is available, and on `encode_x()`, `decode_x()`
+otherwise.
 """
 
 from os import urandom
 
-from ._dbase32py import encode_x, decode_x, _text_to_bytes, _check_length
-from ._dbase32py import MAX_BIN_LEN, MAX_TXT_LEN
+from . import Codec
+from ._dbase32py import MAX_BIN_LEN
 
 
 __all__ = ('b32enc', 'b32dec', 'isb32', 'check_b32', 'random_id')
@@ -96,30 +101,11 @@ B32_REVERSE = (
 
 B32_SET = frozenset(B32_FORWARD.encode('utf-8'))
 
-
-def b32enc(data):
-    return encode_x(data, B32_FORWARD)
-
-
-def b32dec(text):
-    return decode_x(text, B32_REVERSE)
-
-
-def isb32(text):
-    text = _text_to_bytes(text)
-    if not (8 <= len(text) <= MAX_TXT_LEN):
-        return False
-    if len(text) % 8 != 0:
-        return False
-    return B32_SET.issuperset(text)
-
-
-def check_b32(text):
-    utf8 = _check_length(_text_to_bytes(text))
-    if not B32_SET.issuperset(utf8):
-        raise ValueError(
-            'invalid Dbase32: {!r}'.format(text)
-        )
+_B32 = Codec(B32_FORWARD)
+b32enc = _B32.encode
+b32dec = _B32.decode
+isb32 = _B32.isvalid
+check_b32 = _B32.check
 
 
 def random_id(numbytes=15):
@@ -0,0 +1,740 @@
+# dbase32: base32-encoding with a sorted-order alphabet (for databases)
+# Copyright (C) 2013-2016 Novacut Inc
+#
+# This file is part of `dbase32`.
+#
+# `dbase32` is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# `dbase32` is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with `dbase32`.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Jason Gerard DeRose <jderose@novacut.com>
+#
+
+"""
+Helpers for file stores sharded with `db32_join_2()` and `db32_join_n()`.
+"""
+
+from collections import deque, namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from heapq import merge
+from itertools import product
+from operator import index
+from operator import itemgetter
+import os
+from os import path
+import mmap
+import time
+import shutil
+
+from . import DB32ALPHABET, isdb32, random_id, PathBuilder, db32enc, db32dec
+from . import db32_join_time
+from ._dbase32py import _check_levels, _clamp_ts
+
+try:
+    from os import scandir
+except ImportError:  # Python 3.4
+    scandir = None
+
+
+__all__ = (
+    'walk',
+    'init_layout',
+    'LayoutStatus',
+    'TimeLayout',
+    'ObjectStore',
+    'Batch',
+)
+
+DEFAULT_WORKERS = 8
+DEFAULT_FD_CACHE = 64
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_CLOEXEC', 0)
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0)
+_OPS = ('put', 'get', 'delete')
+_ALPHABET = frozenset(DB32ALPHABET)
+_KEY = itemgetter(0)
+
+LayoutStatus = namedtuple('LayoutStatus', 'created missing unexpected')
+
+
+def _check_workers(workers):
+    if not isinstance(workers, int):
+        raise TypeError(
+            'workers: need a {!r}; got a {!r}: {!r}'.format(
+                int, type(workers), workers
+            )
+        )
+    if workers < 1:
+        raise ValueError('workers is {}, need workers >= 1'.format(workers))
+    return workers
+
+
+def _check_parentdir(parentdir):
+    if not isinstance(parentdir, str):
+        raise TypeError(
+            'parentdir: need a {!r}; got a {!r}: {!r}'.format(
+                str, type(parentdir), parentdir
+            )
+        )
+    return parentdir
+
+
+def _check_scandir():
+    if scandir is None:
+        raise NotImplementedError('os.scandir() requires Python 3.5 or newer')
+
+
+class TimeLayout:
+    """
+    Shard `time_id()` IDs by a coarse time bucket, then by their random tail.
+
+    Paths are built with `db32_join_time()`.
+    """
+
+    __slots__ = ('_bucket', '_width')
+
+    def __init__(self, bucket=86400, width=2):
+        bucket = index(bucket)
+        width = index(width)
+        if bucket < 1:
+            raise ValueError('bucket is {}, need bucket >= 1'.format(bucket))
+        if not (1 <= width <= 16):
+            raise ValueError('width is {}, need 1 <= width <= 16'.format(width))
+        self._bucket = bucket
+        self._width = width
+
+    def __repr__(self):
+        return '{}(bucket={!r}, width={!r})'.format(
+            self.__class__.__name__, self._bucket, self._width
+        )
+
+    @property
+    def bucket(self):
+        return self._bucket
+
+    @property
+    def width(self):
+        return self._width
+
+    def path(self, parentdir, _id):
+        return db32_join_time(parentdir, _id, self._bucket, self._width)
+
+    def bucket_name(self, timestamp):
+        """
+        Return the name of the bucket directory that contains *timestamp*.
+        """
+        ts = min(_clamp_ts(timestamp), 2 ** 32 - 1)
+        start = ts - ts % self._bucket
+        return db32enc(start.to_bytes(4, 'big') + b'\x00')
+
+    def bucket_range(self, name):
+        """
+        Return the ``(start, end)`` timestamps covered by bucket *name*.
+        """
+        start = int.from_bytes(db32dec(name)[:4], 'big')
+        return (start, start + self._bucket)
+
+
+def _shard_names(dirname, width):
+    """
+    Return the sorted names of the shard directories of *width* in *dirname*.
+    """
+    try:
+        entries = list(scandir(dirname))
+    except FileNotFoundError:
+        return []
+    return sorted(
+        entry.name for entry in entries
+        if len(entry.name) == width and _ALPHABET.issuperset(entry.name)
+        and entry.is_dir()
+    )
+
+
+def _scan_shard(dirname, prefix, levels):
+    """
+    Return a sorted list of ``(_id, entry)`` tuples for one shard directory.
+
+    Directories, and entries whose *prefix* plus name isn't a valid Dbase32 ID,
+    are skipped.
+    """
+    if levels:
+        result = []
+        for name in _shard_names(dirname, levels[0]):
+            subdir = path.join(dirname, name)
+            result.extend(_scan_shard(subdir, prefix + name, levels[1:]))
+        return result
+    try:
+        entries = list(scandir(dirname))
+    except FileNotFoundError:
+        return []
+    result = []
+    for entry in entries:
+        _id = prefix + entry.name
+        if isdb32(_id) and not entry.is_dir():
+            result.append((_id, entry))
+    result.sort(key=_KEY)
+    return result
+
+
+def _scan_time_shard(dirname, shard):
+    """
+    Return a sorted list of ``(_id, entry)`` tuples for one `TimeLayout` shard.
+    """
+    try:
+        entries = list(scandir(dirname))
+    except FileNotFoundError:
+        return []
+    result = [
+        (entry.name, entry) for entry in entries
+        if len(entry.name) == 24 and entry.name.endswith(shard)
+        and isdb32(entry.name) and not entry.is_dir()
+    ]
+    result.sort(key=_KEY)
+    return result
+
+
+def _walk_time(parentdir, layout, workers):
+    _check_workers(workers)
+    _check_scandir()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for bucket in _shard_names(parentdir, 8):
+            bucketdir = path.join(parentdir, bucket)
+            shards = _shard_names(bucketdir, layout.width)
+            dirnames = [path.join(bucketdir, shard) for shard in shards]
+            # Shards split a bucket by tail, not prefix, so each bucket has to
+            # be scanned in full, but its sorted shards can be merged lazily:
+            results = list(executor.map(_scan_time_shard, dirnames, shards))
+            yield from merge(*results, key=_KEY)
+
+
+def walk(parentdir, layout=2, workers=DEFAULT_WORKERS):
+    """
+    Yield an ``(_id, entry)`` tuple for each ID in a sharded store, in order.
+    """
+    _check_parentdir(parentdir)
+    if isinstance(layout, TimeLayout):
+        yield from _walk_time(parentdir, layout, workers)
+        return
+    levels = _check_levels('layout', layout, True)
+    _check_workers(workers)
+    _check_scandir()
+    if not levels:
+        yield from _scan_shard(parentdir, '', levels)
+        return
+
+    # Shards partition the IDs by prefix, so yielding the sorted result of
+    # each shard in shard order yields all the IDs in sorted order:
+    shards = iter(_shard_names(parentdir, levels[0]))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit(name):
+            pending.append(executor.submit(_scan_shard,
+                path.join(parentdir, name), name, levels[1:]
+            ))
+
+        # Only keep a few shards ahead of the consumer, to bound memory use:
+        pending = deque()
+        for name in shards:
+            submit(name)
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for name in shards:
+                submit(name)
+                break
+            yield from result
+
+
+_NAMES = {}
+
+
+def _names(width):
+    """
+    Return a ``(names, frozenset(names))`` tuple of every shard of *width*.
+    """
+    try:
+        return _NAMES[width]
+    except KeyError:
+        names = tuple(
+            ''.join(chars) for chars in product(DB32ALPHABET, repeat=width)
+        )
+        return _NAMES.setdefault(width, (names, frozenset(names)))
+
+
+def _init_children(parentdir, relname, width, unexpected):
+    """
+    Return ``(name, exists)`` for each expected shard of *width* in *relname*.
+
+    Existing entries that aren't expected shard directories are added to
+    *unexpected*.  An expected name used by something other than a directory
+    is returned with ``exists=None``.
+    """
+    (names, expected) = _names(width)
+    dirs = set()
+    blocked = set()
+    for entry in scandir(path.join(parentdir, relname)):
+        if entry.name in expected:
+            if entry.is_dir():
+                dirs.add(entry.name)
+                continue
+            blocked.add(entry.name)
+        unexpected.append(path.join(relname, entry.name))
+    return tuple(
+        (name, None if name in blocked else name in dirs) for name in names
+    )
+
+
+def _init_shard(parentdir, relname, exists, levels, create, status):
+    """
+    Check or create the shard directory *relname* and everything below it.
+    """
+    (created, missing, unexpected, parents) = status
+    if exists is None:
+        missing.append(relname)
+        return
+    if not exists:
+        if not create:
+            missing.append(relname)
+            return
+        try:
+            os.mkdir(path.join(parentdir, relname))
+            created.append(relname)
+            parents.add(path.dirname(relname))
+        except FileExistsError:
+            exists = True
+    if not levels:
+        return
+    if exists:
+        children = _init_children(parentdir, relname, levels[0], unexpected)
+    else:
+        children = ((name, False) for name in _names(levels[0])[0])
+    for (name, child_exists) in children:
+        _init_shard(parentdir, path.join(relname, name), child_exists,
+            levels[1:], create, status
+        )
+
+
+def _init_subtree(parentdir, relname, exists, levels, create):
+    status = ([], [], [], set())
+    _init_shard(parentdir, relname, exists, levels, create, status)
+    return status
+
+
+def _fsync_dir(dirname):
+    fd = os.open(dirname, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _makedirs(dirname):
+    """
+    Create *dirname* and any missing parents, like ``os.makedirs()``.
+
+    Returns a list of the directories that gained a new entry, which must be
+    synced before the new directories are durable.
+    """
+    parent = path.dirname(dirname)
+    changed = []
+    if parent != dirname and not path.isdir(parent):
+        changed = _makedirs(parent)
+    try:
+        os.mkdir(dirname)
+    except FileExistsError:
+        return changed
+    changed.append(parent)
+    return changed
+
+
+def init_layout(parentdir, layout=2, workers=DEFAULT_WORKERS, create=True):
+    """
+    Create (or just check) every shard directory implied by *layout*.
+
+    Returns a `LayoutStatus` of sorted tuples of relative shard names.
+    """
+    levels = _check_levels('layout', layout, True)
+    _check_workers(workers)
+    _check_scandir()
+    (created, missing, unexpected, parents) = ([], [], [], set())
+    if levels:
+        children = _init_children(parentdir, '', levels[0], unexpected)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_init_subtree,
+                    parentdir, name, exists, levels[1:], create
+                )
+                for (name, exists) in children
+            ]
+            for future in futures:
+                status = future.result()
+                created.extend(status[0])
+                missing.extend(status[1])
+                unexpected.extend(status[2])
+                parents.update(status[3])
+            # Every mkdir() is done, so one fsync() per parent is enough:
+            dirnames = [path.join(parentdir, relname) for relname in parents]
+            list(executor.map(_fsync_dir, dirnames))
+    return LayoutStatus(
+        tuple(sorted(created)),
+        tuple(sorted(missing)),
+        tuple(sorted(unexpected)),
+    )
+
+
+def _write_all(fd, data):
+    view = memoryview(data).cast('B')
+    size = len(view)
+    while view:
+        view = view[os.write(fd, view):]
+    return size
+
+
+def _read_all(fd, size):
+    # A single read is capped (at 0x7ffff000 bytes on Linux), so loop:
+    chunks = []
+    offset = 0
+    while offset < size:
+        chunk = os.pread(fd, size - offset, offset)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        offset += len(chunk)
+    return b''.join(chunks)
+
+
+class Batch:
+    """
+    Group several `ObjectStore.put()` calls under a single set of fsyncs.
+
+    Use `ObjectStore.batch()` rather than creating a `Batch` directly.
+    """
+
+    __slots__ = ('_store', '_pending')
+
+    def __init__(self, store):
+        self._store = store
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, _id, data):
+        """
+        Write *data* to a temporary file, to be renamed into place on commit.
+        """
+        self._pending.append(self._store._write_tmp(_id, data))
+
+    def commit(self):
+        """
+        Sync all pending files, rename them into place, then sync their dirs.
+        """
+        (pending, self._pending) = (self._pending, [])
+        self._store._commit(pending)
+
+    def abort(self):
+        """
+        Remove all pending temporary files.
+        """
+        (pending, self._pending) = (self._pending, [])
+        for item in pending:
+            os.close(item[1])
+            os.unlink(item[2])
+
+
+class ObjectStore:
+    """
+    A local object store keyed by Dbase32 IDs.
+
+    Each object lives at ``PathBuilder(parentdir, layout)(_id)``.  An
+    `ObjectStore` isn't thread-safe; use one instance per thread.
+    """
+
+    def __init__(self, parentdir, layout=2, durable=True,
+            fd_cache=DEFAULT_FD_CACHE):
+        if isinstance(layout, TimeLayout):
+            self._path = partial(layout.path, _check_parentdir(parentdir))
+        else:
+            self._path = PathBuilder(parentdir, layout)
+        self._parentdir = parentdir
+        self._layout = layout
+        if not isinstance(fd_cache, int):
+            raise TypeError(
+                'fd_cache: need a {!r}; got a {!r}: {!r}'.format(
+                    int, type(fd_cache), fd_cache
+                )
+            )
+        if fd_cache < 0:
+            raise ValueError(
+                'fd_cache is {}, need fd_cache >= 0'.format(fd_cache)
+            )
+        self._durable = bool(durable)
+        self._fd_cache = fd_cache
+        self._fds = OrderedDict()
+        self._stats = dict(
+            (op, {'count': 0, 'bytes': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            for op in _OPS
+        )
+        self._fsyncs = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(
+            self.__class__.__name__, self.parentdir, self.layout
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        for (_id, entry) in walk(self.parentdir, self.layout):
+            yield _id
+
+    def __contains__(self, _id):
+        return path.isfile(self._path(_id))
+
+    @property
+    def parentdir(self):
+        return self._parentdir
+
+    @property
+    def layout(self):
+        return self._layout
+
+    @property
+    def durable(self):
+        return self._durable
+
+    def path(self, _id):
+        return self._path(_id)
+
+    def close(self):
+        """
+        Close all the cached file descriptors.
+        """
+        while self._fds:
+            os.close(self._fds.popitem()[1])
+
+    def _record(self, op, start, size):
+        elapsed = time.perf_counter() - start
+        stats = self._stats[op]
+        stats['count'] += 1
+        stats['bytes'] += size
+        stats['seconds'] += elapsed
+        if elapsed > stats['max_seconds']:
+            stats['max_seconds'] = elapsed
+
+    def _fsync(self, fd):
+        os.fsync(fd)
+        self._fsyncs += 1
+
+    def _evict(self, _id):
+        fd = self._fds.pop(_id, None)
+        if fd is not None:
+            os.close(fd)
+
+    def _open(self, _id):
+        """
+        Return an ``(fd, stat_result)`` tuple for reading the object *_id*.
+
+        A cached fd whose file has since been replaced or removed (by another
+        instance, say) has no links left, so it's closed and opened again.
+        """
+        fd = self._fds.pop(_id, None)
+        if fd is not None:
+            st = os.fstat(fd)
+            if st.st_nlink > 0:
+                self._hits += 1
+                self._fds[_id] = fd
+                return (fd, st)
+            os.close(fd)
+        self._misses += 1
+        fd = os.open(self._path(_id), _READ_FLAGS)
+        try:
+            st = os.fstat(fd)
+        except:
+            os.close(fd)
+            raise
+        if self._fd_cache > 0:
+            if len(self._fds) >= self._fd_cache:
+                os.close(self._fds.popitem(last=False)[1])
+            # Inserting puts the entry at the most recently used end:
+            self._fds[_id] = fd
+        return (fd, st)
+
+    def _release(self, fd):
+        if self._fd_cache == 0:
+            os.close(fd)
+
+    def _write_tmp(self, _id, data):
+        start = time.perf_counter()
+        dst = self._path(_id)
+        # The suffix makes the name an invalid ID, so walk() skips it:
+        tmp = '.'.join([dst, random_id(5)])
+        changed = []
+        try:
+            fd = os.open(tmp, _TMP_FLAGS, 0o444)
+        except FileNotFoundError:
+            changed = _makedirs(path.dirname(tmp))
+            fd = os.open(tmp, _TMP_FLAGS, 0o444)
+        try:
+            size = _write_all(fd, data)
+        except:
+            os.close(fd)
+            os.unlink(tmp)
+            raise
+        return (_id, fd, tmp, dst, start, size, changed)
+
+    def _commit(self, pending):
+        renamed = 0
+        try:
+            if self._durable:
+                for item in pending:
+                    self._fsync(item[1])
+            for (_id, fd, tmp, dst, start, size, changed) in pending:
+                os.rename(tmp, dst)
+                renamed += 1
+                self._evict(_id)
+        except:
+            for item in pending[renamed:]:
+                os.unlink(item[2])
+            raise
+        finally:
+            for item in pending:
+                os.close(item[1])
+        if self._durable:
+            # One fsync() per directory covers every rename into it, plus
+            # every parent that gained a directory created on demand:
+            dirnames = set(path.dirname(item[3]) for item in pending)
+            for item in pending:
+                dirnames.update(item[6])
+            for dirname in sorted(dirnames, reverse=True):
+                _fsync_dir(dirname)
+                self._fsyncs += 1
+        for (_id, fd, tmp, dst, start, size, changed) in pending:
+            self._record('put', start, size)
+
+    def batch(self):
+        """
+        Return a `Batch` that syncs a group of puts together.
+        """
+        return Batch(self)
+
+    def put(self, _id, data):
+        """
+        Atomically store *data* under *_id*, replacing any existing object.
+        """
+        self._commit([self._write_tmp(_id, data)])
+
+    def get(self, _id):
+        """
+        Return the contents of the object *_id* as ``bytes``.
+        """
+        start = time.perf_counter()
+        (fd, st) = self._open(_id)
+        try:
+            data = _read_all(fd, st.st_size)
+        finally:
+            self._release(fd)
+        self._record('get', start, len(data))
+        return data
+
+    def mmap(self, _id):
+        """
+        Return a read-only ``mmap.mmap`` of the object *_id*.
+
+        Raises ``ValueError`` for a zero-length object, which can't be mapped.
+        """
+        (fd, st) = self._open(_id)
+        try:
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            self._release(fd)
+
+    def sendfile(self, _id, out_fd, offset=0, count=None):
+        """
+        Send the object *_id* to *out_fd* with ``os.sendfile()``.
+
+        Returns the number of bytes sent.
+        """
+        (fd, st) = self._open(_id)
+        try:
+            if count is None:
+                count = st.st_size - offset
+            total = 0
+            while total < count:
+                sent = os.sendfile(out_fd, fd, offset + total, count - total)
+                if sent == 0:
+                    break
+                total += sent
+            return total
+        finally:
+            self._release(fd)
+
+    def delete(self, _id):
+        """
+        Remove the object *_id*.
+        """
+        start = time.perf_counter()
+        filename = self._path(_id)
+        self._evict(_id)
+        os.unlink(filename)
+        self._record('delete', start, 0)
+
+    def expire(self, before):
+        """
+        Remove every `TimeLayout` bucket that ends at or before *before*.
+
+        Returns a list of the names of the removed buckets.
+        """
+        if not isinstance(self._layout, TimeLayout):
+            raise TypeError(
+                'expire() needs a TimeLayout; layout is {!r}'.format(
+                    self._layout
+                )
+            )
+        _check_scandir()
+        self.close()
+        removed = []
+        for name in _shard_names(self._parentdir, 8):
+            if self._layout.bucket_range(name)[1] > before:
+                break
+            shutil.rmtree(path.join(self._parentdir, name))
+            removed.append(name)
+        return removed
+
+    def stats(self):
+        """
+        Return a ``dict`` with operation counts and latency counters.
+        """
+        result = dict((op, dict(self._stats[op])) for op in _OPS)
+        result['fsync'] = self._fsyncs
+        result['fd_cache'] = {
+            'size': len(self._fds),
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+        return result
@@ -30,10 +30,16 @@ import os
 from random import SystemRandom
 import time
 import base64
+import bisect
+import array
+import pickle
+import weakref
+import gc
+import threading
 from collections import namedtuple
 
 import dbase32
-from dbase32 import _dbase32py
+from dbase32 import _dbase32py, gen
 
 # True if the C extension is available
 try:
@@ -98,6 +104,10 @@ def make_join_end2(_id):
     return '/'.join([_id[0:2], _id[2:]])
 
 
+def make_join_end_n(_id):
+    return '/'.join([_id[0:2], _id[2:4], _id[4:]])
+
+
 def iter_random_db32():
     yield ''
     yield random_db32(1)
@@ -147,6 +157,65 @@ def make_bytes(ints):
     return bytes(bytes_iter(ints))
 
 
+def mint_threaded(gens, threads=8):
+    """
+    Call each of *gens* from several threads while the clock ticks into a new
+    second.
+
+    Returns a list for each generator of the IDs minted by each thread, in
+    order.
+    """
+    while time.time() % 1 < 0.9:
+        time.sleep(0.01)
+    stop = int(time.time()) + 1.1
+    results = [[[] for i in range(threads)] for j in range(len(gens))]
+
+    def target(i):
+        pairs = [(g, results[j][i]) for (j, g) in enumerate(gens)]
+        pairs = pairs[i:] + pairs[:i]  # Don't call them in lockstep
+        while time.time() < stop:
+            for (g, ids) in pairs:
+                ids.append(g())
+
+    workers = [threading.Thread(target=target, args=(i,))
+        for i in range(threads)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    finally:
+        sys.setswitchinterval(interval)
+    return results
+
+
+def mint_forked(gen, count=100):
+    """
+    Mint *count* IDs with *gen* in a forked child and in the parent.
+    """
+    (r, w) = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(w, ''.join(gen() for i in range(count)).encode())
+        finally:
+            os._exit(0)
+    os.close(w)
+    chunks = []
+    while True:
+        chunk = os.read(r, 4096)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(r)
+    os.waitpid(pid, 0)
+    child = b''.join(chunks).decode()
+    child = [child[i:i+24] for i in range(0, len(child), 24)]
+    return (child, [gen() for i in range(count)])
+
+
 def get_refcounts(args):
     assert type(args) is tuple
     return tuple(sys.getrefcount(a) for a in args)
@@ -332,6 +401,34 @@ class TestConstants(TestCase):
         else:
             self.assertIs(dbase32.check_db32, _dbase32py.check_db32)
 
+    def test_db32_succ_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_succ, _dbase32.db32_succ)
+            self.assertIsNot(dbase32.db32_succ, _dbase32py.db32_succ)
+        else:
+            self.assertIs(dbase32.db32_succ, _dbase32py.db32_succ)
+
+    def test_db32_pred_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_pred, _dbase32.db32_pred)
+            self.assertIsNot(dbase32.db32_pred, _dbase32py.db32_pred)
+        else:
+            self.assertIs(dbase32.db32_pred, _dbase32py.db32_pred)
+
+    def test_db32_cmp_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_cmp, _dbase32.db32_cmp)
+            self.assertIsNot(dbase32.db32_cmp, _dbase32py.db32_cmp)
+        else:
+            self.assertIs(dbase32.db32_cmp, _dbase32py.db32_cmp)
+
+    def test_db32_bisect_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_bisect, _dbase32.db32_bisect)
+            self.assertIsNot(dbase32.db32_bisect, _dbase32py.db32_bisect)
+        else:
+            self.assertIs(dbase32.db32_bisect, _dbase32py.db32_bisect)
+
     def test_random_id_alias(self):
         if C_EXT_AVAIL:
             self.assertIs(dbase32.random_id, _dbase32.random_id)
@@ -346,6 +443,107 @@ class TestConstants(TestCase):
         else:
             self.assertIs(dbase32.time_id, _dbase32py.time_id)
 
+    def test_time_id_ms_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.time_id_ms, _dbase32.time_id_ms)
+            self.assertIsNot(dbase32.time_id_ms, _dbase32py.time_id_ms)
+        else:
+            self.assertIs(dbase32.time_id_ms, _dbase32py.time_id_ms)
+
+    def test_random_ids_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.random_ids, _dbase32.random_ids)
+            self.assertIsNot(dbase32.random_ids, _dbase32py.random_ids)
+        else:
+            self.assertIs(dbase32.random_ids, _dbase32py.random_ids)
+
+    def test_time_ids_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.time_ids, _dbase32.time_ids)
+            self.assertIsNot(dbase32.time_ids, _dbase32py.time_ids)
+        else:
+            self.assertIs(dbase32.time_ids, _dbase32py.time_ids)
+
+    def test_time_id_timestamp_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.time_id_timestamp,
+                _dbase32.time_id_timestamp
+            )
+            self.assertIsNot(dbase32.time_id_timestamp,
+                _dbase32py.time_id_timestamp
+            )
+        else:
+            self.assertIs(dbase32.time_id_timestamp,
+                _dbase32py.time_id_timestamp
+            )
+
+    def test_time_id_timestamps_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.time_id_timestamps,
+                _dbase32.time_id_timestamps
+            )
+            self.assertIsNot(dbase32.time_id_timestamps,
+                _dbase32py.time_id_timestamps
+            )
+        else:
+            self.assertIs(dbase32.time_id_timestamps,
+                _dbase32py.time_id_timestamps
+            )
+
+    def test_time_id_range_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.time_id_range, _dbase32.time_id_range)
+            self.assertIsNot(dbase32.time_id_range, _dbase32py.time_id_range)
+        else:
+            self.assertIs(dbase32.time_id_range, _dbase32py.time_id_range)
+
+    def test_set_entropy_pool_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.set_entropy_pool, _dbase32.set_entropy_pool)
+            self.assertIsNot(dbase32.set_entropy_pool,
+                _dbase32py.set_entropy_pool
+            )
+        else:
+            self.assertIs(dbase32.set_entropy_pool,
+                _dbase32py.set_entropy_pool
+            )
+
+    def test_entropy_pool_stats_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.entropy_pool_stats,
+                _dbase32.entropy_pool_stats
+            )
+            self.assertIsNot(dbase32.entropy_pool_stats,
+                _dbase32py.entropy_pool_stats
+            )
+        else:
+            self.assertIs(dbase32.entropy_pool_stats,
+                _dbase32py.entropy_pool_stats
+            )
+
+    def test_IdGenerator_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.IdGenerator, _dbase32.IdGenerator)
+            self.assertIsNot(dbase32.IdGenerator, _dbase32py.IdGenerator)
+        else:
+            self.assertIs(dbase32.IdGenerator, _dbase32py.IdGenerator)
+
+    def test_NodeIdGenerator_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.NodeIdGenerator, _dbase32.NodeIdGenerator)
+            self.assertIsNot(dbase32.NodeIdGenerator,
+                _dbase32py.NodeIdGenerator
+            )
+        else:
+            self.assertIs(dbase32.NodeIdGenerator, _dbase32py.NodeIdGenerator)
+
+    def test_node_id_unpack_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.node_id_unpack, _dbase32.node_id_unpack)
+            self.assertIsNot(dbase32.node_id_unpack, _dbase32py.node_id_unpack)
+        else:
+            self.assertIs(dbase32.node_id_unpack, _dbase32py.node_id_unpack)
+
     def test_log_id_alias(self):
         """
         Test deprecated `log_id` alias to `time_id`.
@@ -366,6 +564,118 @@ class TestConstants(TestCase):
         else:
             self.assertIs(dbase32.db32_join_2, _dbase32py.db32_join_2)
 
+    def test_db32_join_n_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_join_n, _dbase32.db32_join_n)
+            self.assertIsNot(dbase32.db32_join_n, _dbase32py.db32_join_n)
+        else:
+            self.assertIs(dbase32.db32_join_n, _dbase32py.db32_join_n)
+
+    def test_db32_join_time_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_join_time, _dbase32.db32_join_time)
+            self.assertIsNot(dbase32.db32_join_time, _dbase32py.db32_join_time)
+        else:
+            self.assertIs(dbase32.db32_join_time, _dbase32py.db32_join_time)
+
+    def test_db32_join_bytes_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_join_bytes, _dbase32.db32_join_bytes)
+            self.assertIsNot(dbase32.db32_join_bytes,
+                _dbase32py.db32_join_bytes
+            )
+        else:
+            self.assertIs(dbase32.db32_join_bytes, _dbase32py.db32_join_bytes)
+
+    def test_db32_join_2_bytes_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_join_2_bytes,
+                _dbase32.db32_join_2_bytes
+            )
+            self.assertIsNot(dbase32.db32_join_2_bytes,
+                _dbase32py.db32_join_2_bytes
+            )
+        else:
+            self.assertIs(dbase32.db32_join_2_bytes,
+                _dbase32py.db32_join_2_bytes
+            )
+
+    def test_db32_paths_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_paths, _dbase32.db32_paths)
+            self.assertIsNot(dbase32.db32_paths, _dbase32py.db32_paths)
+        else:
+            self.assertIs(dbase32.db32_paths, _dbase32py.db32_paths)
+
+    def test_db32_split_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_split, _dbase32.db32_split)
+            self.assertIsNot(dbase32.db32_split, _dbase32py.db32_split)
+        else:
+            self.assertIs(dbase32.db32_split, _dbase32py.db32_split)
+
+    def test_db32_split_bytes_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.db32_split_bytes, _dbase32.db32_split_bytes)
+            self.assertIsNot(dbase32.db32_split_bytes,
+                _dbase32py.db32_split_bytes
+            )
+        else:
+            self.assertIs(dbase32.db32_split_bytes,
+                _dbase32py.db32_split_bytes
+            )
+
+    def test_PathBuilder_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.PathBuilder, _dbase32.PathBuilder)
+            self.assertIsNot(dbase32.PathBuilder, _dbase32py.PathBuilder)
+        else:
+            self.assertIs(dbase32.PathBuilder, _dbase32py.PathBuilder)
+
+    def test_Codec_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.Codec, _dbase32.Codec)
+            self.assertIsNot(dbase32.Codec, _dbase32py.Codec)
+        else:
+            self.assertIs(dbase32.Codec, _dbase32py.Codec)
+
+    def test_Db32IdSet_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.Db32IdSet, _dbase32.Db32IdSet)
+            self.assertIsNot(dbase32.Db32IdSet, _dbase32py.Db32IdSet)
+        else:
+            self.assertIs(dbase32.Db32IdSet, _dbase32py.Db32IdSet)
+
+    def test_Db32Dict_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.Db32Dict, _dbase32.Db32Dict)
+            self.assertIsNot(dbase32.Db32Dict, _dbase32py.Db32Dict)
+        else:
+            self.assertIs(dbase32.Db32Dict, _dbase32py.Db32Dict)
+
+    def test_Db32SortedArray_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.Db32SortedArray, _dbase32.Db32SortedArray)
+            self.assertIsNot(dbase32.Db32SortedArray,
+                _dbase32py.Db32SortedArray
+            )
+        else:
+            self.assertIs(dbase32.Db32SortedArray, _dbase32py.Db32SortedArray)
+
+    def test_Db32Id_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.Db32Id, _dbase32.Db32Id)
+            self.assertIsNot(dbase32.Db32Id, _dbase32py.Db32Id)
+        else:
+            self.assertIs(dbase32.Db32Id, _dbase32py.Db32Id)
+
+    def test_Db32Cache_alias(self):
+        if C_EXT_AVAIL:
+            self.assertIs(dbase32.Db32Cache, _dbase32.Db32Cache)
+            self.assertIsNot(dbase32.Db32Cache, _dbase32py.Db32Cache)
+        else:
+            self.assertIs(dbase32.Db32Cache, _dbase32py.Db32Cache)
+
 
 class TestMisc(TestCase):
     def skip_if_no_c_ext(self):
@@ -904,6 +1214,185 @@ class TestFunctions_Py(BackendTestCase):
         self.assertIsNone(check_db32(b'3' * 96))
         self.assertIsNone(check_db32(b'Y' * 96))
 
+    def test_db32_succ(self):
+        db32_succ = self.getattr('db32_succ')
+
+        # Common tests for text args:
+        self.check_text_type(db32_succ)
+        self.check_text_value(db32_succ)
+
+        # Test a few handy static values:
+        self.assertEqual(db32_succ('33333333'), '33333334')
+        self.assertEqual(db32_succ(b'33333333'), '33333334')
+        self.assertEqual(db32_succ('3333333Y'), '33333343')
+        self.assertEqual(db32_succ('3YYYYYYY'), '43333333')
+        self.assertEqual(db32_succ('YYYYYYYX'), 'YYYYYYYY')
+        self.assertEqual(db32_succ('3' * 96), '3' * 95 + '4')
+
+        # No successor when every digit would carry:
+        for size in TXT_SIZES:
+            text = 'Y' * size
+            with self.assertRaises(ValueError) as cm:
+                db32_succ(text)
+            self.assertEqual(str(cm.exception),
+                '{!r} has no successor'.format(text)
+            )
+
+        # Compare against integer arithmetic on the decoded value:
+        for size in BIN_SIZES:
+            for i in range(500):
+                data = os.urandom(size)
+                value = int.from_bytes(data, 'big')
+                if value == 2 ** (size * 8) - 1:
+                    continue
+                expected = (value + 1).to_bytes(size, 'big')
+                text = db32_succ(dbase32.db32enc(data))
+                self.assertIsInstance(text, str)
+                self.assertEqual(dbase32.db32dec(text), expected)
+                self.assertGreater(text, dbase32.db32enc(data))
+
+    def test_db32_pred(self):
+        db32_pred = self.getattr('db32_pred')
+
+        # Common tests for text args:
+        self.check_text_type(db32_pred)
+        self.check_text_value(db32_pred)
+
+        # Test a few handy static values:
+        self.assertEqual(db32_pred('YYYYYYYY'), 'YYYYYYYX')
+        self.assertEqual(db32_pred(b'YYYYYYYY'), 'YYYYYYYX')
+        self.assertEqual(db32_pred('33333343'), '3333333Y')
+        self.assertEqual(db32_pred('43333333'), '3YYYYYYY')
+        self.assertEqual(db32_pred('33333334'), '33333333')
+        self.assertEqual(db32_pred('Y' * 96), 'Y' * 95 + 'X')
+
+        # No predecessor when every digit would borrow:
+        for size in TXT_SIZES:
+            text = '3' * size
+            with self.assertRaises(ValueError) as cm:
+                db32_pred(text)
+            self.assertEqual(str(cm.exception),
+                '{!r} has no predecessor'.format(text)
+            )
+
+        # Compare against integer arithmetic on the decoded value:
+        for size in BIN_SIZES:
+            for i in range(500):
+                data = os.urandom(size)
+                value = int.from_bytes(data, 'big')
+                if value == 0:
+                    continue
+                expected = (value - 1).to_bytes(size, 'big')
+                text = db32_pred(dbase32.db32enc(data))
+                self.assertIsInstance(text, str)
+                self.assertEqual(dbase32.db32dec(text), expected)
+                self.assertLess(text, dbase32.db32enc(data))
+
+    def test_db32_cmp(self):
+        db32_cmp = self.getattr('db32_cmp')
+
+        # Common tests for text args:
+        func = lambda text: db32_cmp(text, b'\x00' * 5)
+        self.check_text_type(func)
+        self.check_text_value(func)
+
+        # Bad data type:
+        if sys.version_info >= (3, 5):
+            error = 'a bytes-like object is required, not {!r}'
+        else:
+            error = '{!r} does not support the buffer interface'
+        for bad in ['33333333', 17, 18.5]:
+            with self.assertRaises(TypeError) as cm:
+                db32_cmp('33333333', bad)
+            self.assertEqual(str(cm.exception),
+                error.format(type(bad).__name__)
+            )
+
+        # Bad data length:
+        with self.assertRaises(ValueError) as cm:
+            db32_cmp('33333333', b'four')
+        self.assertEqual(str(cm.exception),
+            'len(data) is 4, need 5 <= len(data) <= 60'
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_cmp('33333333', b'B' * 41)
+        self.assertEqual(str(cm.exception),
+            'len(data) is 41, need len(data) % 5 == 0'
+        )
+
+        # Test a few handy static values:
+        self.assertEqual(db32_cmp('33333333', b'\x00' * 5), 0)
+        self.assertEqual(db32_cmp(b'33333333', b'\x00' * 5), 0)
+        self.assertEqual(db32_cmp('33333334', b'\x00' * 5), 1)
+        self.assertEqual(db32_cmp('33333333', b'\x00' * 4 + b'\x01'), -1)
+        self.assertEqual(db32_cmp('YYYYYYYY', b'\xff' * 5), 0)
+        self.assertEqual(db32_cmp('YYYYYYYY', b'\xff' * 10), -1)
+        self.assertEqual(db32_cmp('Y' * 16, b'\xff' * 5), 1)
+        self.assertEqual(db32_cmp('33333333', b'\x00' * 10), -1)
+        self.assertEqual(db32_cmp('3' * 16, b'\x00' * 5), 1)
+
+        # Compare against comparison of the decoded value:
+        for size in BIN_SIZES:
+            for i in range(250):
+                a = os.urandom(size)
+                b = os.urandom(random.choice(BIN_SIZES))
+                text = dbase32.db32enc(a)
+                self.assertEqual(db32_cmp(text, a), 0)
+                self.assertEqual(db32_cmp(text, b), (a > b) - (a < b))
+                self.assertEqual(db32_cmp(text, a[:-5] + b'\x00' * 5),
+                    (a[-5:] > b'\x00' * 5) - 0
+                )
+
+    def test_db32_bisect(self):
+        db32_bisect = self.getattr('db32_bisect')
+        from bisect import bisect_left
+
+        # Bad sequence item type:
+        for bad in [17, 18.5, None]:
+            with self.assertRaises(TypeError) as cm:
+                db32_bisect([bad], b'\x00' * 5)
+            self.assertEqual(str(cm.exception),
+                'need a str or bytes instance; got a {!r}: {!r}'.format(
+                    type(bad), bad
+                )
+            )
+
+        # Bad data length:
+        with self.assertRaises(ValueError) as cm:
+            db32_bisect(['33333333'], b'four')
+        self.assertEqual(str(cm.exception),
+            'len(data) is 4, need 5 <= len(data) <= 60'
+        )
+
+        # Invalid text that gets probed:
+        with self.assertRaises(ValueError) as cm:
+            db32_bisect(['3333333Z'], b'\x00' * 5)
+        self.assertEqual(str(cm.exception), "invalid Dbase32: '3333333Z'")
+        with self.assertRaises(ValueError) as cm:
+            db32_bisect(['3333333'], b'\x00' * 5)
+        self.assertEqual(str(cm.exception),
+            'len(text) is 7, need 8 <= len(text) <= 96'
+        )
+
+        # Empty sequence:
+        self.assertEqual(db32_bisect([], b'\x00' * 5), 0)
+        self.assertEqual(db32_bisect((), b'\x00' * 5), 0)
+
+        # Compare against bisect_left() on the decoded values:
+        for size in (5, 15, 30):
+            data = sorted(os.urandom(size) for i in range(500))
+            texts = [dbase32.db32enc(d) for d in data]
+            for (i, d) in enumerate(data):
+                self.assertEqual(db32_bisect(texts, d), i)
+                self.assertEqual(db32_bisect(tuple(texts), d), i)
+            for i in range(500):
+                d = os.urandom(size)
+                self.assertEqual(db32_bisect(texts, d), bisect_left(data, d))
+            self.assertEqual(db32_bisect(texts, b'\x00' * size), 0)
+            self.assertEqual(db32_bisect(texts, b'\xff' * size), 500)
+            blist = [t.encode() for t in texts]
+            self.assertEqual(db32_bisect(blist, data[250]), 250)
+
     def test_random_id(self):
         random_id = self.getattr('random_id')
 
@@ -1042,58 +1531,590 @@ class TestFunctions_Py(BackendTestCase):
         # Make sure final 80 bits are actually random:
         self.assertEqual(len(accum), 1000)
 
-    def check_refcounts(self, old_counts, args):
-        new_counts = get_refcounts(args)
-        self.assertEqual(new_counts, old_counts)
+    def test_time_id_ms(self):
+        time_id_ms = self.getattr('time_id_ms')
 
-    def check_join(self, name):
-        """
-        Common tests for `db32_join()` and `db32_join_2()`.
-        """
-        self.assertIn(name, ['db32_join', 'db32_join_2'])
-        func = self.getattr(name)
-        make_end = (make_join_end if name == 'db32_join' else make_join_end2)
+        def ms_bin(timestamp):
+            return int(timestamp * 1000).to_bytes(6, 'big')
 
-        # Use fastest random_id() implementation regardless of backend:
-        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
-        random_id = fastest.random_id
+        # Bad timestamp:
+        for bad in (2 ** 48 / 1000, 2 ** 40, float('inf'), float('nan')):
+            with self.assertRaises(ValueError) as cm:
+                time_id_ms(bad)
+            self.assertEqual(str(cm.exception),
+                'timestamp is {!r}, need timestamp < 2**48 / 1000'.format(
+                    float(bad)
+                )
+            )
 
-        # Requires at least 1 argument:
-        with self.assertRaises(TypeError) as cm:
-            func()
+        accum = set()
+        for n in range(250):
+            # Don't provide timestamp:
+            start = int(time.time() * 1000)
+            _id = time_id_ms()
+            end = int(time.time() * 1000)
+            self.assertIsInstance(_id, str)
+            self.assertEqual(len(_id), 24)
+            self.assertTrue(set(_id).issubset(_dbase32py.DB32_FORWARD))
+            data = _dbase32py.db32dec(_id)
+            ms = int.from_bytes(data[:6], 'big')
+            self.assertTrue(start - 1000 <= ms <= end + 1000)
+            accum.add(data[6:])
+
+            # Current timestamp:
+            timestamp = time.time()
+            _id = time_id_ms(timestamp)
+            data = _dbase32py.db32dec(_id)
+            self.assertEqual(data[:6], ms_bin(timestamp))
+            accum.add(data[6:])
+
+            # Smallest timestamp:
+            data = _dbase32py.db32dec(time_id_ms(0))
+            self.assertEqual(data[:6], bytes(6))
+            accum.add(data[6:])
+
+            # Largest timestamp:
+            data = _dbase32py.db32dec(time_id_ms((2 ** 48 - 1) / 1000))
+            self.assertEqual(data[:6], bytes([255] * 6))
+            accum.add(data[6:])
+
+        # Make sure final 72 bits are actually random:
+        self.assertEqual(len(accum), 1000)
+
+        # IDs from different milliseconds sort by time:
+        base = 1234567890
+        ids = [time_id_ms(base + i / 1000) for i in range(0, 2000, 7)]
+        self.assertEqual(sorted(ids), ids)
+        self.assertLess(time_id_ms(base + 0.001), time_id_ms(base + 0.002))
+
+    def test_random_ids(self):
+        random_ids = self.getattr('random_ids')
+
+        # Bad n:
+        with self.assertRaises(TypeError):
+            random_ids(1.0)
+        with self.assertRaises(ValueError) as cm:
+            random_ids(-1)
+        self.assertEqual(str(cm.exception), 'n is -1, need n >= 0')
+        n = sys.maxsize // 15 + 1
+        with self.assertRaises(OverflowError) as cm:
+            random_ids(n)
+        self.assertEqual(str(cm.exception), 'n is {}, too large'.format(n))
+        with self.assertRaises(OverflowError) as cm:
+            random_ids(sys.maxsize + 1)
         self.assertEqual(str(cm.exception),
-            '{}() requires at least one argument'.format(name)
+            'Python int too large to convert to C ssize_t'
         )
 
-        # Bad _id type:
-        for bad in (random_id().encode(), 17, 18.5):
-            for parents in range(5):
-                args = tuple(random_id() + '™' for i in range(parents)) + (bad,)
-                counts = get_refcounts(args)
-                with self.assertRaises(TypeError) as cm:
-                    func(*args)
-                self.assertEqual(str(cm.exception),
-                    '_id: need a {!r}; got a {!r}: {!r}'.format(
-                        str, type(bad), bad
-                    )
-                )
-                self.check_refcounts(counts, args)
+        # Bad numbytes:
+        with self.assertRaises(ValueError) as cm:
+            random_ids(1, 4)
+        self.assertEqual(str(cm.exception),
+            'numbytes is 4, need 5 <= numbytes <= 60'
+        )
+        with self.assertRaises(ValueError) as cm:
+            random_ids(1, numbytes=16)
+        self.assertEqual(str(cm.exception),
+            'numbytes is 16, need numbytes % 5 == 0'
+        )
 
-        # _id is non-ascii:
-        for bad in iter_random_non_ascii():
-            for parents in range(5):
-                args = tuple(random_id() + '™' for i in range(parents)) + (bad,)
-                counts = get_refcounts(args)
-                with self.assertRaises(ValueError) as cm:
-                    func(*args)
-                self.assertEqual(str(cm.exception),
-                    '_id is not ASCII: {!r}'.format(bad)
-                )
-                self.check_refcounts(counts, args)
+        self.assertEqual(random_ids(0), [])
+        for numbytes in range(5, 65, 5):
+            ids = random_ids(100, numbytes)
+            self.assertIsInstance(ids, list)
+            self.assertEqual(len(ids), 100)
+            for _id in ids:
+                self.assertIsInstance(_id, str)
+                self.assertEqual(len(_id), numbytes * 8 // 5)
+                self.assertTrue(set(_id).issubset(_dbase32py.DB32_FORWARD))
+            self.assertEqual(len(set(ids)), 100)
+        ids = random_ids(5000)
+        self.assertEqual(len(set(ids)), 5000)
+        self.assertEqual(set(len(_id) for _id in ids), {24})
+
+    def test_time_ids(self):
+        time_ids = self.getattr('time_ids')
+
+        # Bad n:
+        with self.assertRaises(TypeError):
+            time_ids(1.0)
+        with self.assertRaises(ValueError) as cm:
+            time_ids(-1)
+        self.assertEqual(str(cm.exception), 'n is -1, need n >= 0')
+        n = sys.maxsize // 11 + 1
+        with self.assertRaises(OverflowError) as cm:
+            time_ids(n)
+        self.assertEqual(str(cm.exception), 'n is {}, too large'.format(n))
+        with self.assertRaises(OverflowError) as cm:
+            time_ids(sys.maxsize + 1)
+        self.assertEqual(str(cm.exception),
+            'Python int too large to convert to C ssize_t'
+        )
 
-        # _id is ASCII and in Dbase32 set, but has incorrect length:
-        for bad in iter_random_db32():
-            for parents in range(5):
+        # Bad timestamp:
+        with self.assertRaises(OverflowError) as cm:
+            time_ids(1, float('inf'))
+        self.assertEqual(str(cm.exception),
+            'cannot convert float infinity to integer'
+        )
+
+        self.assertEqual(time_ids(0), [])
+
+        # Don't provide timestamp:
+        start = int(time.time())
+        ids = time_ids(100)
+        end = int(time.time())
+        self.assertEqual(len(ids), 100)
+        for _id in ids:
+            self.assertIsInstance(_id, str)
+            self.assertEqual(len(_id), 24)
+            ts = int.from_bytes(_dbase32py.db32dec(_id)[:4], 'big')
+            self.assertTrue(start - 1 <= ts <= end + 1)
+
+        # Provide timestamp:
+        for timestamp in (0, 1234567890.5, 2 ** 32 - 1):
+            ids = time_ids(1000, timestamp)
+            self.assertEqual(len(ids), 1000)
+            tails = set()
+            for _id in ids:
+                data = _dbase32py.db32dec(_id)
+                self.assertEqual(data[:4], int(timestamp).to_bytes(4, 'big'))
+                tails.add(data[4:])
+            self.assertEqual(len(tails), 1000)
+
+        # Timestamps wrap modulo 2**32, like int(timestamp) & 0xFFFFFFFF:
+        for timestamp in (2 ** 32, 2 ** 40 + 5.7, 1e30, 2.0 ** 70 + 2 ** 25):
+            expected = (int(timestamp) & 0xFFFFFFFF).to_bytes(4, 'big')
+            for _id in time_ids(10, timestamp):
+                self.assertEqual(_dbase32py.db32dec(_id)[:4], expected)
+
+    def test_time_id_timestamp(self):
+        time_id_timestamp = self.getattr('time_id_timestamp')
+
+        # Use fastest time_id() regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        time_id = fastest.time_id
+
+        # Bad type:
+        for bad in (17, 18.5, bytearray(b'3' * 24)):
+            with self.assertRaises(TypeError):
+                time_id_timestamp(bad)
+
+        # Bad length or content:
+        with self.assertRaises(ValueError) as cm:
+            time_id_timestamp('3' * 7)
+        self.assertEqual(str(cm.exception),
+            'len(text) is 7, need 8 <= len(text) <= 96'
+        )
+        with self.assertRaises(ValueError) as cm:
+            time_id_timestamp('3' * 25)
+        self.assertEqual(str(cm.exception),
+            'len(text) is 25, need len(text) % 8 == 0'
+        )
+        for size in (8, 16, 32, 96):
+            with self.assertRaises(ValueError) as cm:
+                time_id_timestamp('3' * size)
+            self.assertEqual(str(cm.exception),
+                'len(text) is {}, need len(text) == 24'.format(size)
+            )
+        good = time_id()
+        for i in range(24):
+            bad = good[:i] + 'Z' + good[i+1:]
+            with self.assertRaises(ValueError) as cm:
+                time_id_timestamp(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad)
+            )
+
+        for ts in (0, 1, 7, 8, 1234567890, 2 ** 31, 2 ** 32 - 1):
+            _id = time_id(ts)
+            self.assertEqual(time_id_timestamp(_id), ts)
+            self.assertEqual(time_id_timestamp(_id.encode()), ts)
+        for i in range(1000):
+            ts = random.randrange(2 ** 32)
+            self.assertEqual(time_id_timestamp(time_id(ts)), ts)
+
+    def test_time_id_timestamps(self):
+        time_id_timestamps = self.getattr('time_id_timestamps')
+
+        # Use fastest time_id() regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        time_id = fastest.time_id
+
+        good = time_id()
+        with self.assertRaises(TypeError) as cm:
+            time_id_timestamps([good, 17])
+        self.assertEqual(str(cm.exception),
+            "need a str or bytes instance; got a <class 'int'>: 17"
+        )
+        with self.assertRaises(ValueError) as cm:
+            time_id_timestamps([good, '33333333'])
+        self.assertEqual(str(cm.exception),
+            'len(text) is 8, need len(text) == 24'
+        )
+        bad = good[:-1] + 'Z'
+        with self.assertRaises(ValueError) as cm:
+            time_id_timestamps([good, bad])
+        self.assertEqual(str(cm.exception),
+            'invalid Dbase32: {!r}'.format(bad)
+        )
+
+        result = time_id_timestamps([])
+        self.assertIsInstance(result, array.array)
+        self.assertEqual(result.typecode, 'I')
+        self.assertEqual(list(result), [])
+
+        stamps = [random.randrange(2 ** 32) for i in range(1000)]
+        ids = [time_id(ts) for ts in stamps]
+        ids[0] = ids[0].encode()
+        result = time_id_timestamps(ids)
+        self.assertIsInstance(result, array.array)
+        self.assertEqual(result.typecode, 'I')
+        self.assertEqual(list(result), stamps)
+        self.assertEqual(list(time_id_timestamps(tuple(ids))), stamps)
+
+    def test_time_id_range(self):
+        time_id_range = self.getattr('time_id_range')
+        time_id = self.getattr('time_id')
+        db32enc = self.getattr('db32enc')
+
+        # Empty ranges:
+        empty = [(5, 5), (6, 5), (5.5, 5.9), (-7, 0), (2 ** 32, 2 ** 33)]
+        for (start, end) in empty:
+            with self.assertRaises(ValueError) as cm:
+                time_id_range(start, end)
+            self.assertEqual(str(cm.exception),
+                'time range [{}, {}) is empty'.format(start, end)
+            )
+
+        # Widest possible range:
+        self.assertEqual(time_id_range(-1, 2 ** 40),
+            ('3' * 24, 'Y' * 24)
+        )
+        self.assertEqual(time_id_range(0, 2 ** 32),
+            ('3' * 24, 'Y' * 24)
+        )
+
+        # Single second:
+        self.assertEqual(time_id_range(1234567890, 1234567891), (
+            db32enc(bytes.fromhex('499602d2') + b'\x00' * 11),
+            db32enc(bytes.fromhex('499602d2') + b'\xff' * 11),
+        ))
+        self.assertEqual(time_id_range(1234567890.9, 1234567891.1),
+            time_id_range(1234567890, 1234567891)
+        )
+
+        # Bounds agree with time_id():
+        for i in range(100):
+            ts = random.randrange(1, 2 ** 32 - 1)
+            (low, high) = time_id_range(ts, ts + 1)
+            for _id in [time_id(ts), time_id(ts + 0.5)]:
+                self.assertTrue(low <= _id <= high)
+            self.assertLess(time_id(ts - 1), low)
+            self.assertGreater(time_id(ts + 1), high)
+            (low2, high2) = time_id_range(ts - 1, ts + 2)
+            self.assertTrue(low2 < time_id(ts - 1) < low)
+            self.assertTrue(high < time_id(ts + 1) < high2)
+
+    def test_set_entropy_pool(self):
+        set_entropy_pool = self.getattr('set_entropy_pool')
+        entropy_pool_stats = self.getattr('entropy_pool_stats')
+        random_id = self.getattr('random_id')
+        time_id = self.getattr('time_id')
+        time_id_ms = self.getattr('time_id_ms')
+
+        # Disabled by default:
+        self.assertEqual(tuple(entropy_pool_stats()), (0, 0, 0, 0, 0))
+        random_id()
+        self.assertEqual(tuple(entropy_pool_stats()), (0, 0, 0, 0, 0))
+
+        # Bad size:
+        with self.assertRaises(TypeError):
+            set_entropy_pool(4096.0)
+        for bad in (-1, 1, 59, 16777217):
+            with self.assertRaises(ValueError) as cm:
+                set_entropy_pool(bad)
+            self.assertEqual(str(cm.exception),
+                'size is {}, need size == 0 or 60 <= size <= 16777216'.format(
+                    bad
+                )
+            )
+
+        try:
+            self.assertIsNone(set_entropy_pool(150))
+            stats = entropy_pool_stats()
+            self.assertEqual(
+                (stats.size, stats.available, stats.refills, stats.hits,
+                    stats.reseeds),
+                (150, 0, 0, 0, 0)
+            )
+            ids = [random_id() for i in range(25)]
+            self.assertEqual(tuple(entropy_pool_stats()), (150, 75, 3, 25, 0))
+            ids.extend(time_id() for i in range(3))
+            ids.extend(time_id_ms() for i in range(3))
+            self.assertEqual(tuple(entropy_pool_stats()), (150, 15, 3, 31, 0))
+            self.assertEqual(len(set(ids)), len(ids))
+            self.assertEqual(len(random_id(60)), 96)
+            self.assertEqual(tuple(entropy_pool_stats()), (150, 90, 4, 32, 0))
+
+            # Smallest pool:
+            set_entropy_pool(60)
+            random_id(60)
+            self.assertEqual(tuple(entropy_pool_stats()), (60, 0, 1, 1, 0))
+            random_id(60)
+            self.assertEqual(tuple(entropy_pool_stats()), (60, 0, 2, 2, 0))
+
+            # Lots of IDs:
+            set_entropy_pool(4096)
+            ids = set(random_id() for i in range(10000))
+            self.assertEqual(len(ids), 10000)
+            self.assertEqual(entropy_pool_stats().hits, 10000)
+
+            # A forked child must not hand out the same bytes as its parent:
+            if hasattr(os, 'fork'):
+                random_id()
+                (r, w) = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    try:
+                        os.write(w, random_id().encode())
+                        os.write(w, str(entropy_pool_stats().reseeds).encode())
+                    finally:
+                        os._exit(0)
+                os.close(w)
+                os.waitpid(pid, 0)
+                child = os.read(r, 100).decode()
+                os.close(r)
+                self.assertEqual(child[24:], '1')
+                self.assertNotEqual(child[:24], random_id())
+                self.assertEqual(entropy_pool_stats().reseeds, 0)
+
+            # Disable again:
+            set_entropy_pool(0)
+            self.assertEqual(tuple(entropy_pool_stats()), (0, 0, 0, 0, 0))
+        finally:
+            set_entropy_pool(0)
+
+    def test_IdGenerator(self):
+        IdGenerator = self.getattr('IdGenerator')
+
+        with self.assertRaises(TypeError):
+            IdGenerator(17)
+        gen = IdGenerator()
+        with self.assertRaises(TypeError):
+            gen(17)
+        self.assertIs(iter(gen), gen)
+
+        # IDs have the time_id() layout:
+        start = int(time.time())
+        _id = gen()
+        end = int(time.time())
+        self.assertIsInstance(_id, str)
+        self.assertEqual(len(_id), 24)
+        self.assertTrue(set(_id).issubset(_dbase32py.DB32_FORWARD))
+        ts = int.from_bytes(_dbase32py.db32dec(_id)[:4], 'big')
+        self.assertTrue(start - 1 <= ts <= end + 1)
+
+        # IDs are strictly increasing, whether called or iterated:
+        ids = [_id]
+        for i in range(5000):
+            ids.append(gen())
+            ids.append(next(gen))
+        self.assertEqual(sorted(set(ids)), ids)
+
+        # Within the same second, each ID is the previous ID plus one:
+        values = [int.from_bytes(_dbase32py.db32dec(_id), 'big')
+            for _id in ids]
+        steps = [b - a for (a, b) in zip(values, values[1:])
+            if (a >> 88) == (b >> 88)]
+        self.assertGreater(len(steps), 0)
+        self.assertEqual(set(steps), {1})
+
+        # Each generator starts from a random tail:
+        tails = set(_dbase32py.db32dec(IdGenerator()())[4:]
+            for i in range(100))
+        self.assertEqual(len(tails), 100)
+
+        # Threads crossing a second boundary never mint duplicates, and each
+        # thread sees its IDs strictly increasing:
+        for results in mint_threaded([IdGenerator() for i in range(16)]):
+            for ids in results:
+                self.assertEqual(sorted(set(ids)), ids)
+            total = sum(len(ids) for ids in results)
+            self.assertEqual(len(set().union(*results)), total)
+
+        # A forked child must not mint the same IDs as its parent:
+        if hasattr(os, 'fork'):
+            gen = IdGenerator()
+            gen()
+            (child, parent) = mint_forked(gen)
+            self.assertEqual(len(child), 100)
+            self.assertEqual(sorted(set(child)), child)
+            self.assertEqual(set(child) & set(parent), set())
+
+    def test_NodeIdGenerator(self):
+        NodeIdGenerator = self.getattr('NodeIdGenerator')
+        node_id_unpack = self.getattr('node_id_unpack')
+
+        with self.assertRaises(TypeError):
+            NodeIdGenerator()
+        with self.assertRaises(TypeError):
+            NodeIdGenerator(1.0)
+        for bad in (-1, 2 ** 32):
+            with self.assertRaises(ValueError) as cm:
+                NodeIdGenerator(bad)
+            self.assertEqual(str(cm.exception),
+                'node is {}, need 0 <= node < 2**32'.format(bad)
+            )
+        gen = NodeIdGenerator(2 ** 32 - 1)
+        self.assertEqual(gen.node, 2 ** 32 - 1)
+        with self.assertRaises(AttributeError):
+            gen.node = 1
+        with self.assertRaises(TypeError):
+            gen(17)
+        self.assertIs(iter(gen), gen)
+
+        # IDs have the time_id() layout, followed by the node and seq:
+        node = random.randrange(2 ** 32)
+        gen = NodeIdGenerator(node)
+        self.assertEqual(gen.node, node)
+        start = int(time.time())
+        _id = gen()
+        end = int(time.time())
+        self.assertIsInstance(_id, str)
+        self.assertEqual(len(_id), 24)
+        data = _dbase32py.db32dec(_id)
+        self.assertEqual(int.from_bytes(data[4:8], 'big'), node)
+        (ts, node2, seq) = node_id_unpack(_id)
+        self.assertTrue(start - 1 <= ts <= end + 1)
+        self.assertEqual(ts, int.from_bytes(data[:4], 'big'))
+        self.assertEqual(node2, node)
+        self.assertEqual(seq, int.from_bytes(data[8:], 'big'))
+        self.assertLess(seq, 2 ** 48)
+
+        # IDs are strictly increasing, whether called or iterated:
+        ids = [_id]
+        for i in range(5000):
+            ids.append(gen())
+            ids.append(next(gen))
+        self.assertEqual(sorted(set(ids)), ids)
+
+        # Within the same second, seq is the previous seq plus one:
+        unpacked = [node_id_unpack(_id) for _id in ids]
+        self.assertEqual(set(u[1] for u in unpacked), {node})
+        steps = [b[2] - a[2] for (a, b) in zip(unpacked, unpacked[1:])
+            if a[0] == b[0]]
+        self.assertGreater(len(steps), 0)
+        self.assertEqual(set(steps), {1})
+
+        # Each generator starts from a random seq:
+        seqs = set(node_id_unpack(NodeIdGenerator(node)())[2]
+            for i in range(100))
+        self.assertEqual(len(seqs), 100)
+
+        # Threads crossing a second boundary never mint duplicates, and each
+        # thread sees its IDs strictly increasing:
+        gens = [NodeIdGenerator(node) for i in range(16)]
+        for results in mint_threaded(gens):
+            for ids in results:
+                self.assertEqual(sorted(set(ids)), ids)
+            total = sum(len(ids) for ids in results)
+            self.assertEqual(len(set().union(*results)), total)
+
+        # A forked child must not mint the same IDs as its parent:
+        if hasattr(os, 'fork'):
+            (r, w) = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    os.write(w, gen().encode())
+                finally:
+                    os._exit(0)
+            os.close(w)
+            os.waitpid(pid, 0)
+            child = os.read(r, 100).decode()
+            os.close(r)
+            self.assertNotEqual(child, gen())
+
+        # node_id_unpack():
+        self.assertEqual(node_id_unpack('3' * 24), (0, 0, 0))
+        self.assertEqual(node_id_unpack(b'Y' * 24),
+            (2 ** 32 - 1, 2 ** 32 - 1, 2 ** 56 - 1)
+        )
+        data = bytes.fromhex('499602d2' '0000002a' '00000000000007')
+        text = _dbase32py.db32enc(data)
+        self.assertEqual(node_id_unpack(text), (1234567890, 42, 7))
+        self.assertEqual(node_id_unpack(text.encode()), (1234567890, 42, 7))
+        with self.assertRaises(TypeError):
+            node_id_unpack(17)
+        with self.assertRaises(ValueError) as cm:
+            node_id_unpack('3' * 16)
+        self.assertEqual(str(cm.exception),
+            'len(text) is 16, need len(text) == 24'
+        )
+        bad = text[:-1] + 'Z'
+        with self.assertRaises(ValueError) as cm:
+            node_id_unpack(bad)
+        self.assertEqual(str(cm.exception),
+            'invalid Dbase32: {!r}'.format(bad)
+        )
+
+    def check_refcounts(self, old_counts, args):
+        new_counts = get_refcounts(args)
+        self.assertEqual(new_counts, old_counts)
+
+    def check_join(self, name):
+        """
+        Common tests for `db32_join()`, `db32_join_2()`, and `db32_join_n()`.
+        """
+        self.assertIn(name, ['db32_join', 'db32_join_2', 'db32_join_n'])
+        func = self.getattr(name)
+        make_end = {
+            'db32_join': make_join_end,
+            'db32_join_2': make_join_end2,
+            'db32_join_n': make_join_end_n,
+        }[name]
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Requires at least 1 argument:
+        with self.assertRaises(TypeError) as cm:
+            func()
+        self.assertEqual(str(cm.exception),
+            '{}() requires at least one argument'.format(name)
+        )
+
+        # Bad _id type:
+        for bad in (random_id().encode(), 17, 18.5):
+            for parents in range(5):
+                args = tuple(random_id() + '™' for i in range(parents)) + (bad,)
+                counts = get_refcounts(args)
+                with self.assertRaises(TypeError) as cm:
+                    func(*args)
+                self.assertEqual(str(cm.exception),
+                    '_id: need a {!r}; got a {!r}: {!r}'.format(
+                        str, type(bad), bad
+                    )
+                )
+                self.check_refcounts(counts, args)
+
+        # _id is non-ascii:
+        for bad in iter_random_non_ascii():
+            for parents in range(5):
+                args = tuple(random_id() + '™' for i in range(parents)) + (bad,)
+                counts = get_refcounts(args)
+                with self.assertRaises(ValueError) as cm:
+                    func(*args)
+                self.assertEqual(str(cm.exception),
+                    '_id is not ASCII: {!r}'.format(bad)
+                )
+                self.check_refcounts(counts, args)
+
+        # _id is ASCII and in Dbase32 set, but has incorrect length:
+        for bad in iter_random_db32():
+            for parents in range(5):
                 args = tuple(random_id() + '™' for i in range(parents)) + (bad,)
                 counts = get_refcounts(args)
                 with self.assertRaises(ValueError) as cm:
@@ -1287,6 +2308,1185 @@ class TestFunctions_Py(BackendTestCase):
                     self.assertEqual(len(p), length)
                     self.assertEqual(p, expected)
 
+    def test_db32_join_n(self):
+        db32_join_n = self.check_join('db32_join_n')
+
+        # Sanity checks with static values:
+        self.assertEqual(db32_join_n('39AY39AY'), '39/AY/39AY')
+        self.assertEqual(db32_join_n('', '39AY39AY'), '/39/AY/39AY')
+        self.assertEqual(db32_join_n('foo', '39AY39AY'), 'foo/39/AY/39AY')
+        self.assertEqual(db32_join_n('/foo', '™', '39AY39AY'),
+            '/foo/™/39/AY/39AY'
+        )
+        self.assertEqual(db32_join_n('\U0001F600', '39AY39AY'),
+            '\U0001F600/39/AY/39AY'
+        )
+        self.assertEqual(db32_join_n('foo', '39AY39AY', levels=(3,)),
+            'foo/39A/Y39AY'
+        )
+        self.assertEqual(db32_join_n('foo', '39AY39AY', levels=(1, 1, 1)),
+            'foo/3/9/A/Y39AY'
+        )
+        self.assertEqual(db32_join_n('foo', '39AY39AY', levels=()),
+            'foo/39AY39AY'
+        )
+        self.assertEqual(db32_join_n('foo', '39AY39AY', levels=(7,)),
+            'foo/39AY39A/Y'
+        )
+
+        # Bad levels:
+        with self.assertRaises(TypeError) as cm:
+            db32_join_n('foo', '39AY39AY', levels=[2, 2])
+        self.assertEqual(str(cm.exception),
+            "levels: need a <class 'tuple'>; got a <class 'list'>: [2, 2]"
+        )
+        with self.assertRaises(TypeError) as cm:
+            db32_join_n('foo', '39AY39AY', levels=(2.0,))
+        self.assertEqual(str(cm.exception),
+            "'float' object cannot be interpreted as an integer"
+        )
+        for bad in (0, -1):
+            with self.assertRaises(ValueError) as cm:
+                db32_join_n('foo', '39AY39AY', levels=(2, bad))
+            self.assertEqual(str(cm.exception),
+                'levels[1] is {}, need levels[1] >= 1'.format(bad)
+            )
+        for bad in [(8,), (4, 4), (2, 2, 2, 2)]:
+            with self.assertRaises(ValueError) as cm:
+                db32_join_n('foo', '39AY39AY', levels=bad)
+            self.assertEqual(str(cm.exception),
+                'levels is {!r}, need sum(levels) < len(_id) == 8'.format(bad)
+            )
+        for bad in [(96,), (50, 46), (2 ** 62, 2 ** 62)]:
+            with self.assertRaises(ValueError) as cm:
+                db32_join_n('foo', '39AY39AY', levels=bad)
+            self.assertEqual(str(cm.exception),
+                'levels is {!r}, need sum(levels) < 96'.format(bad)
+            )
+        with self.assertRaises(TypeError) as cm:
+            db32_join_n('foo', '39AY39AY', layout=(2, 2))
+        self.assertEqual(str(cm.exception),
+            "db32_join_n() got an unexpected keyword argument 'layout'"
+        )
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Random parent directories, one that's non-ASCII:
+        pd1 = '/'.join(['/tmp', random_id(), random_id()])
+        pd2 = '/'.join(['foo™', random_id(), random_id()])
+        plen = len(pd1)
+        self.assertEqual(len(pd1), len(pd2))
+
+        # Common tests for text args:
+        self.check_text_value(db32_join_n, special=True)
+        for parentdir in (pd1, pd2):
+            self.check_text_value(db32_join_n, parentdir, special=True)
+        self.check_text_value(db32_join_n, pd1, pd2, special=True)
+
+        for size in BIN_SIZES:
+            for levels in [(), (2,), (3,), (2, 2), (1, 2, 3)]:
+                length = plen + (size * 8 // 5) + 1 + len(levels)
+                for parentdir in (pd1, pd2):
+                    for i in range(20):
+                        _id = random_id(size)
+                        pieces = [parentdir]
+                        start = 0
+                        for level in levels:
+                            pieces.append(_id[start:start + level])
+                            start += level
+                        pieces.append(_id[start:])
+                        p = db32_join_n(parentdir, _id, levels=levels)
+                        self.assertIs(type(p), str)
+                        self.assertEqual(len(p), length)
+                        self.assertEqual(p, '/'.join(pieces))
+
+    def test_db32_join_time(self):
+        db32_join_time = self.getattr('db32_join_time')
+        time_id = self.getattr('time_id')
+        time_id_range = self.getattr('time_id_range')
+
+        # Sanity checks with static values:
+        _id = 'FVCIGXSRBTKWKKT493I68DBT'
+        self.assertEqual(db32_join_time('/foo', _id),
+            '/foo/FVCIG333/BT/FVCIGXSRBTKWKKT493I68DBT'
+        )
+        self.assertEqual(db32_join_time('foo™', _id, 60, 3),
+            'foo™/FVCIGX33/DBT/FVCIGXSRBTKWKKT493I68DBT'
+        )
+        self.assertEqual(db32_join_time('', _id, bucket=1, width=16),
+            '/FVCIGXR3/BTKWKKT493I68DBT/FVCIGXSRBTKWKKT493I68DBT'
+        )
+        self.assertEqual(db32_join_time('/foo', '3' * 24, 2 ** 40),
+            '/foo/33333333/33/' + '3' * 24
+        )
+
+        # Bad _id:
+        with self.assertRaises(TypeError) as cm:
+            db32_join_time('/foo', _id.encode())
+        self.assertEqual(str(cm.exception),
+            "_id: need a <class 'str'>; got a <class 'bytes'>: "
+            "b'FVCIGXSRBTKWKKT493I68DBT'"
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_join_time('/foo', _id[:16])
+        self.assertEqual(str(cm.exception), 'len(_id) is 16, need len(_id) == 24')
+        with self.assertRaises(ValueError) as cm:
+            db32_join_time('/foo', _id[:-1] + '2')
+        self.assertEqual(str(cm.exception),
+            "invalid Dbase32: 'FVCIGXSRBTKWKKT493I68DB2'"
+        )
+
+        # Bad bucket or width:
+        with self.assertRaises(TypeError) as cm:
+            db32_join_time('/foo', _id, 86400.0)
+        self.assertEqual(str(cm.exception),
+            "'float' object cannot be interpreted as an integer"
+        )
+        for bad in (0, -1):
+            with self.assertRaises(ValueError) as cm:
+                db32_join_time('/foo', _id, bad)
+            self.assertEqual(str(cm.exception),
+                'bucket is {}, need bucket >= 1'.format(bad)
+            )
+        for bad in (-1, 0, 17, 24):
+            with self.assertRaises(ValueError) as cm:
+                db32_join_time('/foo', _id, 60, bad)
+            self.assertEqual(str(cm.exception),
+                'width is {}, need 1 <= width <= 16'.format(bad)
+            )
+
+        # Bad parentdir:
+        with self.assertRaises(TypeError) as cm:
+            db32_join_time(b'/foo', _id)
+        self.assertEqual(str(cm.exception),
+            'sequence item 0: expected str instance, bytes found'
+        )
+
+        # The bucket is the 8 character prefix of the earliest time_id() in it:
+        for bucket in (1, 60, 3600, 86400, 7 * 86400):
+            for width in (1, 2, 16):
+                for i in range(50):
+                    ts = random.randrange(2 ** 32)
+                    _id = time_id(ts)
+                    p = db32_join_time('/foo', _id, bucket, width)
+                    start = ts - ts % bucket
+                    name = time_id_range(start, start + 1)[0][:8]
+                    self.assertEqual(p,
+                        '/'.join(['/foo', name, _id[-width:], _id])
+                    )
+
+    def test_db32_split(self):
+        db32_split = self.getattr('db32_split')
+        db32_join_n = self.getattr('db32_join_n')
+
+        # Bad path or layout:
+        with self.assertRaises(TypeError) as cm:
+            db32_split(b'/foo/39/AY39AY')
+        self.assertEqual(str(cm.exception),
+            "path: need a <class 'str'>; got a <class 'bytes'>: "
+            "b'/foo/39/AY39AY'"
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_split('/foo/39/AY39AY', 0)
+        self.assertEqual(str(cm.exception),
+            'layout is 0, need 1 <= layout < 96'
+        )
+        with self.assertRaises(TypeError):
+            db32_split('/foo/39/AY39AY', [2])
+
+        # Static values:
+        self.assertEqual(db32_split('/foo/39/AY39AY'), ('/foo', '39AY39AY'))
+        self.assertEqual(db32_split('39/AY39AY'), ('', '39AY39AY'))
+        self.assertEqual(db32_split('/39/AY39AY'), ('', '39AY39AY'))
+        self.assertEqual(db32_split('//39/AY39AY'), ('/', '39AY39AY'))
+        self.assertEqual(db32_split('/™/bar/39/AY39AY'),
+            ('/™/bar', '39AY39AY')
+        )
+        self.assertEqual(db32_split('/foo/39/AY/39AY', (2, 2)),
+            ('/foo', '39AY39AY')
+        )
+        self.assertEqual(db32_split('/foo/39A/Y39AY', layout=3),
+            ('/foo', '39AY39AY')
+        )
+        self.assertEqual(db32_split('/foo/39AY39AY', ()), ('/foo', '39AY39AY'))
+        self.assertEqual(db32_split('39AY39AY', ()), ('', '39AY39AY'))
+
+        # Path doesn't match layout:
+        for (bad, layout) in [('/foo/39AY39AY', 2), ('/foo/3/9AY39AY', 2),
+                ('/foo/39/', 2), ('AY39AY', 2), ('', 2), ('', ()),
+                ('/foo/', ()), ('/foo/39/AY39AY', (2, 2)),
+                ('/foo/39//AY39AY', 2)]:
+            with self.assertRaises(ValueError) as cm:
+                db32_split(bad, layout)
+            self.assertEqual(str(cm.exception),
+                'path {!r} does not match layout {!r}'.format(bad, layout)
+            )
+
+        # Bad ID length or content:
+        with self.assertRaises(ValueError) as cm:
+            db32_split('/foo/39/AY39A')
+        self.assertEqual(str(cm.exception),
+            'len(text) is 7, need 8 <= len(text) <= 96'
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_split('/foo/39/AY39AY3')
+        self.assertEqual(str(cm.exception),
+            'len(text) is 9, need len(text) % 8 == 0'
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_split('/foo/39/' + 'A' * 200)
+        self.assertEqual(str(cm.exception),
+            'len(text) is 202, need 8 <= len(text) <= 96'
+        )
+        for (bad, _id) in [('/foo/39/AY39AZ', '39AY39AZ'),
+                ('/foo/39/AY39A™', '39AY39A™'),
+                ('/foo/../AY39AY', '..AY39AY')]:
+            with self.assertRaises(ValueError) as cm:
+                db32_split(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(_id)
+            )
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Round trip with db32_join_n():
+        for parentdir in ('', '/tmp', '/foo™/bar', '\U0001F600'):
+            for layout in [2, 3, (), (2, 2), (1, 2, 3)]:
+                levels = ((layout,) if isinstance(layout, int) else layout)
+                for size in BIN_SIZES:
+                    _id = random_id(size)
+                    path = db32_join_n(parentdir, _id, levels=levels)
+                    self.assertEqual(db32_split(path, layout),
+                        (parentdir, _id)
+                    )
+
+    def test_db32_split_bytes(self):
+        db32_split_bytes = self.getattr('db32_split_bytes')
+
+        with self.assertRaises(TypeError) as cm:
+            db32_split_bytes('/foo/39/AY39AY')
+        self.assertEqual(str(cm.exception),
+            "path: need a <class 'bytes'>; got a <class 'str'>: "
+            "'/foo/39/AY39AY'"
+        )
+        self.assertEqual(db32_split_bytes(b'/foo/39/AY39AY'),
+            (b'/foo', b'39AY39AY')
+        )
+        self.assertEqual(db32_split_bytes(b'/foo/39/AY/39AY', (2, 2)),
+            (b'/foo', b'39AY39AY')
+        )
+        self.assertEqual(db32_split_bytes('/™/39/AY39AY'.encode()),
+            ('/™'.encode(), b'39AY39AY')
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_split_bytes(b'/foo/39AY39AY')
+        self.assertEqual(str(cm.exception),
+            "path b'/foo/39AY39AY' does not match layout 2"
+        )
+        for bad in (b'/foo/39/AY39AZ', b'/foo/39/AY39A\xff'):
+            with self.assertRaises(ValueError) as cm:
+                db32_split_bytes(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad[5:7] + bad[8:])
+            )
+
+    def test_PathBuilder(self):
+        PathBuilder = self.getattr('PathBuilder')
+        db32_join_n = self.getattr('db32_join_n')
+
+        # Bad parentdir:
+        with self.assertRaises(TypeError) as cm:
+            PathBuilder(b'/foo')
+        self.assertEqual(str(cm.exception),
+            "parentdir: need a <class 'str'>; got a <class 'bytes'>: b'/foo'"
+        )
+        with self.assertRaises(TypeError):
+            PathBuilder()
+
+        # Bad layout:
+        with self.assertRaises(TypeError) as cm:
+            PathBuilder('/foo', [2])
+        self.assertEqual(str(cm.exception),
+            "layout: need a <class 'int'> or <class 'tuple'>; "
+            "got a <class 'list'>: [2]"
+        )
+        for bad in (0, -1, 96):
+            with self.assertRaises(ValueError) as cm:
+                PathBuilder('/foo', bad)
+            self.assertEqual(str(cm.exception),
+                'layout is {}, need 1 <= layout < 96'.format(bad)
+            )
+        with self.assertRaises(ValueError) as cm:
+            PathBuilder('/foo', (2, 0))
+        self.assertEqual(str(cm.exception),
+            'layout[1] is 0, need layout[1] >= 1'
+        )
+        with self.assertRaises(ValueError) as cm:
+            PathBuilder('/foo', (48, 48))
+        self.assertEqual(str(cm.exception),
+            'layout is (48, 48), need sum(layout) < 96'
+        )
+
+        # Attributes:
+        builder = PathBuilder('/foo')
+        self.assertEqual(builder.parentdir, '/foo')
+        self.assertEqual(builder.layout, 2)
+        with self.assertRaises(AttributeError):
+            builder.parentdir = '/bar'
+        with self.assertRaises(AttributeError):
+            builder.layout = 3
+        builder = PathBuilder('/foo', layout=(2, 2))
+        self.assertEqual(builder.layout, (2, 2))
+
+        # Bad IDs are handled just like db32_join_2():
+        builder = PathBuilder('/foo')
+        with self.assertRaises(TypeError) as cm:
+            builder(b'39AY39AY')
+        self.assertEqual(str(cm.exception),
+            "_id: need a <class 'str'>; got a <class 'bytes'>: b'39AY39AY'"
+        )
+        with self.assertRaises(ValueError) as cm:
+            builder('39AY39A™')
+        self.assertEqual(str(cm.exception), "_id is not ASCII: '39AY39A™'")
+        with self.assertRaises(ValueError) as cm:
+            builder('39AY39AZ')
+        self.assertEqual(str(cm.exception), "invalid Dbase32: '39AY39AZ'")
+        with self.assertRaises(ValueError) as cm:
+            builder.paths(['39AY39AY', '39AY39AZ'])
+        self.assertEqual(str(cm.exception), "invalid Dbase32: '39AY39AZ'")
+        with self.assertRaises(ValueError) as cm:
+            PathBuilder('/foo', 8)('39AY39AY')
+        self.assertEqual(str(cm.exception),
+            'layout is 8, need sum(layout) < len(_id) == 8'
+        )
+        with self.assertRaises(TypeError):
+            builder()
+        with self.assertRaises(TypeError):
+            builder('39AY39AY', '39AY39AY')
+        self.assertEqual(builder(_id='39AY39AY'), '/foo/39/AY39AY')
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Matches db32_join_n():
+        for parentdir in ('', '/tmp', 'foo™', '\U0001F600'):
+            for layout in [2, 3, (), (2,), (2, 2), (1, 2, 3)]:
+                builder = PathBuilder(parentdir, layout)
+                levels = ((layout,) if isinstance(layout, int) else layout)
+                ids = [random_id(size) for size in BIN_SIZES]
+                expected = [db32_join_n(parentdir, _id, levels=levels)
+                    for _id in ids]
+                self.assertEqual([builder(_id) for _id in ids], expected)
+                self.assertEqual(builder.paths(ids), expected)
+                self.assertEqual(builder.paths(tuple(ids)), expected)
+                self.assertEqual(builder.paths(iter(ids)), expected)
+                self.assertEqual(builder.paths([]), [])
+
+    def check_join_bytes(self, name):
+        """
+        Common tests for `db32_join_bytes()` and `db32_join_2_bytes()`.
+        """
+        self.assertIn(name, ['db32_join_bytes', 'db32_join_2_bytes'])
+        func = self.getattr(name)
+        make_end = (make_join_end if name == 'db32_join_bytes'
+            else make_join_end2)
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Requires at least 1 argument:
+        with self.assertRaises(TypeError) as cm:
+            func()
+        self.assertEqual(str(cm.exception),
+            '{}() requires at least one argument'.format(name)
+        )
+
+        # Bad _id type:
+        for bad in (bytearray(b'39AY39AY'), 17, 18.5):
+            with self.assertRaises(TypeError) as cm:
+                func(b'/foo', bad)
+            self.assertEqual(str(cm.exception),
+                '_id: need a {!r} or {!r}; got a {!r}: {!r}'.format(
+                    bytes, str, type(bad), bad
+                )
+            )
+
+        # _id is non-ASCII, or not valid Dbase32:
+        with self.assertRaises(ValueError) as cm:
+            func(b'/foo', '39AY39A™')
+        self.assertEqual(str(cm.exception), "_id is not ASCII: '39AY39A™'")
+        for bad in ('39AY39AZ', b'39AY39AZ', '39AY39A\x00',
+                '39AY39A™'.encode()[:8]):
+            with self.assertRaises(ValueError) as cm:
+                func(b'/foo', bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad)
+            )
+        for bad in ('39AY39A', b'39AY39AY3'):
+            with self.assertRaises(ValueError):
+                func(b'/foo', bad)
+
+        # Bad type in parents:
+        for bad in ('/foo', bytearray(b'/foo'), 17):
+            with self.assertRaises(TypeError) as cm:
+                func(b'/srv', bad, '39AY39AY')
+            self.assertEqual(str(cm.exception),
+                'sequence item 1: expected a bytes-like object, '
+                '{} found'.format(type(bad).__name__)
+            )
+
+        # All good, with str or bytes _id:
+        for size in BIN_SIZES:
+            _id = random_id(size)
+            for parents in range(5):
+                args = tuple(random_id().encode() + '™'.encode()
+                    for i in range(parents))
+                expected = b'/'.join(args + (make_end(_id).encode(),))
+                for value in (_id, _id.encode()):
+                    p = func(*(args + (value,)))
+                    self.assertIs(type(p), bytes)
+                    self.assertEqual(p, expected)
+
+        return func
+
+    def test_Codec(self):
+        Codec = self.getattr('Codec')
+        B32_FORWARD = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+
+        # Same checks, in the same order, as gen.check_forward():
+        for bad in (b'3456789ABCDEFGHIJKLMNOPQRSTUVWXY', None, list(B32_FORWARD)):
+            with self.assertRaises(TypeError) as cm:
+                Codec(bad)
+            self.assertEqual(str(cm.exception),
+                'forward: need a {!r}; got a {!r}: {!r}'.format(
+                    str, type(bad), bad
+                )
+            )
+            with self.assertRaises(TypeError) as cm2:
+                gen.check_forward(bad)
+            self.assertEqual(str(cm.exception), str(cm2.exception))
+        bad_values = [
+            '',
+            B32_FORWARD[:-1],
+            B32_FORWARD + 'A',
+            'A' * 32,
+            B32_FORWARD[:-1] + 'A',
+            B32_FORWARD[:-1] + 'a',
+            B32_FORWARD[:-1] + '™',
+            B32_FORWARD[:-2] + '™™',
+            B32_FORWARD[:-1] + '\U0001F600',
+        ]
+        for bad in bad_values:
+            with self.assertRaises(ValueError) as cm:
+                Codec(bad)
+            with self.assertRaises(ValueError) as cm2:
+                gen.check_forward(bad)
+            self.assertEqual(str(cm.exception), str(cm2.exception))
+        with self.assertRaises(ValueError) as cm:
+            Codec(B32_FORWARD[:-1] + 'a')
+        self.assertEqual(str(cm.exception),
+            "forward: 'ABCDEFGHIJKLMNOPQRSTUVWXYZ23456a' not a subset of "
+            "'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'"
+        )
+
+        # Dbase32 alphabet should match db32enc(), db32dec(), etc:
+        db32 = Codec(dbase32.DB32ALPHABET)
+        self.assertEqual(db32.forward, dbase32.DB32ALPHABET)
+        self.assertEqual(repr(db32), "Codec('3456789ABCDEFGHIJKLMNOPQRSTUVWXY')")
+        self.check_text_type(db32.decode)
+        self.check_text_type(db32.check)
+        self.check_text_type(db32.isvalid)
+        self.check_text_value(db32.decode)
+        self.check_text_value(db32.check)
+        with self.assertRaises(TypeError) as cm:
+            db32.encode('3399AAYY')
+        self.assertEqual(str(cm.exception),
+            "a bytes-like object is required, not 'str'"
+        )
+        for bad in (bytearray(b'binary foo'), memoryview(b'binary foo')):
+            with self.assertRaises(TypeError) as cm:
+                db32.encode(bad)
+            self.assertEqual(str(cm.exception),
+                _dbase32py._PYBUF_TYPE_ERROR1.format(type(bad).__name__)
+            )
+        for method in (db32.decode, db32.isvalid, db32.check):
+            with self.assertRaises(TypeError) as cm:
+                method(bytearray(b'3399AAYY'))
+            self.assertEqual(str(cm.exception), _dbase32py._PYBUF_TYPE_ERROR2)
+            with self.assertRaises(TypeError) as cm:
+                method(memoryview(b'3399AAYY'))
+            self.assertEqual(str(cm.exception),
+                _dbase32py._PYBUF_TYPE_ERROR1.format('memoryview')
+            )
+        with self.assertRaises(ValueError) as cm:
+            db32.encode(b'four')
+        self.assertEqual(str(cm.exception),
+            'len(data) is 4, need 5 <= len(data) <= 60'
+        )
+        for size in BIN_SIZES:
+            for i in range(50):
+                data = os.urandom(size)
+                text = _dbase32py.db32enc(data)
+                self.assertEqual(db32.encode(data), text)
+                self.assertEqual(db32.decode(text), data)
+                self.assertEqual(db32.decode(text.encode()), data)
+                self.assertIs(db32.isvalid(text), True)
+                self.assertIsNone(db32.check(text))
+
+        # RFC-3548 alphabet should match the base64 module:
+        b32 = Codec(B32_FORWARD)
+        self.assertEqual(b32.forward, B32_FORWARD)
+        self.assertEqual(b32.decode('AAAAAAAA'), b'\x00' * 5)
+        self.assertEqual(b32.decode('77777777'), b'\xff' * 5)
+        for bad in ('AAAAAAA1', 'AAAAAAA8', 'aaaaaaaa', 'AAAAAAA=', 'AAAAAA\xff'):
+            self.assertIs(b32.isvalid(bad), False)
+            with self.assertRaises(ValueError) as cm:
+                b32.decode(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad)
+            )
+            with self.assertRaises(ValueError) as cm:
+                b32.check(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad)
+            )
+        for size in BIN_SIZES:
+            for i in range(50):
+                data = os.urandom(size)
+                text = base64.b32encode(data).decode()
+                self.assertEqual(b32.encode(data), text)
+                self.assertEqual(b32.decode(text), data)
+                self.assertIs(b32.isvalid(text), True)
+                self.assertIsNone(b32.check(text))
+
+        # Every possible alphabet position, for a random alphabet:
+        forward = ''.join(sorted(random.sample(gen.POSSIBLE, 32)))
+        codec = Codec(forward)
+        for i in range(32):
+            text = forward[i] * 8
+            value = int(format(i, '05b') * 8, 2)
+            self.assertEqual(codec.decode(text), value.to_bytes(5, 'big'))
+            self.assertEqual(codec.encode(value.to_bytes(5, 'big')), text)
+        for i in range(128):
+            if chr(i) not in forward:
+                self.assertIs(codec.isvalid(forward[:7] + chr(i)), False)
+
+    def test_db32_join_bytes(self):
+        db32_join_bytes = self.check_join_bytes('db32_join_bytes')
+        self.assertEqual(db32_join_bytes('39AY39AY'), b'39AY39AY')
+        self.assertEqual(db32_join_bytes(b'', b'39AY39AY'), b'/39AY39AY')
+        self.assertEqual(db32_join_bytes(b'/foo', b'bar', '39AY39AY'),
+            b'/foo/bar/39AY39AY'
+        )
+
+    def test_db32_join_2_bytes(self):
+        db32_join_2_bytes = self.check_join_bytes('db32_join_2_bytes')
+        self.assertEqual(db32_join_2_bytes('39AY39AY'), b'39/AY39AY')
+        self.assertEqual(db32_join_2_bytes(b'', b'39AY39AY'), b'/39/AY39AY')
+        self.assertEqual(db32_join_2_bytes(b'/foo', b'bar', '39AY39AY'),
+            b'/foo/bar/39/AY39AY'
+        )
+
+    def test_db32_paths(self):
+        db32_paths = self.getattr('db32_paths')
+        db32_join_n = self.getattr('db32_join_n')
+
+        # Bad parentdir, layout, or errors:
+        with self.assertRaises(TypeError) as cm:
+            db32_paths(b'/foo', [])
+        self.assertEqual(str(cm.exception),
+            "parentdir: need a <class 'str'>; got a <class 'bytes'>: b'/foo'"
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_paths('/foo', [], 0)
+        self.assertEqual(str(cm.exception),
+            'layout is 0, need 1 <= layout < 96'
+        )
+        for bad in ('ignore', 'STRICT', None, 17):
+            with self.assertRaises(ValueError) as cm:
+                db32_paths('/foo', [], errors=bad)
+            self.assertEqual(str(cm.exception),
+                "errors is {!r}, need 'strict', 'skip', or 'none'".format(bad)
+            )
+        with self.assertRaises(TypeError):
+            db32_paths('/foo', 17)
+
+        # errors policies:
+        ids = ['39AY39AY', 17, '39AY39AZ', b'39AY39AY', '39AY39A™',
+            'YYYYYYYYYYYYYYYY']
+        with self.assertRaises(TypeError) as cm:
+            db32_paths('/foo', ids)
+        self.assertEqual(str(cm.exception),
+            "_id: need a <class 'str'>; got a <class 'int'>: 17"
+        )
+        with self.assertRaises(ValueError) as cm:
+            db32_paths('/foo', ids[2:3], errors='strict')
+        self.assertEqual(str(cm.exception), "invalid Dbase32: '39AY39AZ'")
+        self.assertEqual(db32_paths('/foo', ids, errors='skip'),
+            ['/foo/39/AY39AY', '/foo/YY/YYYYYYYYYYYYYY']
+        )
+        self.assertEqual(db32_paths('/foo', ids, (2, 2), errors='none'),
+            ['/foo/39/AY/39AY', None, None, None, None,
+                '/foo/YY/YY/YYYYYYYYYYYY']
+        )
+        self.assertEqual(db32_paths('/foo', ids, 8, 'skip'),
+            ['/foo/YYYYYYYY/YYYYYYYY']
+        )
+        self.assertEqual(db32_paths('/foo', [], errors='none'), [])
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Matches db32_join_n():
+        ids = [random_id(size) for size in BIN_SIZES for i in range(10)]
+        for parentdir in ('', '/tmp', 'foo™'):
+            for layout in [2, 3, (), (2, 2), (1, 2, 3)]:
+                levels = ((layout,) if isinstance(layout, int) else layout)
+                expected = [db32_join_n(parentdir, _id, levels=levels)
+                    for _id in ids]
+                for errors in ('strict', 'skip', 'none'):
+                    self.assertEqual(
+                        db32_paths(parentdir, ids, layout, errors), expected
+                    )
+                    self.assertEqual(
+                        db32_paths(parentdir, iter(ids), layout, errors),
+                        expected
+                    )
+        self.assertEqual(db32_paths('/tmp', ids),
+            [db32_join_n('/tmp', _id, levels=(2,)) for _id in ids]
+        )
+
+    def test_Db32IdSet(self):
+        Db32IdSet = self.getattr('Db32IdSet')
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Bad numbytes:
+        with self.assertRaises(ValueError) as cm:
+            Db32IdSet(numbytes=4)
+        self.assertEqual(str(cm.exception),
+            'numbytes is 4, need 5 <= numbytes <= 60'
+        )
+        with self.assertRaises(ValueError) as cm:
+            Db32IdSet(numbytes=29)
+        self.assertEqual(str(cm.exception),
+            'numbytes is 29, need numbytes % 5 == 0'
+        )
+
+        s = Db32IdSet()
+        self.assertEqual(s.numbytes, 15)
+        self.assertEqual(len(s), 0)
+        self.assertEqual(list(s), [])
+        with self.assertRaises(TypeError):
+            hash(s)
+
+        # Bad key type:
+        for bad in [17, 18.5, None]:
+            for method in (s.add, s.discard, s.remove, s.__contains__):
+                with self.assertRaises(TypeError) as cm:
+                    method(bad)
+                self.assertEqual(str(cm.exception),
+                    'need a str or bytes instance; got a {!r}: {!r}'.format(
+                        type(bad), bad
+                    )
+                )
+
+        # Bad key length or content:
+        for method in (s.add, s.discard, s.remove, s.__contains__):
+            with self.assertRaises(ValueError) as cm:
+                method('3333333')
+            self.assertEqual(str(cm.exception),
+                'len(text) is 7, need 8 <= len(text) <= 96'
+            )
+            with self.assertRaises(ValueError) as cm:
+                method('33333333')
+            self.assertEqual(str(cm.exception),
+                'len(text) is 8, need len(text) == 24'
+            )
+            bad = random_id()[:-1] + 'Z'
+            with self.assertRaises(ValueError) as cm:
+                method(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad)
+            )
+        self.assertEqual(len(s), 0)
+
+        # add(), discard(), remove(), and `in`:
+        _id = random_id()
+        self.assertNotIn(_id, s)
+        self.assertIsNone(s.add(_id))
+        self.assertIn(_id, s)
+        self.assertIn(_id.encode(), s)
+        self.assertEqual(len(s), 1)
+        self.assertIsNone(s.add(_id.encode()))
+        self.assertEqual(len(s), 1)
+        self.assertEqual(list(s), [_id])
+        self.assertIsNone(s.discard(_id))
+        self.assertNotIn(_id, s)
+        self.assertEqual(len(s), 0)
+        self.assertIsNone(s.discard(_id))
+        with self.assertRaises(KeyError) as cm:
+            s.remove(_id)
+        self.assertEqual(cm.exception.args, (_id,))
+        s.add(_id)
+        self.assertIsNone(s.remove(_id))
+        self.assertEqual(len(s), 0)
+
+        # Compare against a set of str, with enough IDs to grow the table:
+        for numbytes in (5, 15, 30):
+            ids = set(random_id(numbytes) for i in range(5000))
+            s = Db32IdSet(ids, numbytes)
+            self.assertEqual(s.numbytes, numbytes)
+            self.assertEqual(len(s), len(ids))
+            self.assertEqual(set(s), ids)
+            for _id in ids:
+                self.assertIn(_id, s)
+            others = set(random_id(numbytes) for i in range(1000))
+            for _id in others:
+                self.assertNotIn(_id, s)
+            removed = set(list(ids)[:2500])
+            for _id in removed:
+                s.remove(_id)
+            self.assertEqual(len(s), len(ids) - 2500)
+            self.assertEqual(set(s), ids - removed)
+            s.update(removed)
+            s.update(others)
+            self.assertEqual(set(s), ids | others)
+            s.clear()
+            self.assertEqual(len(s), 0)
+            self.assertEqual(list(s), [])
+
+        # time_id() IDs share their leading bytes, so make sure they hash well:
+        time_id = fastest.time_id
+        ids = set(time_id(1234567890) for i in range(5000))
+        s = Db32IdSet(ids)
+        self.assertEqual(set(s), ids)
+
+        # Changing the set during iteration:
+        s = Db32IdSet(random_id() for i in range(10))
+        with self.assertRaises(RuntimeError):
+            for _id in s:
+                s.add(random_id())
+
+    def test_Db32Dict(self):
+        Db32Dict = self.getattr('Db32Dict')
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Bad numbytes:
+        with self.assertRaises(ValueError) as cm:
+            Db32Dict(numbytes=4)
+        self.assertEqual(str(cm.exception),
+            'numbytes is 4, need 5 <= numbytes <= 60'
+        )
+
+        d = Db32Dict()
+        self.assertEqual(d.numbytes, 15)
+        self.assertEqual(len(d), 0)
+        self.assertEqual(list(d), [])
+        with self.assertRaises(TypeError):
+            hash(d)
+
+        # Bad keys:
+        setitem = d.__setitem__
+        methods = (d.__getitem__, d.__delitem__, d.__contains__, d.get, d.pop,
+            lambda key: setitem(key, 'foo'))
+        for method in methods:
+            with self.assertRaises(TypeError) as cm:
+                method(17)
+            self.assertEqual(str(cm.exception),
+                "need a str or bytes instance; got a <class 'int'>: 17"
+            )
+            with self.assertRaises(ValueError) as cm:
+                method('33333333')
+            self.assertEqual(str(cm.exception),
+                'len(text) is 8, need len(text) == 24'
+            )
+            bad = random_id()[:-1] + 'Z'
+            with self.assertRaises(ValueError) as cm:
+                method(bad)
+            self.assertEqual(str(cm.exception),
+                'invalid Dbase32: {!r}'.format(bad)
+            )
+        self.assertEqual(len(d), 0)
+
+        # Bad (key, value) pairs:
+        with self.assertRaises(ValueError) as cm:
+            Db32Dict([(random_id(), 1, 2)])
+        self.assertEqual(str(cm.exception),
+            'need (key, value) pairs; got 3 items'
+        )
+        with self.assertRaises(TypeError):
+            Db32Dict([17])
+
+        # Item access, get(), and pop():
+        _id = random_id()
+        value = object()
+        with self.assertRaises(KeyError) as cm:
+            d[_id]
+        self.assertEqual(cm.exception.args, (_id,))
+        self.assertIsNone(d.get(_id))
+        self.assertIs(d.get(_id, value), value)
+        d[_id] = value
+        self.assertIn(_id, d)
+        self.assertIn(_id.encode(), d)
+        self.assertIs(d[_id], value)
+        self.assertIs(d[_id.encode()], value)
+        self.assertIs(d.get(_id), value)
+        self.assertEqual(len(d), 1)
+        d[_id.encode()] = 'foo'
+        self.assertEqual(len(d), 1)
+        self.assertEqual(list(d.items()), [(_id, 'foo')])
+        self.assertEqual(d.pop(_id), 'foo')
+        self.assertNotIn(_id, d)
+        self.assertEqual(len(d), 0)
+        self.assertIs(d.pop(_id, value), value)
+        with self.assertRaises(KeyError) as cm:
+            d.pop(_id)
+        self.assertEqual(cm.exception.args, (_id,))
+        with self.assertRaises(KeyError) as cm:
+            del d[_id]
+        self.assertEqual(cm.exception.args, (_id,))
+        d[_id] = 'bar'
+        del d[_id]
+        self.assertEqual(len(d), 0)
+
+        # Compare against a dict with str keys:
+        for numbytes in (5, 15, 30):
+            expected = dict(
+                (random_id(numbytes), i) for i in range(5000)
+            )
+            d = Db32Dict(expected, numbytes)
+            self.assertEqual(d.numbytes, numbytes)
+            self.assertEqual(len(d), len(expected))
+            self.assertEqual(dict(d.items()), expected)
+            self.assertEqual(set(d), set(expected))
+            self.assertEqual(set(d.keys()), set(expected))
+            self.assertEqual(sorted(d.values()), sorted(expected.values()))
+            for (_id, value) in expected.items():
+                self.assertEqual(d[_id], value)
+            for i in range(1000):
+                self.assertNotIn(random_id(numbytes), d)
+            removed = list(expected)[:2500]
+            for _id in removed:
+                del d[_id]
+                del expected[_id]
+            self.assertEqual(dict(d.items()), expected)
+            d.update((_id, 'foo') for _id in removed)
+            expected.update((_id, 'foo') for _id in removed)
+            self.assertEqual(dict(d.items()), expected)
+            self.assertEqual(dict(Db32Dict(d, numbytes).items()), expected)
+            d.clear()
+            self.assertEqual(len(d), 0)
+            self.assertEqual(list(d.items()), [])
+
+        # Changing the dict during iteration:
+        d = Db32Dict((random_id(), i) for i in range(10))
+        with self.assertRaises(RuntimeError):
+            for _id in d:
+                d[random_id()] = None
+
+        # Values are released, including in reference cycles:
+        class Value:
+            pass
+        value = Value()
+        ref = weakref.ref(value)
+        d = Db32Dict([(random_id(), value)])
+        value.d = d
+        del value
+        del d
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_Db32SortedArray(self):
+        Db32SortedArray = self.getattr('Db32SortedArray')
+
+        # Use fastest implementations regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+        time_id = fastest.time_id
+
+        # Bad numbytes:
+        with self.assertRaises(ValueError) as cm:
+            Db32SortedArray(numbytes=4)
+        self.assertEqual(str(cm.exception),
+            'numbytes is 4, need 5 <= numbytes <= 60'
+        )
+
+        # Bad IDs:
+        with self.assertRaises(TypeError) as cm:
+            Db32SortedArray([random_id(), 17])
+        self.assertEqual(str(cm.exception),
+            "need a str or bytes instance; got a <class 'int'>: 17"
+        )
+        with self.assertRaises(ValueError) as cm:
+            Db32SortedArray([random_id(), '33333333'])
+        self.assertEqual(str(cm.exception),
+            'len(text) is 8, need len(text) == 24'
+        )
+        bad = random_id()[:-1] + 'Z'
+        with self.assertRaises(ValueError) as cm:
+            Db32SortedArray([random_id(), bad])
+        self.assertEqual(str(cm.exception),
+            'invalid Dbase32: {!r}'.format(bad)
+        )
+
+        # Empty:
+        a = Db32SortedArray()
+        self.assertEqual(a.numbytes, 15)
+        self.assertEqual(len(a), 0)
+        self.assertEqual(list(a), [])
+        self.assertNotIn(random_id(), a)
+        self.assertEqual(a.bisect(random_id()), 0)
+        self.assertEqual(list(a.range()), [])
+        self.assertEqual(list(a.time_range(0, 2 ** 32)), [])
+        with self.assertRaises(IndexError) as cm:
+            a[0]
+        self.assertEqual(str(cm.exception),
+            'Db32SortedArray index out of range'
+        )
+        with self.assertRaises(TypeError):
+            hash(a)
+
+        # Compare against a sorted list of str:
+        for numbytes in (5, 15, 30):
+            ids = sorted(random_id(numbytes) for i in range(2000))
+            a = Db32SortedArray(reversed(ids), numbytes)
+            self.assertEqual(a.numbytes, numbytes)
+            self.assertEqual(len(a), len(ids))
+            self.assertEqual(list(a), ids)
+            self.assertEqual(a[0], ids[0])
+            self.assertEqual(a[-1], ids[-1])
+            self.assertEqual(list(reversed(a)), list(reversed(ids)))
+            for (i, _id) in enumerate(ids):
+                self.assertEqual(a[i], _id)
+                self.assertIn(_id, a)
+                self.assertIn(_id.encode(), a)
+                self.assertEqual(a.bisect(_id), i)
+                self.assertEqual(a.bisect_right(_id), i + 1)
+            for i in range(500):
+                _id = random_id(numbytes)
+                self.assertEqual(_id in a, _id in ids)
+                self.assertEqual(a.bisect(_id), bisect.bisect_left(ids, _id))
+                self.assertEqual(a.bisect_right(_id),
+                    bisect.bisect_right(ids, _id)
+                )
+            lo = ids[500]
+            hi = ids[1500]
+            self.assertEqual(list(a.range(lo, hi)), ids[500:1500])
+            self.assertEqual(list(a.range(lo)), ids[500:])
+            self.assertEqual(list(a.range(None, hi)), ids[:1500])
+            self.assertEqual(list(a.range()), ids)
+            self.assertEqual(list(a.range(hi, lo)), [])
+
+        # Duplicates are kept, just like with sorted():
+        _id = random_id()
+        a = Db32SortedArray([_id, _id, _id])
+        self.assertEqual(list(a), [_id, _id, _id])
+        self.assertEqual(a.bisect(_id), 0)
+        self.assertEqual(a.bisect_right(_id), 3)
+
+        # time_range():
+        ids = []
+        for ts in (0, 1000, 1001, 1002, 2 ** 32 - 1):
+            ids.extend(time_id(ts) for i in range(10))
+        ids.sort()
+        a = Db32SortedArray(ids)
+        self.assertEqual(list(a.time_range(1000, 1002)), ids[10:30])
+        self.assertEqual(list(a.time_range(1000.9, 1002.9)), ids[10:30])
+        self.assertEqual(list(a.time_range(1001, 1001)), [])
+        self.assertEqual(list(a.time_range(1002, 1000)), [])
+        self.assertEqual(list(a.time_range(-5, 1)), ids[:10])
+        self.assertEqual(list(a.time_range(0, 2 ** 32 - 1)), ids[:40])
+        self.assertEqual(list(a.time_range(0, 2 ** 32)), ids)
+        self.assertEqual(list(a.time_range(0, 2 ** 40)), ids)
+        self.assertEqual(list(a.time_range(2 ** 32, 2 ** 40)), [])
+
+    def test_Db32Id(self):
+        Db32Id = self.getattr('Db32Id')
+
+        # Use fastest random_id() regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Bad text:
+        with self.assertRaises(TypeError) as cm:
+            Db32Id(17)
+        self.assertEqual(str(cm.exception),
+            "need a str or bytes instance; got a <class 'int'>: 17"
+        )
+        with self.assertRaises(ValueError) as cm:
+            Db32Id('3333333')
+        self.assertEqual(str(cm.exception),
+            'len(text) is 7, need 8 <= len(text) <= 96'
+        )
+        with self.assertRaises(ValueError) as cm:
+            Db32Id('333333333')
+        self.assertEqual(str(cm.exception),
+            'len(text) is 9, need len(text) % 8 == 0'
+        )
+        with self.assertRaises(ValueError) as cm:
+            Db32Id('3333333Z')
+        self.assertEqual(str(cm.exception), "invalid Dbase32: '3333333Z'")
+
+        # Bad data:
+        with self.assertRaises(TypeError):
+            Db32Id.frombytes('33333333')
+        with self.assertRaises(ValueError) as cm:
+            Db32Id.frombytes(b'\x00' * 4)
+        self.assertEqual(str(cm.exception),
+            'len(data) is 4, need 5 <= len(data) <= 60'
+        )
+        with self.assertRaises(ValueError) as cm:
+            Db32Id.frombytes(b'\x00' * 6)
+        self.assertEqual(str(cm.exception),
+            'len(data) is 6, need len(data) % 5 == 0'
+        )
+
+        # Round trips:
+        for numbytes in range(5, 65, 5):
+            text = random_id(numbytes)
+            data = dbase32.db32dec(text)
+            for _id in (Db32Id(text), Db32Id(text.encode()),
+                    Db32Id.frombytes(data)):
+                self.assertIs(type(_id), Db32Id)
+                self.assertEqual(_id.binary, data)
+                self.assertEqual(str(_id), text)
+                self.assertIs(str(_id), str(_id))
+                self.assertEqual(repr(_id), 'Db32Id({!r})'.format(text))
+                self.assertEqual(_id, Db32Id(text))
+                self.assertEqual(hash(_id), hash(Db32Id(text)))
+                for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+                    copy = pickle.loads(pickle.dumps(_id, protocol))
+                    self.assertIs(type(copy), Db32Id)
+                    self.assertEqual(copy, _id)
+                    self.assertEqual(str(copy), text)
+
+        # Never equal to str or bytes:
+        _id = Db32Id('FCNPVRELI7J9FUUI')
+        self.assertNotEqual(_id, 'FCNPVRELI7J9FUUI')
+        self.assertNotEqual(_id, b'binary foo')
+        with self.assertRaises(TypeError):
+            _id < 'FCNPVRELI7J9FUUI'
+
+        # Ordering matches the str IDs:
+        ids = [random_id(numbytes) for numbytes in (5, 10, 15) for i in range(200)]
+        self.assertEqual(
+            [str(_id) for _id in sorted(Db32Id(text) for text in ids)],
+            sorted(ids)
+        )
+        a = Db32Id('33333333')
+        b = Db32Id('YYYYYYYY')
+        c = Db32Id('3333333333333333')
+        self.assertTrue(a < b and a <= b and b > a and b >= a and a != b)
+        self.assertTrue(a < c < b)
+        self.assertFalse(a < a or a > a)
+        self.assertTrue(a <= a and a >= a and a == a)
+
+        # Usable as set and dict keys:
+        self.assertEqual(len(set(Db32Id(text) for text in ids * 2)), len(ids))
+
+    def test_Db32Cache(self):
+        Db32Cache = self.getattr('Db32Cache')
+        db32dec = self.getattr('db32dec')
+        check_db32 = self.getattr('check_db32')
+
+        # Use fastest random_id() implementation regardless of backend:
+        fastest = (_dbase32 if C_EXT_AVAIL else _dbase32py)
+        random_id = fastest.random_id
+
+        # Bad maxsize:
+        with self.assertRaises(TypeError):
+            Db32Cache(1.5)
+        for bad in (0, -1):
+            with self.assertRaises(ValueError) as cm:
+                Db32Cache(bad)
+            self.assertEqual(str(cm.exception),
+                'maxsize is {}, need maxsize >= 1'.format(bad)
+            )
+
+        cache = Db32Cache()
+        self.assertEqual(cache.maxsize, 1024)
+        self.assertEqual(tuple(cache.cache_info()), (0, 0, 0, 1024, 0))
+
+        # Errors are the same as db32dec() and check_db32(), and aren't cached:
+        bad = random_id()[:-1] + 'Z'
+        for (method, func) in [(cache.db32dec, db32dec),
+                               (cache.check_db32, check_db32)]:
+            for value in (bad, bad.encode(), '3333333', 17, None):
+                with self.assertRaises((TypeError, ValueError)) as cm:
+                    func(value)
+                with self.assertRaises(type(cm.exception)) as cm2:
+                    method(value)
+                self.assertEqual(str(cm2.exception), str(cm.exception))
+        self.assertEqual(tuple(cache.cache_info()), (0, 0, 0, 1024, 0))
+
+        # Hits return the very same bytes object:
+        _id = random_id()
+        data = cache.db32dec(_id)
+        self.assertEqual(data, db32dec(_id))
+        info = cache.cache_info()
+        self.assertEqual(
+            (info.hits, info.misses, info.evictions, info.maxsize,
+                info.currsize),
+            (0, 1, 0, 1024, 1)
+        )
+        self.assertIs(cache.db32dec(_id), data)
+        self.assertIsNone(cache.check_db32(_id))
+        self.assertEqual(tuple(cache.cache_info()), (2, 1, 0, 1024, 1))
+
+        # bytes, and str subclasses, bypass the cache:
+        class Text(str):
+            pass
+        self.assertEqual(cache.db32dec(_id.encode()), data)
+        self.assertEqual(cache.db32dec(Text(_id)), data)
+        self.assertIsNone(cache.check_db32(_id.encode()))
+        self.assertEqual(tuple(cache.cache_info()), (2, 1, 0, 1024, 1))
+
+        # Least recently used IDs are evicted first:
+        cache = Db32Cache(3)
+        (a, b, c, d) = [random_id() for i in range(4)]
+        for _id in (a, b, c, a, d):
+            self.assertEqual(cache.db32dec(_id), db32dec(_id))
+        self.assertEqual(tuple(cache.cache_info()), (1, 4, 1, 3, 3))
+        for _id in (a, c, d):
+            cache.check_db32(_id)
+        self.assertEqual(tuple(cache.cache_info()), (4, 4, 1, 3, 3))
+        cache.db32dec(b)
+        self.assertEqual(tuple(cache.cache_info()), (4, 5, 2, 3, 3))
+        cache.db32dec(c)
+        self.assertEqual(tuple(cache.cache_info()), (5, 5, 2, 3, 3))
+        cache.db32dec(a)
+        self.assertEqual(tuple(cache.cache_info()), (5, 6, 3, 3, 3))
+
+        # Lots of churn:
+        ids = [random_id() for i in range(200)]
+        for i in range(2000):
+            _id = ids[(i * 7) % len(ids)]
+            self.assertEqual(cache.db32dec(_id), db32dec(_id))
+        info = cache.cache_info()
+        self.assertEqual(info.hits + info.misses, 2000 + 11)
+        self.assertEqual(info.currsize, 3)
+
+        # cache_clear():
+        self.assertIsNone(cache.cache_clear())
+        self.assertEqual(tuple(cache.cache_info()), (0, 0, 0, 3, 0))
+        self.assertEqual(cache.db32dec(a), db32dec(a))
+        self.assertEqual(tuple(cache.cache_info()), (0, 1, 0, 3, 1))
+
+
+
 
 class TestFunctions_C(TestFunctions_Py):
     """
@@ -35,7 +35,8 @@ from random import SystemRandom
 from collections import Counter
 import sys
 
-from dbase32 import rfc3548, gen
+import dbase32
+from dbase32 import rfc3548, gen, _dbase32py
 
 
 random = SystemRandom()
@@ -286,6 +287,20 @@ class TestFunctions(TestCase):
                 'invalid Dbase32: {!r}'.format(value)
             )
 
+    def test_backend(self):
+        codec = rfc3548._B32
+        self.assertIsInstance(codec, dbase32.Codec)
+        self.assertEqual(codec.forward, rfc3548.B32_FORWARD)
+        self.assertEqual(rfc3548.b32enc, codec.encode)
+        self.assertEqual(rfc3548.b32dec, codec.decode)
+        self.assertEqual(rfc3548.isb32, codec.isvalid)
+        self.assertEqual(rfc3548.check_b32, codec.check)
+        if dbase32.using_c_extension:
+            from dbase32 import _dbase32
+            self.assertIs(type(codec), _dbase32.Codec)
+        else:
+            self.assertIs(type(codec), _dbase32py.Codec)
+
     def test_b32enc(self):
         """
         Test `dbase32.encode_x()` against `base64.b32encode()`.
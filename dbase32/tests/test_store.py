@@ -0,0 +1,586 @@
+# dbase32: base32-encoding with a sorted-order alphabet (for databases)
+# Copyright (C) 2013-2016 Novacut Inc
+#
+# This file is part of `dbase32`.
+#
+# `dbase32` is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# `dbase32` is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with `dbase32`.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Jason Gerard DeRose <jderose@novacut.com>
+#
+
+"""
+Unit tests for `dbase32.store` module.
+"""
+
+from unittest import TestCase, skipIf
+import time
+import tempfile
+import shutil
+import os
+from os import path
+
+from dbase32 import DB32ALPHABET, random_id, time_id, db32_join_n, db32_join_time
+from dbase32 import store
+
+
+class TempDir:
+    def __init__(self):
+        self.dir = tempfile.mkdtemp(prefix='unittest.')
+
+    def __del__(self):
+        shutil.rmtree(self.dir)
+
+    def join(self, *parts):
+        return path.join(self.dir, *parts)
+
+    def touch(self, *parts):
+        filename = self.join(*parts)
+        os.makedirs(path.dirname(filename), exist_ok=True)
+        open(filename, 'xb').close()
+        return filename
+
+    def makedirs(self, *parts):
+        dirname = self.join(*parts)
+        os.makedirs(dirname)
+        return dirname
+
+
+def make_ids(count, size=15):
+    return sorted(random_id(size) for i in range(count))
+
+
+@skipIf(store.scandir is None, 'requires os.scandir()')
+class TestFunctions(TestCase):
+    def check_walk(self, tmp, ids, layout, **kw):
+        result = list(store.walk(tmp.dir, layout, **kw))
+        self.assertEqual([item[0] for item in result], ids)
+        for (_id, entry) in result:
+            self.assertIsInstance(entry, os.DirEntry)
+            if type(layout) is int:
+                layout = (layout,)
+            self.assertEqual(entry.path, db32_join_n(tmp.dir, _id, levels=layout))
+
+    def test_walk(self):
+        walk = store.walk
+
+        # Bad parentdir:
+        for layout in (2, (), store.TimeLayout()):
+            with self.assertRaises(TypeError) as cm:
+                list(walk(b'/nope', layout))
+            self.assertEqual(str(cm.exception),
+                "parentdir: need a <class 'str'>; got a <class 'bytes'>: b'/nope'"
+            )
+
+        # Bad layout:
+        with self.assertRaises(TypeError) as cm:
+            list(walk('/nope', '2'))
+        self.assertEqual(str(cm.exception),
+            "layout: need a <class 'int'> or <class 'tuple'>; got a <class 'str'>: '2'"
+        )
+        with self.assertRaises(ValueError) as cm:
+            list(walk('/nope', 0))
+        self.assertEqual(str(cm.exception), 'layout is 0, need 1 <= layout < 96')
+
+        # Bad workers:
+        with self.assertRaises(TypeError) as cm:
+            list(walk('/nope', workers=2.0))
+        self.assertEqual(str(cm.exception),
+            "workers: need a <class 'int'>; got a <class 'float'>: 2.0"
+        )
+        with self.assertRaises(ValueError) as cm:
+            list(walk('/nope', workers=0))
+        self.assertEqual(str(cm.exception), 'workers is 0, need workers >= 1')
+
+        # Missing parentdir:
+        self.assertEqual(list(walk('/nope/not/here')), [])
+
+        # Empty parentdir:
+        tmp = TempDir()
+        self.assertEqual(list(walk(tmp.dir)), [])
+
+        # Shard directories but no files:
+        for name in ('33', 'AB', 'YY'):
+            tmp.makedirs(name)
+        self.assertEqual(list(walk(tmp.dir)), [])
+
+        # Default layout, with junk that should be skipped:
+        ids = make_ids(200)
+        for _id in ids:
+            tmp.touch(_id[:2], _id[2:])
+        tmp.touch('3A', 'nope')
+        tmp.touch('AB', 'CDEFGHIJKLMNOP0')
+        tmp.touch('AB', 'CDEFGHIJKLMNOPQR')
+        tmp.touch('ab', 'CDEFGHIJKLMNOPQ')
+        tmp.touch('ABC', 'DEFGHIJKLMNOPQ')
+        tmp.touch('tmp', 'foo')
+        tmp.touch('AB3')
+        tmp.makedirs('AB', 'CDEFGHIJKLMNOPQ')  # Valid ID, but a directory
+        self.check_walk(tmp, ids, 2)
+        for workers in (1, 2, 3, 17):
+            self.check_walk(tmp, ids, 2, workers=workers)
+        self.assertEqual(list(walk(tmp.dir, 3)), [])
+
+        # Multi-level layout:
+        tmp = TempDir()
+        ids = make_ids(200, 10) + make_ids(50, 20)
+        ids.sort()
+        for _id in ids:
+            tmp.touch(_id[:2], _id[2:4], _id[4:])
+        tmp.touch('AB', 'C', 'DEFGHIJK')
+        tmp.touch('AB', 'CD', 'EF', 'GHIJKL')
+        self.check_walk(tmp, ids, (2, 2))
+        self.check_walk(tmp, ids, (2, 2), workers=1)
+
+        # Flat layout:
+        tmp = TempDir()
+        ids = make_ids(100)
+        for _id in ids:
+            tmp.touch(_id)
+        tmp.touch('nope')
+        tmp.makedirs('3' * 24)
+        self.check_walk(tmp, ids, ())
+
+    def test_init_layout(self):
+        init_layout = store.init_layout
+        LayoutStatus = store.LayoutStatus
+        names = tuple(a + b for a in DB32ALPHABET for b in DB32ALPHABET)
+        self.assertEqual(len(names), 1024)
+
+        # Bad layout:
+        with self.assertRaises(TypeError) as cm:
+            init_layout('/nope', [2, 2])
+        self.assertEqual(str(cm.exception),
+            "layout: need a <class 'int'> or <class 'tuple'>; got a <class 'list'>: [2, 2]"
+        )
+
+        # Bad workers:
+        with self.assertRaises(ValueError) as cm:
+            init_layout('/nope', workers=-1)
+        self.assertEqual(str(cm.exception), 'workers is -1, need workers >= 1')
+
+        # Missing parentdir:
+        with self.assertRaises(FileNotFoundError):
+            init_layout('/nope/not/here')
+
+        # Flat layout has nothing to do:
+        tmp = TempDir()
+        tmp.touch('nope')
+        self.assertEqual(init_layout(tmp.dir, ()), LayoutStatus((), (), ()))
+
+        # Check only:
+        tmp = TempDir()
+        self.assertEqual(init_layout(tmp.dir, create=False),
+            LayoutStatus((), names, ())
+        )
+        self.assertEqual(os.listdir(tmp.dir), [])
+
+        # Create:
+        self.assertEqual(init_layout(tmp.dir), LayoutStatus(names, (), ()))
+        self.assertEqual(sorted(os.listdir(tmp.dir)), list(names))
+        self.assertEqual(init_layout(tmp.dir), LayoutStatus((), (), ()))
+        self.assertEqual(init_layout(tmp.dir, workers=1),
+            LayoutStatus((), (), ())
+        )
+        self.assertEqual(init_layout(tmp.dir, create=False),
+            LayoutStatus((), (), ())
+        )
+
+        # Missing and unexpected entries:
+        os.rmdir(tmp.join('AB'))
+        tmp.touch('AB')
+        os.rmdir(tmp.join('CD'))
+        tmp.touch('nope')
+        tmp.makedirs('ABC')
+        tmp.touch('XY', 'object')
+        self.assertEqual(init_layout(tmp.dir, create=False),
+            LayoutStatus((), ('AB', 'CD'), ('AB', 'ABC', 'nope'))
+        )
+        self.assertEqual(init_layout(tmp.dir),
+            LayoutStatus(('CD',), ('AB',), ('AB', 'ABC', 'nope'))
+        )
+        self.assertTrue(path.isfile(tmp.join('AB')))
+        self.assertTrue(path.isfile(tmp.join('XY', 'object')))
+
+        # Multi-level layout:
+        tmp = TempDir()
+        tmp.makedirs('33', '3')
+        tmp.touch('Y', 'YY', 'object')
+        status = init_layout(tmp.dir, (1, 2))
+        self.assertEqual(len(status.created), 32 + 32 * 1024 - 2)
+        self.assertEqual(status.created[:3], ('3', '3/33', '3/34'))
+        self.assertEqual(status.missing, ())
+        self.assertEqual(status.unexpected, ('33',))
+        self.assertTrue(path.isfile(tmp.join('Y', 'YY', 'object')))
+        self.assertEqual(init_layout(tmp.dir, (1, 2), create=False),
+            LayoutStatus((), (), ('33',))
+        )
+        os.rmdir(tmp.join('5', 'XY'))
+        shutil.rmtree(tmp.join('6'))
+        self.assertEqual(init_layout(tmp.dir, (1, 2), create=False),
+            LayoutStatus((), ('5/XY', '6'), ('33',))
+        )
+        self.assertEqual(init_layout(tmp.dir, (1, 2)),
+            LayoutStatus(
+                ('5/XY', '6') + tuple('6/' + name for name in names),
+                (),
+                ('33',)
+            )
+        )
+
+
+class TestTimeLayout(TestCase):
+    def test_init(self):
+        layout = store.TimeLayout()
+        self.assertEqual(layout.bucket, 86400)
+        self.assertEqual(layout.width, 2)
+        self.assertEqual(repr(layout), 'TimeLayout(bucket=86400, width=2)')
+        layout = store.TimeLayout(3600, width=3)
+        self.assertEqual(layout.bucket, 3600)
+        self.assertEqual(layout.width, 3)
+
+        with self.assertRaises(TypeError) as cm:
+            store.TimeLayout(3600.0)
+        self.assertEqual(str(cm.exception),
+            "'float' object cannot be interpreted as an integer"
+        )
+        with self.assertRaises(ValueError) as cm:
+            store.TimeLayout(0)
+        self.assertEqual(str(cm.exception), 'bucket is 0, need bucket >= 1')
+        with self.assertRaises(ValueError) as cm:
+            store.TimeLayout(width=17)
+        self.assertEqual(str(cm.exception),
+            'width is 17, need 1 <= width <= 16'
+        )
+
+    def test_path(self):
+        layout = store.TimeLayout(3600, 3)
+        for i in range(100):
+            _id = time_id()
+            self.assertEqual(layout.path('/foo', _id),
+                db32_join_time('/foo', _id, 3600, 3)
+            )
+
+    def test_bucket_name(self):
+        layout = store.TimeLayout(3600)
+        self.assertEqual(layout.bucket_name(-1), '33333333')
+        self.assertEqual(layout.bucket_name(0), '33333333')
+        self.assertEqual(layout.bucket_name(3599.9), '33333333')
+        self.assertEqual(layout.bucket_name(3600), '3333V733')
+        self.assertEqual(layout.bucket_name(2 ** 32), 'YYYYLR33')
+        for i in range(100):
+            ts = time.time() + i * 3600
+            name = layout.bucket_name(ts)
+            self.assertEqual(db32_join_time('', time_id(ts), 3600)[1:9], name)
+            (start, end) = layout.bucket_range(name)
+            self.assertEqual(end - start, 3600)
+            self.assertTrue(start <= ts < end)
+            self.assertEqual(start % 3600, 0)
+
+
+class TestObjectStore(TestCase):
+    def test_init(self):
+        tmp = TempDir()
+        with self.assertRaises(TypeError) as cm:
+            store.ObjectStore(tmp.dir.encode())
+        self.assertEqual(str(cm.exception),
+            "parentdir: need a <class 'str'>; got a <class 'bytes'>: {!r}".format(
+                tmp.dir.encode()
+            )
+        )
+        with self.assertRaises(TypeError) as cm:
+            store.ObjectStore(tmp.dir, fd_cache='64')
+        self.assertEqual(str(cm.exception),
+            "fd_cache: need a <class 'int'>; got a <class 'str'>: '64'"
+        )
+        with self.assertRaises(ValueError) as cm:
+            store.ObjectStore(tmp.dir, fd_cache=-1)
+        self.assertEqual(str(cm.exception), 'fd_cache is -1, need fd_cache >= 0')
+
+        inst = store.ObjectStore(tmp.dir)
+        self.assertEqual(inst.parentdir, tmp.dir)
+        self.assertEqual(inst.layout, 2)
+        self.assertIs(inst.durable, True)
+        self.assertEqual(repr(inst), 'ObjectStore({!r}, 2)'.format(tmp.dir))
+        inst = store.ObjectStore(tmp.dir, (2, 2), durable=False)
+        self.assertEqual(inst.layout, (2, 2))
+        self.assertIs(inst.durable, False)
+
+    def test_put_get_delete(self):
+        tmp = TempDir()
+        inst = store.ObjectStore(tmp.dir)
+        _id = random_id()
+        data = os.urandom(1234)
+        filename = tmp.join(_id[:2], _id[2:])
+
+        with self.assertRaises(ValueError):
+            inst.put('nope', data)
+        self.assertEqual(os.listdir(tmp.dir), [])
+        self.assertNotIn(_id, inst)
+        with self.assertRaises(FileNotFoundError):
+            inst.get(_id)
+
+        # Shard directory is created as needed:
+        self.assertIsNone(inst.put(_id, data))
+        self.assertEqual(inst.path(_id), filename)
+        self.assertEqual(os.listdir(path.dirname(filename)), [_id[2:]])
+        with open(filename, 'rb') as fp:
+            self.assertEqual(fp.read(), data)
+        self.assertIn(_id, inst)
+        self.assertEqual(list(inst), [_id])
+        self.assertEqual(inst.get(_id), data)
+        self.assertEqual(inst.get(_id), data)
+        self.assertEqual(inst.mmap(_id)[:], data)
+        stats = inst.stats()
+        self.assertEqual(stats['fd_cache'], {'size': 1, 'hits': 2, 'misses': 2})
+        # The file, its new shard directory, and parentdir:
+        self.assertEqual(stats['fsync'], 3)
+        self.assertEqual(stats['put']['count'], 1)
+        self.assertEqual(stats['put']['bytes'], 1234)
+        self.assertEqual(stats['get']['count'], 2)
+        self.assertEqual(stats['get']['bytes'], 2468)
+        self.assertGreater(stats['get']['seconds'], 0)
+        self.assertGreater(stats['get']['max_seconds'], 0)
+
+        # Replacing an object evicts its cached fd:
+        data2 = os.urandom(100)
+        inst.put(_id, memoryview(data2))
+        self.assertEqual(inst.get(_id), data2)
+        self.assertEqual(os.listdir(path.dirname(filename)), [_id[2:]])
+        self.assertEqual(inst.stats()['fd_cache'],
+            {'size': 1, 'hits': 2, 'misses': 3}
+        )
+
+        # get() keeps reading when a read comes up short:
+        pread = os.pread
+        os.pread = lambda fd, size, offset: pread(fd, min(size, 7), offset)
+        try:
+            self.assertEqual(inst.get(_id), data2)
+        finally:
+            os.pread = pread
+
+        # sendfile():
+        (r, w) = os.pipe()
+        try:
+            self.assertEqual(inst.sendfile(_id, w), 100)
+            self.assertEqual(os.read(r, 200), data2)
+            self.assertEqual(inst.sendfile(_id, w, 10, 20), 20)
+            self.assertEqual(os.read(r, 200), data2[10:30])
+        finally:
+            os.close(r)
+            os.close(w)
+
+        # delete():
+        self.assertIsNone(inst.delete(_id))
+        self.assertNotIn(_id, inst)
+        self.assertEqual(inst.stats()['fd_cache']['size'], 0)
+        self.assertEqual(inst.stats()['delete']['count'], 1)
+        with self.assertRaises(FileNotFoundError):
+            inst.delete(_id)
+
+        # A zero-length object can be stored and read, but not mapped:
+        empty = random_id()
+        inst.put(empty, b'')
+        self.assertEqual(inst.get(empty), b'')
+        with self.assertRaises(ValueError):
+            inst.mmap(empty)
+        inst.close()
+
+    def test_fd_cache(self):
+        tmp = TempDir()
+        ids = make_ids(5)
+        with store.ObjectStore(tmp.dir, fd_cache=3, durable=False) as inst:
+            for _id in ids:
+                inst.put(_id, _id.encode())
+            self.assertEqual(inst.stats()['fsync'], 0)
+            for _id in ids:
+                self.assertEqual(inst.get(_id), _id.encode())
+            self.assertEqual(inst.stats()['fd_cache'],
+                {'size': 3, 'hits': 0, 'misses': 5}
+            )
+            self.assertEqual(list(inst._fds), ids[2:])
+            inst.get(ids[2])
+            self.assertEqual(list(inst._fds), ids[3:] + ids[2:3])
+        self.assertEqual(len(inst._fds), 0)
+
+        inst = store.ObjectStore(tmp.dir, fd_cache=0)
+        for _id in ids:
+            self.assertEqual(inst.get(_id), _id.encode())
+        self.assertEqual(inst.stats()['fd_cache'],
+            {'size': 0, 'hits': 0, 'misses': 5}
+        )
+
+        # A cached fd isn't used once another instance replaces or removes
+        # the object:
+        a = store.ObjectStore(tmp.dir, durable=False)
+        b = store.ObjectStore(tmp.dir, durable=False)
+        _id = ids[0]
+        self.assertEqual(a.get(_id), _id.encode())
+        self.assertEqual(a.get(_id), _id.encode())
+        b.put(_id, b'new')
+        self.assertEqual(a.get(_id), b'new')
+        self.assertEqual(a.mmap(_id)[:], b'new')
+        self.assertEqual(a.stats()['fd_cache'],
+            {'size': 1, 'hits': 2, 'misses': 2}
+        )
+        b.delete(_id)
+        self.assertNotIn(_id, a)
+        with self.assertRaises(FileNotFoundError):
+            a.get(_id)
+        self.assertEqual(a.stats()['fd_cache'],
+            {'size': 0, 'hits': 2, 'misses': 3}
+        )
+        a.close()
+        b.close()
+
+    def test_batch(self):
+        tmp = TempDir()
+        inst = store.ObjectStore(tmp.dir, (1,))
+        ids = ['33333333', '3YYYYYYY', '43333333']
+        with inst.batch() as batch:
+            self.assertIsInstance(batch, store.Batch)
+            for _id in ids:
+                batch.put(_id, _id.encode())
+            self.assertEqual(len(batch), 3)
+            self.assertEqual(list(inst), [])
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(list(inst), ids)
+        # 3 files, but only 2 directories (plus parentdir, which gained them):
+        self.assertEqual(inst.stats()['fsync'], 6)
+        self.assertEqual(inst.stats()['put']['count'], 3)
+
+        # An exception aborts the batch and removes its temporary files:
+        with self.assertRaises(ValueError):
+            with inst.batch() as batch:
+                batch.put('53333333', b'foo')
+                batch.put('nope', b'bar')
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(list(inst), ids)
+        self.assertEqual(sorted(os.listdir(tmp.join('3'))), ['3333333', 'YYYYYYY'])
+        self.assertEqual(os.listdir(tmp.join('5')), [])
+
+    def test_durable_dirs(self):
+        tmp = TempDir()
+        layout = store.TimeLayout()
+        inst = store.ObjectStore(tmp.dir, layout)
+        _id = time_id(1800000000)
+        bucketdir = tmp.join(layout.bucket_name(1800000000))
+        synced = []
+        orig = store._fsync_dir
+
+        def fsync_dir(dirname):
+            synced.append(dirname)
+            orig(dirname)
+
+        store._fsync_dir = fsync_dir
+        try:
+            # New BUCKET/ and BUCKET/TAIL/ directories are synced into their
+            # parents, children first:
+            inst.put(_id, b'foo')
+            self.assertEqual(synced,
+                [path.join(bucketdir, _id[-2:]), bucketdir, tmp.dir]
+            )
+            self.assertEqual(inst.stats()['fsync'], 4)
+
+            # Existing directories only need the rename synced:
+            del synced[:]
+            inst.put(_id, b'bar')
+            self.assertEqual(synced, [path.join(bucketdir, _id[-2:])])
+            self.assertEqual(inst.stats()['fsync'], 6)
+
+            # And a batch syncs each parent once:
+            del synced[:]
+            ids = [time_id(1800000000 + 86400) for i in range(2)]
+            with inst.batch() as batch:
+                for _id2 in ids:
+                    batch.put(_id2, b'baz')
+            bucketdir2 = tmp.join(layout.bucket_name(1800000000 + 86400))
+            expected = set(path.join(bucketdir2, i[-2:]) for i in ids)
+            expected.update([bucketdir2, tmp.dir])
+            self.assertEqual(sorted(synced), sorted(expected))
+
+            # Nothing is synced when not durable:
+            del synced[:]
+            inst = store.ObjectStore(tmp.dir, layout, durable=False)
+            inst.put(time_id(1800000000 - 86400), b'foo')
+            self.assertEqual(synced, [])
+            self.assertEqual(inst.stats()['fsync'], 0)
+        finally:
+            store._fsync_dir = orig
+
+    def test_time_layout(self):
+        tmp = TempDir()
+        layout = store.TimeLayout(3600)
+        with self.assertRaises(TypeError) as cm:
+            store.ObjectStore(tmp.dir.encode(), layout)
+        self.assertEqual(str(cm.exception),
+            "parentdir: need a <class 'str'>; got a <class 'bytes'>: {!r}".format(
+                tmp.dir.encode()
+            )
+        )
+        inst = store.ObjectStore(tmp.dir, layout)
+        self.assertIs(inst.layout, layout)
+        with self.assertRaises(ValueError) as cm:
+            inst.put(random_id(10), b'foo')
+        self.assertEqual(str(cm.exception), 'len(_id) is 16, need len(_id) == 24')
+
+        now = 1800000000
+        ids = sorted(
+            time_id(now - 3600 * hours + i) for hours in range(5)
+            for i in range(50)
+        )
+        for _id in ids:
+            inst.put(_id, _id.encode())
+            self.assertEqual(inst.path(_id),
+                db32_join_time(tmp.dir, _id, 3600)
+            )
+        buckets = sorted(os.listdir(tmp.dir))
+        self.assertEqual(buckets,
+            [layout.bucket_name(now - 3600 * h) for h in reversed(range(5))]
+        )
+        tmp.touch('nope')
+        tmp.touch(buckets[0], 'nope')
+        tmp.touch(buckets[0], ids[0][-2:], 'nope')
+        # A valid ID in a shard that doesn't match its tail (and so can't
+        # collide with any real object there):
+        tmp.touch(buckets[0], '33', 'Y' * 24)
+        # A valid ID for the shard, but a directory:
+        tmp.makedirs(buckets[0], ids[0][-2:], '3' * 22 + ids[0][-2:])
+        self.assertEqual(list(inst), ids)
+        for workers in (1, 3):
+            result = list(store.walk(tmp.dir, layout, workers))
+            self.assertEqual([item[0] for item in result], ids)
+            for (_id, entry) in result:
+                self.assertEqual(entry.path, inst.path(_id))
+        for _id in ids:
+            self.assertEqual(inst.get(_id), _id.encode())
+
+        # expire():
+        self.assertEqual(inst.expire(now - 5 * 3600), [])
+        self.assertEqual(inst.expire(layout.bucket_range(buckets[1])[1] - 1),
+            buckets[:1]
+        )
+        self.assertEqual(inst.stats()['fd_cache']['size'], 0)
+        self.assertEqual(inst.expire(layout.bucket_range(buckets[2])[1]),
+            buckets[1:3]
+        )
+        self.assertEqual(list(inst), ids[150:])
+        self.assertEqual(sorted(os.listdir(tmp.dir)), buckets[3:] + ['nope'])
+
+        inst = store.ObjectStore(tmp.dir)
+        with self.assertRaises(TypeError) as cm:
+            inst.expire(now)
+        self.assertEqual(str(cm.exception),
+            'expire() needs a TimeLayout; layout is 2'
+        )